@@ -1,22 +1,153 @@
 import json
 import os
+import atexit
+import time
 import uuid
-from datetime import datetime
+import fcntl
+import heapq
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from busca_texto import normalizar_texto, AutomatoPalavras
+from jurisprudencia_api import identificador_acordao
+from metricas import ENTREGAS_ALERTAS
+
+# Quantidade mínima de entradas no journal antes de considerar a compactação
+ENTRADAS_MINIMAS_COMPACTACAO = 1000
+
+# Compacta o journal quando há mais que este múltiplo de entradas por alerta
+FATOR_COMPACTACAO = 2
+
+# Intervalo entre execuções de cada frequência ('imediata' é disparada na ingestão)
+FREQUENCIAS_ALERTA = {
+    'diaria': timedelta(days=1),
+    'semanal': timedelta(weeks=1)
+}
+
+# Espera antes de tentar de novo uma entrega imediata que falhou, dobrada a
+# cada falha seguida até o máximo
+ESPERA_NOVA_TENTATIVA_IMEDIATA = timedelta(minutes=1)
+ESPERA_MAXIMA_NOVA_TENTATIVA_IMEDIATA = timedelta(hours=6)
+
+# Intervalo máximo de espera do agendador, para perceber alertas alterados por outros processos
+INTERVALO_SINCRONIZACAO_AGENDADOR = 60
+
+# Instância compartilhada pelo processo (ver obter_alerta_service)
+_alerta_service = None
+_lock_alerta_service = threading.Lock()
+
+
+def calcular_vencimento(alerta):
+    """
+    Calcula quando um alerta deve ser executado novamente
+    
+    Args:
+        alerta (dict): Dados do alerta
+        
+    Returns:
+        datetime: Próxima execução ou None se o alerta não for agendado
+        (inativo ou com frequência 'imediata' sem entrega a repetir)
+    """
+    if not alerta.get('ativo', True):
+        return None
+    
+    # Alertas imediatos só são agendados para repetir uma entrega que falhou
+    if alerta.get('frequencia') == 'imediata':
+        if alerta.get('pendentes') and alerta.get('proxima_tentativa'):
+            return datetime.fromisoformat(alerta['proxima_tentativa'])
+        return None
+    
+    intervalo = FREQUENCIAS_ALERTA.get(alerta.get('frequencia'), FREQUENCIAS_ALERTA['diaria'])
+    base = alerta.get('ultima_execucao') or alerta.get('criado_em')
+    
+    # Alertas sem data de referência (importados, por exemplo) já estão vencidos
+    if not base:
+        return datetime.fromtimestamp(0)
+    
+    return datetime.fromisoformat(base) + intervalo
+
+
+def espera_nova_tentativa(tentativas):
+    """
+    Espera até a próxima tentativa de uma entrega imediata
+    
+    Args:
+        tentativas (int): Quantidade de falhas seguidas
+        
+    Returns:
+        timedelta: Espera, dobrada a cada falha até o máximo
+    """
+    return min(ESPERA_NOVA_TENTATIVA_IMEDIATA * 2 ** max(tentativas - 1, 0), ESPERA_MAXIMA_NOVA_TENTATIVA_IMEDIATA)
+
+
+def obter_alerta_service():
+    """
+    Retorna o serviço de alertas compartilhado pelo processo
+    
+    A instância é criada no primeiro uso e mantida entre requisições; as
+    alterações feitas por outros processos são detectadas pelo repositório.
+    Os resumos são enviados por email quando SMTP_HOST está configurado.
+    A execução dos alertas agendados (diários e semanais) começa junto com a
+    instância e é interrompida no encerramento do processo.
+    
+    Returns:
+        AlertaService: Serviço de alertas
+    """
+    global _alerta_service
+    
+    if _alerta_service is None:
+        with _lock_alerta_service:
+            if _alerta_service is None:
+                notificar = None
+                
+                if os.environ.get('SMTP_HOST'):
+                    from envio_email_service import EnvioEmailService
+                    notificar = EnvioEmailService()
+                
+                servico = AlertaService(notificar=notificar)
+                servico.iniciar_monitoramento()
+                atexit.register(servico.parar_monitoramento)
+                
+                _alerta_service = servico
+    
+    return _alerta_service
+
 
 class AlertaService:
     """
     Serviço para gerenciamento de alertas de novos acórdãos
     """
-    def __init__(self):
+    def __init__(self, diretorio_alertas=None, notificar=None):
+        # Função que recebe os envios [(alerta, ids dos acórdãos)] de cada
+        # execução e retorna os emails não entregues (ex.: EnvioEmailService)
+        self.notificar = notificar
+        
         # Diretório para armazenar alertas
-        self.diretorio_alertas = os.path.join(os.path.dirname(__file__), 'data')
+        self.diretorio_alertas = diretorio_alertas or os.environ.get('DIRETORIO_ALERTAS') or os.path.join(os.path.dirname(__file__), 'data')
         os.makedirs(self.diretorio_alertas, exist_ok=True)
         
-        # Arquivo de alertas
-        self.arquivo_alertas = os.path.join(self.diretorio_alertas, 'alertas.json')
+        # Journal de alertas (o arquivo JSON antigo é migrado na primeira carga)
+        self.arquivo_alertas = os.path.join(self.diretorio_alertas, 'alertas.jsonl')
         
         # Carrega alertas existentes
-        self.alertas = self._carregar_alertas()
+        self.repositorio = RepositorioAlertas(
+            self.arquivo_alertas,
+            os.path.join(self.diretorio_alertas, 'alertas.json')
+        )
+        
+        # Índice reverso dos alertas, reconstruído quando os alertas mudam
+        self._indice = None
+        self._versao_indice = None
+        self._lock_indice = threading.Lock()
+        
+        # Agendador das execuções diárias e semanais
+        self.agendador = AgendadorAlertas(self)
+    
+    @property
+    def alertas(self):
+        """Lista de alertas, na ordem de criação"""
+        return self.repositorio.listar()
     
     def adicionar_alerta(self, usuario_id, email, temas=None, subtemas=None, palavras_chave=None, frequencia='diaria'):
         """
@@ -28,7 +159,7 @@ class AlertaService:
             temas (list): Lista de temas para monitorar
             subtemas (list): Lista de subtemas para monitorar
             palavras_chave (list): Lista de palavras-chave para monitorar
-            frequencia (str): Frequência de envio ('diaria', 'semanal')
+            frequencia (str): Frequência de envio ('diaria', 'semanal', 'imediata')
             
         Returns:
             str: ID do alerta criado
@@ -47,14 +178,12 @@ class AlertaService:
             'frequencia': frequencia,
             'criado_em': datetime.now().isoformat(),
             'ultima_execucao': None,
+            'pendentes': [],
             'ativo': True
         }
         
-        # Adiciona à lista de alertas
-        self.alertas.append(alerta)
-        
-        # Salva alertas
-        self._salvar_alertas()
+        # Salva alerta
+        self.repositorio.salvar(alerta)
         
         return alerta_id
     
@@ -68,18 +197,7 @@ class AlertaService:
         Returns:
             bool: True se removido com sucesso, False caso contrário
         """
-        # Busca alerta
-        for i, alerta in enumerate(self.alertas):
-            if alerta['id'] == alerta_id:
-                # Remove alerta
-                self.alertas.pop(i)
-                
-                # Salva alertas
-                self._salvar_alertas()
-                
-                return True
-        
-        return False
+        return self.repositorio.remover(alerta_id)
     
     def atualizar_alerta(self, alerta_id, dados):
         """
@@ -92,22 +210,16 @@ class AlertaService:
         Returns:
             bool: True se atualizado com sucesso, False caso contrário
         """
-        # Busca alerta
-        for i, alerta in enumerate(self.alertas):
-            if alerta['id'] == alerta_id:
-                # Atualiza campos permitidos
-                campos_permitidos = ['email', 'temas', 'subtemas', 'palavras_chave', 'frequencia', 'ativo']
-                
-                for campo in campos_permitidos:
-                    if campo in dados:
-                        alerta[campo] = dados[campo]
-                
-                # Salva alertas
-                self._salvar_alertas()
-                
-                return True
+        # Atualiza campos permitidos
+        campos_permitidos = ['email', 'temas', 'subtemas', 'palavras_chave', 'frequencia', 'ativo']
         
-        return False
+        def atualizar(alerta):
+            for campo in campos_permitidos:
+                if campo in dados:
+                    alerta[campo] = dados[campo]
+        
+        # Leitura e gravação atômicas, sem perder alterações concorrentes
+        return bool(self.repositorio.modificar([alerta_id], atualizar))
     
     def buscar_alerta(self, alerta_id):
         """
@@ -119,12 +231,7 @@ class AlertaService:
         Returns:
             dict: Dados do alerta ou None se não encontrado
         """
-        # Busca alerta
-        for alerta in self.alertas:
-            if alerta['id'] == alerta_id:
-                return alerta.copy()
-        
-        return None
+        return self.repositorio.obter(alerta_id)
     
     def buscar_alertas_por_usuario(self, usuario_id):
         """
@@ -136,63 +243,756 @@ class AlertaService:
         Returns:
             list: Lista de alertas do usuário
         """
-        return [alerta.copy() for alerta in self.alertas if alerta['usuario_id'] == usuario_id]
+        return self.repositorio.listar_por_usuario(usuario_id)
     
-    def processar_alertas(self):
+    def corresponder_acordaos(self, acordaos):
+        """
+        Encontra os alertas correspondentes a um lote de novos acórdãos
+        
+        Args:
+            acordaos (list): Novos acórdãos
+            
+        Returns:
+            dict: IDs dos acórdãos correspondentes, por ID de alerta
+        """
+        return self.indice_alertas().corresponder(acordaos)
+    
+    def indice_alertas(self):
+        """
+        Retorna o índice reverso dos alertas ativos
+        
+        Returns:
+            IndiceAlertas: Índice atualizado com os alertas do repositório
+        """
+        with self._lock_indice:
+            versao = self.repositorio.sincronizar()
+            
+            if self._indice is None or self._versao_indice != versao:
+                alertas = self.repositorio.listar()
+                self._indice = IndiceAlertas(alertas)
+                self._versao_indice = versao
+            
+            return self._indice
+    
+    def registrar_novos_acordaos(self, acordaos, agora=None):
+        """
+        Registra acórdãos recém-publicados nos alertas correspondentes
+        
+        Alertas com frequência 'imediata' são disparados na hora; os demais
+        acumulam os acórdãos até a próxima execução agendada.
+        
+        Args:
+            acordaos (list): Novos acórdãos
+            agora (datetime, optional): Momento do registro
+            
+        Returns:
+            dict: Estatísticas de processamento
+        """
+        agora = agora or datetime.now()
+        correspondencias = self.corresponder_acordaos(acordaos)
+        envios = []
+        
+        def registrar(alerta):
+            acordao_ids = correspondencias[alerta['id']]
+            
+            if alerta.get('frequencia') == 'imediata':
+                # Leva junto os acórdãos de uma entrega anterior que falhou
+                pendentes = alerta.get('pendentes') or []
+                registrados = set(pendentes)
+                alerta['ultima_execucao'] = agora.isoformat()
+                alerta['pendentes'] = []
+                alerta.pop('proxima_tentativa', None)
+                envios.append((alerta, pendentes + [i for i in acordao_ids if i not in registrados]))
+            else:
+                pendentes = alerta.get('pendentes') or []
+                registrados = set(pendentes)
+                alerta['pendentes'] = pendentes + [i for i in acordao_ids if i not in registrados]
+        
+        # Uma única gravação para todos os alertas correspondentes
+        self.repositorio.modificar(list(correspondencias), registrar)
+        
+        estatisticas = self._enviar(envios, agora)
+        estatisticas['total'] = len(correspondencias)
+        
+        return estatisticas
+    
+    def processar_alertas(self, novos_acordaos=None, agora=None):
         """
         Processa alertas pendentes
         
+        Apenas os alertas cuja próxima execução já venceu são processados.
+        
+        Args:
+            novos_acordaos (list, optional): Acórdãos publicados desde a
+                última execução, registrados antes do processamento
+            agora (datetime, optional): Momento da execução
+            
         Returns:
             dict: Estatísticas de processamento
         """
-        # Implementação simulada para desenvolvimento
-        # Em produção, seria integrada com sistema de envio de emails
+        if novos_acordaos:
+            self.registrar_novos_acordaos(novos_acordaos, agora)
+        
+        return self.agendador.executar_vencidos(agora)
+    
+    def iniciar_monitoramento(self):
+        """Inicia a execução dos alertas agendados em segundo plano"""
+        self.agendador.iniciar()
+    
+    def parar_monitoramento(self):
+        """Interrompe a execução dos alertas agendados"""
+        self.agendador.parar()
+    
+    def executar_alertas(self, alerta_ids, agora):
+        """
+        Executa alertas vencidos, enviando os acórdãos acumulados
+        
+        A verificação do vencimento e o registro da execução são feitos de
+        forma atômica no repositório, de modo que um alerta nunca é executado
+        antes da hora nem duas vezes, mesmo com vários processos.
         
-        # Estatísticas
+        Args:
+            alerta_ids (list): IDs dos alertas vencidos
+            agora (datetime): Momento da execução
+            
+        Returns:
+            dict: Estatísticas de processamento
+        """
+        envios = []
+        
+        def executar(alerta):
+            vencimento = calcular_vencimento(alerta)
+            
+            if vencimento is None or vencimento > agora:
+                return False
+            
+            envios.append((alerta, alerta.get('pendentes') or []))
+            alerta['ultima_execucao'] = agora.isoformat()
+            alerta['pendentes'] = []
+            alerta.pop('proxima_tentativa', None)
+        
+        self.repositorio.modificar(alerta_ids, executar)
+        
+        # Alertas sem acórdãos novos apenas têm a execução registrada
+        estatisticas = self._enviar([envio for envio in envios if envio[1]], agora)
+        estatisticas['total'] = len(alerta_ids)
+        estatisticas['processados'] = len(envios)
+        
+        return estatisticas
+    
+    def _enviar(self, envios, agora):
+        """Entrega os acórdãos de cada alerta"""
         estatisticas = {
-            'total': len(self.alertas),
-            'processados': 0,
+            'total': 0,
+            'processados': len(envios),
             'enviados': 0,
-            'erros': 0
+            'erros': 0,
+            'reagendados': 0
         }
         
-        # Processa cada alerta
-        for alerta in self.alertas:
-            if not alerta['ativo']:
-                continue
+        if not envios:
+            return estatisticas
+        
+        # Implementação simulada para desenvolvimento quando não há função
+        # de notificação; a função retorna os emails que não foram entregues
+        try:
+            falhas = set(self.notificar(envios) or []) if self.notificar else set()
+        except Exception as e:
+            print(f"Erro ao enviar alertas: {e}")
+            falhas = {alerta['email'] for alerta, _ in envios}
+        
+        nao_entregues = {alerta['id']: acordao_ids for alerta, acordao_ids in envios if alerta['email'] in falhas}
+        estatisticas['erros'] = len(nao_entregues)
+        estatisticas['enviados'] = len(envios) - len(nao_entregues)
+        
+        for alerta, _ in envios:
+            ENTREGAS_ALERTAS.incrementar(alerta.get('frequencia') or 'diaria', 'falha' if alerta['id'] in nao_entregues else 'entregue')
+        
+        # Alertas imediatos entregues depois de falhas voltam à espera inicial
+        recuperados = [alerta['id'] for alerta, _ in envios if alerta.get('tentativas') and alerta['id'] not in nao_entregues]
+        
+        # Acórdãos não entregues voltam a ficar pendentes para a próxima
+        # execução; alertas imediatos têm uma nova tentativa agendada
+        def restaurar(alerta):
+            if alerta['id'] not in nao_entregues:
+                alerta.pop('tentativas', None)
+                return
             
-            try:
-                # Simula processamento
-                estatisticas['processados'] += 1
+            restaurados = nao_entregues[alerta['id']]
+            ja_registrados = set(restaurados)
+            alerta['pendentes'] = restaurados + [i for i in alerta.get('pendentes') or [] if i not in ja_registrados]
+            
+            if alerta.get('frequencia') == 'imediata':
+                alerta['tentativas'] = alerta.get('tentativas', 0) + 1
+                alerta['proxima_tentativa'] = (agora + espera_nova_tentativa(alerta['tentativas'])).isoformat()
+                estatisticas['reagendados'] += 1
+                print(f"Entrega imediata do alerta {alerta['id']} falhou ({alerta['tentativas']}ª vez); nova tentativa em {alerta['proxima_tentativa']}")
+        
+        self.repositorio.modificar(list(nao_entregues) + recuperados, restaurar)
+        
+        return estatisticas
+
+
+class AgendadorAlertas:
+    """
+    Agendador das execuções de alertas por frequência
+    
+    Os alertas ficam em um heap ordenado pela próxima execução, e a thread de
+    monitoramento dorme até o primeiro vencimento. Entradas obsoletas (alerta
+    alterado, removido ou reagendado) são descartadas ao sair do heap, de modo
+    que cada alteração custa O(log n). As alterações chegam pelo repositório,
+    inclusive as gravadas por outros processos, percebidas a cada
+    INTERVALO_SINCRONIZACAO_AGENDADOR segundos.
+    """
+    def __init__(self, alerta_service):
+        self.alerta_service = alerta_service
+        
+        # Heap de (vencimento, ID) e vencimento vigente de cada alerta
+        self._heap = []
+        self._vencimentos = {}
+        
+        self._condicao = threading.Condition()
+        self._thread = None
+        self._parado = False
+        
+        repositorio = alerta_service.repositorio
+        repositorio.observar(self.agendar)
+        
+        for alerta in repositorio.listar():
+            self.agendar(alerta['id'], alerta)
+    
+    def agendar(self, alerta_id, alerta):
+        """
+        Agenda (ou reagenda) um alerta
+        
+        Args:
+            alerta_id (str): ID do alerta
+            alerta (dict): Dados do alerta ou None se removido
+        """
+        vencimento = calcular_vencimento(alerta) if alerta else None
+        
+        with self._condicao:
+            if vencimento is None:
+                self._vencimentos.pop(alerta_id, None)
+                return
+            
+            vencimento = vencimento.timestamp()
+            
+            if self._vencimentos.get(alerta_id) == vencimento:
+                return
+            
+            self._vencimentos[alerta_id] = vencimento
+            heapq.heappush(self._heap, (vencimento, alerta_id))
+            
+            # Reconstrói o heap quando as entradas obsoletas predominam
+            if len(self._heap) > 2 * len(self._vencimentos) + 1000:
+                self._heap = [(v, i) for i, v in self._vencimentos.items()]
+                heapq.heapify(self._heap)
+            
+            # Acorda a thread se o novo vencimento for o mais próximo
+            if self._heap[0] == (vencimento, alerta_id):
+                self._condicao.notify()
+    
+    def proximo_vencimento(self):
+        """
+        Retorna o vencimento mais próximo
+        
+        Returns:
+            datetime: Próximo vencimento ou None se não houver alertas agendados
+        """
+        with self._condicao:
+            self._descartar_obsoletos()
+            return datetime.fromtimestamp(self._heap[0][0]) if self._heap else None
+    
+    def executar_vencidos(self, agora=None):
+        """
+        Executa os alertas cujo vencimento já passou
+        
+        Args:
+            agora (datetime, optional): Momento da execução
+            
+        Returns:
+            dict: Estatísticas de processamento
+        """
+        agora = agora or datetime.now()
+        vencidos = []
+        
+        with self._condicao:
+            self._descartar_obsoletos()
+            
+            while self._heap and self._heap[0][0] <= agora.timestamp():
+                vencimento, alerta_id = heapq.heappop(self._heap)
+                del self._vencimentos[alerta_id]
+                vencidos.append(alerta_id)
+                self._descartar_obsoletos()
+        
+        estatisticas = self.alerta_service.executar_alertas(vencidos, agora)
+        
+        # Alertas executados são reagendados pelo repositório; os demais
+        # (já executados por outro processo, por exemplo) são conferidos aqui
+        for alerta_id in vencidos:
+            if alerta_id not in self._vencimentos:
+                self.agendar(alerta_id, self.alerta_service.repositorio.obter(alerta_id))
+        
+        return estatisticas
+    
+    def iniciar(self):
+        """Inicia a thread de monitoramento"""
+        with self._condicao:
+            if self._thread and self._thread.is_alive():
+                return
+            
+            self._parado = False
+            self._thread = threading.Thread(target=self._monitorar, name='agendador-alertas', daemon=True)
+            self._thread.start()
+    
+    def parar(self):
+        """Interrompe a thread de monitoramento"""
+        with self._condicao:
+            self._parado = True
+            self._condicao.notify()
+        
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+    
+    def _monitorar(self):
+        """Dorme até o próximo vencimento e executa os alertas vencidos"""
+        while True:
+            with self._condicao:
+                self._descartar_obsoletos()
                 
-                # Atualiza última execução
-                alerta['ultima_execucao'] = datetime.now().isoformat()
+                espera = INTERVALO_SINCRONIZACAO_AGENDADOR
+                if self._heap:
+                    espera = min(espera, max(self._heap[0][0] - time.time(), 0))
                 
-                # Simula envio
-                # Em produção, aqui seria feita a busca de novos acórdãos e envio de email
-                estatisticas['enviados'] += 1
+                if espera > 0 and not self._parado:
+                    self._condicao.wait(espera)
                 
+                if self._parado:
+                    return
+            
+            try:
+                # Aplica alterações de outros processos antes de executar
+                self.alerta_service.repositorio.sincronizar()
+                self.executar_vencidos()
             except Exception as e:
-                estatisticas['erros'] += 1
-                print(f"Erro ao processar alerta {alerta['id']}: {e}")
+                print(f"Erro ao executar alertas agendados: {e}")
+    
+    def _descartar_obsoletos(self):
+        """Remove do topo do heap as entradas que não são mais vigentes"""
+        while self._heap and self._vencimentos.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+
+class IndiceAlertas:
+    """
+    Índice reverso de alertas para comparação com novos acórdãos
+    
+    Os alertas são indexados pelos temas e subtemas, e todas as palavras-chave
+    são compiladas em um único automato. Cada acórdão é lido uma única vez, e
+    só os alertas com algum critério atendido são visitados, de modo que o
+    custo depende do tamanho dos textos e da quantidade de correspondências,
+    e não da quantidade de alertas.
+    
+    Um alerta corresponde a um acórdão quando cada tipo de critério preenchido
+    (temas, subtemas, palavras-chave) tem ao menos um item presente no acórdão.
+    Alertas sem critérios correspondem a todos os acórdãos.
+    """
+    # Tipos de critério, do mais seletivo ao menos seletivo; cada alerta é
+    # indexado apenas pelo primeiro tipo preenchido, e os demais são conferidos
+    CRITERIOS = ['palavras_chave', 'subtemas', 'temas']
+    
+    def __init__(self, alertas):
+        # Valor normalizado -> IDs dos alertas, por tipo de critério
+        self._por_criterio = {campo: {} for campo in self.CRITERIOS}
         
-        # Salva alertas
-        self._salvar_alertas()
+        # Demais critérios a conferir, por alerta
+        self._conferir = {}
+        self._sem_criterios = []
         
-        return estatisticas
+        for alerta in alertas:
+            if alerta.get('ativo', True):
+                self._adicionar(alerta)
+        
+        self._automato = AutomatoPalavras(self._por_criterio['palavras_chave'])
     
-    def _carregar_alertas(self):
-        """Carrega alertas do arquivo"""
-        if os.path.exists(self.arquivo_alertas):
-            try:
-                with open(self.arquivo_alertas, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
+    def corresponder(self, acordaos):
+        """
+        Compara um lote de acórdãos com todos os alertas indexados
+        
+        Args:
+            acordaos (list): Acórdãos a comparar
+            
+        Returns:
+            dict: IDs dos acórdãos correspondentes, por ID de alerta
+        """
+        resultado = {}
+        
+        for acordao in acordaos:
+            valores = {
+                'temas': {normalizar_texto(tema) for tema in acordao.get('temas') or []},
+                'subtemas': {normalizar_texto(subtema) for subtema in acordao.get('subtemas') or []},
+                'palavras_chave': self._automato.buscar(f"{acordao.get('titulo', '')}\n{acordao.get('sumario', '')}")
+            }
+            
+            # Visita apenas os alertas cujo critério indexado foi atendido
+            candidatos = set()
+            for campo in self.CRITERIOS:
+                indice = self._por_criterio[campo]
+                
+                for valor in valores[campo]:
+                    candidatos.update(indice.get(valor, ()))
+            
+            for alerta_id in candidatos:
+                if all(criterio & valores[campo] for campo, criterio in self._conferir[alerta_id]):
+                    resultado.setdefault(alerta_id, []).append(identificador_acordao(acordao))
+            
+            for alerta_id in self._sem_criterios:
+                resultado.setdefault(alerta_id, []).append(identificador_acordao(acordao))
+        
+        return resultado
+    
+    def _adicionar(self, alerta):
+        """Indexa um alerta pelo seu critério mais seletivo"""
+        criterios = []
+        
+        for campo in self.CRITERIOS:
+            valores = {normalizar_texto(valor) for valor in alerta.get(campo) or []} - {''}
+            
+            if valores:
+                criterios.append((campo, valores))
+        
+        if not criterios:
+            self._sem_criterios.append(alerta['id'])
+            return
+        
+        campo, valores = criterios[0]
+        for valor in valores:
+            self._por_criterio[campo].setdefault(valor, []).append(alerta['id'])
+        
+        self._conferir[alerta['id']] = criterios[1:]
+
+
+class RepositorioAlertas:
+    """
+    Armazenamento de alertas em journal (JSON Lines) com índices em memória
+    
+    Cada alteração é acrescentada ao final do journal e sincronizada em disco,
+    sem regravar os demais alertas. Uma gravação interrompida deixa no máximo
+    uma linha incompleta no final, descartada na próxima gravação. O journal é
+    compactado (regravado com um registro por alerta, com troca atômica)
+    quando acumula entradas obsoletas demais.
+    
+    Vários processos podem compartilhar o mesmo journal: as gravações são
+    serializadas por um lock de arquivo, e cada leitura aplica apenas as
+    entradas acrescentadas desde a última sincronização (ou recarrega tudo,
+    se o journal tiver sido compactado por outro processo).
+    
+    A primeira linha do journal compactado é um cabeçalho com a geração do
+    arquivo, incrementada a cada compactação. É ela, e não o inode (que o
+    sistema de arquivos pode reaproveitar), que indica a troca do arquivo.
+    """
+    def __init__(self, arquivo_journal, arquivo_legado=None):
+        self.arquivo_journal = arquivo_journal
+        self.arquivo_lock = arquivo_journal + '.lock'
+        
+        # Índices por ID (na ordem de criação) e por usuário
+        self._por_id = {}
+        self._por_usuario = {}
+        
+        # Quantidade de entradas no journal, para decidir a compactação
+        self._entradas = 0
+        
+        # Incrementada a cada alteração aplicada, para detectar mudanças
+        self.versao = 0
+        
+        # Funções chamadas com (ID, alerta ou None) a cada alteração aplicada
+        self._observadores = []
+        
+        # Geração do arquivo (ver _ler_geracao) e posição até onde o journal
+        # já foi aplicado
+        self._geracao = None
+        self._posicao = 0
+        
+        self._lock = threading.RLock()
+        
+        with self._bloqueio_exclusivo():
+            if not os.path.exists(self.arquivo_journal) and arquivo_legado and os.path.exists(arquivo_legado):
+                self._migrar(arquivo_legado)
+            
+            self._sincronizar(descartar_incompleta=True)
+    
+    def sincronizar(self):
+        """
+        Aplica as alterações gravadas por outros processos
+        
+        Returns:
+            int: Versão atual dos alertas
+        """
+        with self._lock:
+            self._sincronizar()
+            return self.versao
+    
+    def observar(self, funcao):
+        """
+        Registra uma função chamada a cada alteração aplicada aos alertas
+        
+        Args:
+            funcao (callable): Função que recebe o ID e o alerta (None se removido)
+        """
+        with self._lock:
+            self._observadores.append(funcao)
+    
+    def obter(self, alerta_id):
+        """Retorna uma cópia do alerta ou None se não encontrado"""
+        with self._lock:
+            self._sincronizar()
+            alerta = self._por_id.get(alerta_id)
+            return alerta.copy() if alerta else None
+    
+    def listar(self):
+        """Retorna cópias de todos os alertas, na ordem de criação"""
+        with self._lock:
+            self._sincronizar()
+            return [alerta.copy() for alerta in self._por_id.values()]
+    
+    def listar_por_usuario(self, usuario_id):
+        """Retorna cópias dos alertas de um usuário, na ordem de criação"""
+        with self._lock:
+            self._sincronizar()
+            return [self._por_id[alerta_id].copy() for alerta_id in self._por_usuario.get(usuario_id, {})]
+    
+    def salvar(self, alerta):
+        """Cria ou substitui um alerta"""
+        self.salvar_varios([alerta])
+    
+    def salvar_varios(self, alertas):
+        """Cria ou substitui vários alertas com uma única gravação"""
+        if not alertas:
+            return
+        
+        with self._bloqueio_exclusivo():
+            self._sincronizar(descartar_incompleta=True)
+            self._acrescentar([{'op': 'salvar', 'alerta': alerta} for alerta in alertas])
+            self._compactar_se_necessario()
+    
+    def modificar(self, alerta_ids, funcao):
+        """
+        Altera alertas existentes de forma atômica
+        
+        A versão mais recente de cada alerta é lida e gravada sob o mesmo
+        lock, de modo que alterações concorrentes de outros processos não
+        são sobrescritas.
+        
+        Args:
+            alerta_ids (list): IDs dos alertas
+            funcao (callable): Função que recebe uma cópia do alerta e a
+                altera; se retornar False, o alerta é mantido sem alteração
+            
+        Returns:
+            list: Alertas alterados
+        """
+        if not alerta_ids:
+            return []
+        
+        with self._bloqueio_exclusivo():
+            self._sincronizar(descartar_incompleta=True)
+            
+            alterados = []
+            for alerta_id in alerta_ids:
+                if alerta_id in self._por_id:
+                    alerta = self._por_id[alerta_id].copy()
+                    if funcao(alerta) is not False:
+                        alterados.append(alerta)
+            
+            if alterados:
+                self._acrescentar([{'op': 'salvar', 'alerta': alerta} for alerta in alterados])
+                self._compactar_se_necessario()
+            
+            return alterados
+    
+    def remover(self, alerta_id):
+        """
+        Remove um alerta
+        
+        Returns:
+            bool: True se removido, False se não encontrado
+        """
+        with self._bloqueio_exclusivo():
+            self._sincronizar(descartar_incompleta=True)
+            
+            if alerta_id not in self._por_id:
+                return False
+            
+            self._acrescentar([{'op': 'remover', 'id': alerta_id}])
+            self._compactar_se_necessario()
+            
+            return True
+    
+    @contextmanager
+    def _bloqueio_exclusivo(self):
+        """Serializa gravações entre threads e entre processos"""
+        with self._lock:
+            with open(self.arquivo_lock, 'a') as arquivo_lock:
+                fcntl.flock(arquivo_lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(arquivo_lock, fcntl.LOCK_UN)
+    
+    def _aplicar_salvar(self, alerta):
+        """Atualiza os índices com um alerta criado ou alterado"""
+        anterior = self._por_id.get(alerta['id'])
+        
+        if anterior is not None and anterior['usuario_id'] != alerta['usuario_id']:
+            self._por_usuario[anterior['usuario_id']].pop(alerta['id'], None)
+        
+        self._por_id[alerta['id']] = alerta
+        self._por_usuario.setdefault(alerta['usuario_id'], {})[alerta['id']] = True
+        
+        for funcao in self._observadores:
+            funcao(alerta['id'], alerta)
+    
+    def _aplicar_remover(self, alerta_id):
+        """Atualiza os índices com um alerta removido"""
+        alerta = self._por_id.pop(alerta_id, None)
         
-        return []
+        if alerta is not None:
+            alertas_usuario = self._por_usuario.get(alerta['usuario_id'], {})
+            alertas_usuario.pop(alerta_id, None)
+            
+            if not alertas_usuario:
+                self._por_usuario.pop(alerta['usuario_id'], None)
+            
+            for funcao in self._observadores:
+                funcao(alerta_id, None)
+    
+    def _aplicar(self, entrada):
+        """Aplica uma entrada do journal aos índices"""
+        if entrada['op'] == 'salvar':
+            self._aplicar_salvar(entrada['alerta'])
+        elif entrada['op'] == 'remover':
+            self._aplicar_remover(entrada['id'])
     
-    def _salvar_alertas(self):
-        """Salva alertas no arquivo"""
-        with open(self.arquivo_alertas, 'w', encoding='utf-8') as f:
-            json.dump(self.alertas, f, ensure_ascii=False, indent=4)
+    def _acrescentar(self, entradas):
+        """Acrescenta entradas ao journal, as sincroniza em disco e as aplica"""
+        linhas = ''.join(json.dumps(entrada, ensure_ascii=False) + '\n' for entrada in entradas)
+        
+        with open(self.arquivo_journal, 'a', encoding='utf-8') as f:
+            f.write(linhas)
+            f.flush()
+            os.fsync(f.fileno())
+        
+        # Aplica as entradas lendo-as do journal, como qualquer outro processo
+        self._sincronizar()
+    
+    def _sincronizar(self, descartar_incompleta=False):
+        """
+        Aplica aos índices as entradas do journal ainda não aplicadas
+        
+        Args:
+            descartar_incompleta (bool): Se True, trunca uma linha final
+                incompleta; só é seguro com o lock exclusivo, quando nenhum
+                outro processo pode estar no meio de uma gravação
+        """
+        try:
+            f = open(self.arquivo_journal, 'rb')
+        except FileNotFoundError:
+            return
+        
+        with f:
+            geracao = self._ler_geracao(f)
+            tamanho = os.fstat(f.fileno()).st_size
+            
+            # Journal substituído (compactação) ou encolhido: recarrega do início
+            if geracao != self._geracao or tamanho < self._posicao:
+                self._por_id = {}
+                self._por_usuario = {}
+                self._entradas = 0
+                self._geracao = geracao
+                self._posicao = 0
+                self.versao += 1
+            
+            if tamanho == self._posicao:
+                return
+            
+            f.seek(self._posicao)
+            
+            for linha in f:
+                try:
+                    # Linha sem quebra no final é uma gravação em andamento ou interrompida
+                    if not linha.endswith(b'\n'):
+                        raise ValueError('Linha incompleta')
+                    
+                    entrada = json.loads(linha)
+                except ValueError:
+                    break
+                
+                self._posicao += len(linha)
+                
+                if entrada['op'] == 'cabecalho':
+                    continue
+                
+                self._aplicar(entrada)
+                self._entradas += 1
+                self.versao += 1
+        
+        # Descarta o trecho inválido para que novas entradas fiquem legíveis
+        if descartar_incompleta and self._posicao < os.path.getsize(self.arquivo_journal):
+            with open(self.arquivo_journal, 'r+b') as f:
+                f.truncate(self._posicao)
+    
+    def _ler_geracao(self, f):
+        """
+        Lê a geração no cabeçalho do journal aberto
+        
+        Returns:
+            int: Geração do arquivo; 0 se não houver cabeçalho (journal ainda
+            não compactado)
+        """
+        f.seek(0)
+        linha = f.readline()
+        
+        try:
+            entrada = json.loads(linha) if linha.endswith(b'\n') else {}
+        except ValueError:
+            entrada = {}
+        
+        return entrada.get('geracao', 0) if entrada.get('op') == 'cabecalho' else 0
+    
+    def _migrar(self, arquivo_legado):
+        """Importa alertas do arquivo JSON usado antes do journal"""
+        try:
+            with open(arquivo_legado, 'r', encoding='utf-8') as f:
+                alertas = json.load(f)
+        except ValueError:
+            alertas = []
+        
+        for alerta in alertas:
+            self._aplicar_salvar(alerta)
+        
+        self._compactar()
+    
+    def _compactar_se_necessario(self):
+        """Compacta o journal se houver entradas obsoletas demais"""
+        if self._entradas >= ENTRADAS_MINIMAS_COMPACTACAO and self._entradas > FATOR_COMPACTACAO * len(self._por_id):
+            self._compactar()
+    
+    def _compactar(self):
+        """Regrava o journal com um registro por alerta, de forma atômica"""
+        arquivo_temp = f'{self.arquivo_journal}.{uuid.uuid4().hex}.tmp'
+        
+        with open(arquivo_temp, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'op': 'cabecalho', 'geracao': (self._geracao or 0) + 1}) + '\n')
+            
+            for alerta in self._por_id.values():
+                f.write(json.dumps({'op': 'salvar', 'alerta': alerta}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        
+        os.replace(arquivo_temp, self.arquivo_journal)
+        
+        # O novo arquivo é relido na próxima sincronização
+        self._geracao = None
+        self._sincronizar()
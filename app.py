@@ -1,26 +1,91 @@
-from flask import Flask, request, jsonify, render_template, send_file
+from flask import Flask, Response, g, request, jsonify, render_template, send_file, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 import os
-import json
-import tempfile
-from datetime import datetime
+import time
 
 # Importa os módulos da aplicação
-from jurisprudencia_api import TCUJurisprudenciaAPI, AnalisadorAcordaos, GeradorInsights
-from exportacao_service import ExportacaoService
-from alerta_service import AlertaService
+from rotas_api import RotasAPI, Requisicao
+from alerta_service import obter_alerta_service
+from serializacao import serializar_json, desserializar_json
+from metricas import LATENCIA_ROTAS, medir_etapa
+
+class ProvedorJSON(DefaultJSONProvider):
+    """Serializa as respostas com o serializador rápido (ver serializacao.py)"""
+    def dumps(self, obj, **kwargs):
+        return serializar_json(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return desserializar_json(s)
+    
+    def response(self, *args, **kwargs):
+        dados = self._prepare_response_obj(args, kwargs)
+        
+        with medir_etapa('serializacao'):
+            corpo = serializar_json(dados)
+        
+        return self._app.response_class(corpo, mimetype=self.mimetype)
 
 # Inicializa a aplicação Flask
 app = Flask(__name__)
+app.json = ProvedorJSON(app)
 
-# Inicializa os serviços
-api_client = TCUJurisprudenciaAPI()
-analisador = AnalisadorAcordaos()
-gerador_insights = GeradorInsights()
-exportacao_service = ExportacaoService()  # Usando a classe correta
+# Rotas /api/* (lógica comum com app_async.py) e os serviços que elas usam
+rotas = RotasAPI()
 
-# Configuração
-RESULTADOS_POR_PAGINA = 20
-DIRETORIO_TEMP = tempfile.gettempdir()
+def _responder(rota, *args):
+    """
+    Executa uma rota de RotasAPI com a requisição atual
+    
+    Args:
+        rota (callable): Método de RotasAPI
+        *args: Parâmetros do caminho (ex.: acordao_id)
+        
+    Returns:
+        Response: Resposta do Flask
+    """
+    corpo = request.get_json(silent=True) if request.method == 'POST' else None
+    resposta = rota(Requisicao(request.method, request.args, request.headers, corpo), *args)
+    
+    if resposta.arquivo is not None:
+        return send_file(resposta.arquivo, as_attachment=True, download_name=resposta.nome_arquivo)
+    
+    if resposta.fluxo is not None:
+        return Response(stream_with_context(resposta.fluxo), status=resposta.status, mimetype=resposta.tipo, headers=resposta.cabecalhos)
+    
+    if resposta.corpo is not None:
+        return Response(resposta.corpo, status=resposta.status, content_type=resposta.tipo, headers=resposta.cabecalhos)
+    
+    if resposta.dados is not None:
+        return jsonify(resposta.dados), resposta.status, resposta.cabecalhos
+    
+    return Response(status=resposta.status, headers=resposta.cabecalhos)
+
+@app.before_request
+def _iniciar_medicao():
+    g.inicio_requisicao = time.perf_counter()
+
+# O serviço de alertas é criado na primeira requisição, iniciando a execução
+# dos alertas agendados (interrompida no encerramento do processo)
+@app.before_request
+def _iniciar_alertas():
+    obter_alerta_service()
+
+@app.after_request
+def _registrar_medicao(resposta):
+    inicio = g.pop('inicio_requisicao', None)
+    
+    # A rota é registrada pelo modelo (ex.: /api/acordaos/<string:acordao_id>),
+    # não pela URL, para manter poucas séries
+    if inicio is not None:
+        rota = request.url_rule.rule if request.url_rule else 'desconhecida'
+        LATENCIA_ROTAS.observar(time.perf_counter() - inicio, rota, request.method, str(resposta.status_code))
+    
+    return resposta
+
+# Métricas no formato do Prometheus
+@app.route('/metrics', methods=['GET'])
+def exportar_metricas():
+    return _responder(rotas.exportar_metricas)
 
 # Rota principal - página inicial
 @app.route('/')
@@ -30,262 +95,81 @@ def index():
 # API para buscar acórdãos
 @app.route('/api/acordaos', methods=['GET'])
 def buscar_acordaos():
-    try:
-        # Parâmetros de paginação
-        pagina = int(request.args.get('pagina', 0))
-        limite = int(request.args.get('limite', RESULTADOS_POR_PAGINA))
-        
-        # Parâmetros de filtro
-        filtros = {}
-        
-        # Filtros de colegiado
-        if 'colegiado' in request.args:
-            filtros['colegiado'] = request.args.get('colegiado')
-        
-        # Filtros de relator
-        if 'relator' in request.args:
-            filtros['relator'] = request.args.get('relator')
-        
-        # Filtros de data
-        if 'data_inicio' in request.args and 'data_fim' in request.args:
-            filtros['data_inicio'] = request.args.get('data_inicio')
-            filtros['data_fim'] = request.args.get('data_fim')
-        
-        # Filtros de texto
-        if 'texto' in request.args:
-            filtros['texto'] = request.args.get('texto')
-        
-        # Exclusões
-        if 'excluir_termos' in request.args:
-            termos = request.args.get('excluir_termos').split(',')
-            filtros['excluir_termos'] = [termo.strip() for termo in termos]
-        
-        if 'excluir_relacao' in request.args:
-            filtros['excluir_relacao'] = request.args.get('excluir_relacao').lower() == 'true'
-        
-        # Busca acórdãos
-        acordaos = api_client.buscar_acordaos(pagina, limite)
-        
-        # Aplica filtros
-        if filtros:
-            acordaos = api_client.filtrar_acordaos(acordaos, filtros)
-        
-        # Classifica acórdãos
-        if 'classificar' in request.args and request.args.get('classificar').lower() == 'true':
-            acordaos = analisador.classificar_acordaos(acordaos)
-        
-        return jsonify({
-            'total': len(acordaos),
-            'pagina': pagina,
-            'limite': limite,
-            'acordaos': acordaos
-        })
-    
-    except Exception as e:
-        return jsonify({'erro': str(e)}), 500
+    return _responder(rotas.buscar_acordaos)
+
+# API com as contagens por colegiado, relator, ano e tema dos acórdãos do
+# acervo que atendem aos filtros (mesmos parâmetros de /api/acordaos)
+@app.route('/api/acordaos/facetas', methods=['GET'])
+def contar_facetas():
+    return _responder(rotas.contar_facetas)
+
+# API com a linha do tempo de acórdãos por dia, mês ou ano, opcionalmente
+# filtrada e detalhada por colegiado ou tema
+@app.route('/api/acordaos/linha-tempo', methods=['GET'])
+def consultar_linha_tempo():
+    return _responder(rotas.consultar_linha_tempo)
+
+# API com sugestões de relator, tema ou subtema para o que o usuário digita
+# (ex.: /api/autocompletar?campo=relator&prefixo=zym)
+@app.route('/api/autocompletar', methods=['GET'])
+def autocompletar():
+    return _responder(rotas.autocompletar)
+
+# API para buscar vários acórdãos de uma vez (GET com ?ids=a,b,c ou POST
+# com {"ids": [...], "classificar": true})
+@app.route('/api/acordaos/batch', methods=['GET', 'POST'])
+def buscar_acordaos_lote():
+    return _responder(rotas.buscar_acordaos_lote)
 
 # API para buscar um acórdão específico
 @app.route('/api/acordaos/<string:acordao_id>', methods=['GET'])
 def buscar_acordao(acordao_id):
-    try:
-        acordao = api_client.buscar_acordao_por_id(acordao_id)
-        
-        if not acordao:
-            return jsonify({'erro': 'Acórdão não encontrado'}), 404
-        
-        # Classifica o acórdão
-        if 'classificar' in request.args and request.args.get('classificar').lower() == 'true':
-            acordao = analisador.classificar_acordao(acordao)
-        
-        return jsonify(acordao)
-    
-    except Exception as e:
-        return jsonify({'erro': str(e)}), 500
+    return _responder(rotas.buscar_acordao, acordao_id)
 
 # API para buscar acórdãos similares
 @app.route('/api/recomendacao/acordao/<string:acordao_id>', methods=['GET'])
 def recomendar_similares(acordao_id):
-    try:
-        # Parâmetros
-        limite = int(request.args.get('limite', 5))
-        
-        # Busca acórdão de referência
-        acordao = api_client.buscar_acordao_por_id(acordao_id)
-        
-        if not acordao:
-            return jsonify({'erro': 'Acórdão não encontrado'}), 404
-        
-        # Busca acórdãos para comparação
-        acordaos_comparacao = api_client.buscar_acordaos(0, 100)
-        
-        # Encontra similares
-        similares = analisador.encontrar_acordaos_similares(
-            acordaos_comparacao, 
-            acordao, 
-            limite
-        )
-        
-        return jsonify(similares)
-    
-    except Exception as e:
-        return jsonify({'erro': str(e)}), 500
+    return _responder(rotas.recomendar_similares, acordao_id)
 
 # API para buscar acórdãos por texto similar
 @app.route('/api/recomendacao/texto', methods=['POST'])
 def recomendar_por_texto():
-    try:
-        # Parâmetros
-        dados = request.get_json()
-        texto = dados.get('texto', '')
-        limite = int(request.args.get('limite', 5))
-        
-        if not texto:
-            return jsonify({'erro': 'Texto não fornecido'}), 400
-        
-        # Busca acórdãos para comparação
-        acordaos_comparacao = api_client.buscar_acordaos(0, 100)
-        
-        # Encontra similares por texto
-        similares = analisador.encontrar_acordaos_similares_por_texto(
-            acordaos_comparacao, 
-            texto, 
-            limite
-        )
-        
-        return jsonify(similares)
-    
-    except Exception as e:
-        return jsonify({'erro': str(e)}), 500
+    return _responder(rotas.recomendar_por_texto)
 
 # API para gerar insights
 @app.route('/api/insights/acordao/<string:acordao_id>', methods=['GET'])
 def gerar_insight(acordao_id):
-    try:
-        # Parâmetros
-        formato = request.args.get('formato', 'post_padrao')
-        
-        # Busca acórdão
-        acordao = api_client.buscar_acordao_por_id(acordao_id)
-        
-        if not acordao:
-            return jsonify({'erro': 'Acórdão não encontrado'}), 404
-        
-        # Gera insight
-        insight = gerador_insights.gerar_insight(acordao, formato)
-        
-        return jsonify({
-            'acordao_id': acordao_id,
-            'formato': formato,
-            'insight': insight
-        })
-    
-    except Exception as e:
-        return jsonify({'erro': str(e)}), 500
+    return _responder(rotas.gerar_insight, acordao_id)
 
 # API para gerar legendas para LinkedIn
 @app.route('/api/linkedin/legenda/<string:acordao_id>', methods=['GET'])
 def gerar_legenda_linkedin(acordao_id):
-    try:
-        from gerador_legendas_linkedin import GeradorLegendasLinkedIn
-        
-        # Inicializa o gerador de legendas
-        gerador = GeradorLegendasLinkedIn()
-        
-        # Busca acórdão
-        acordao = api_client.buscar_acordao_por_id(acordao_id)
-        
-        if not acordao:
-            return jsonify({'erro': 'Acórdão não encontrado'}), 404
-        
-        # Gera legenda
-        legenda = gerador.gerar_legenda(acordao)
-        
-        return jsonify({
-            'acordao_id': acordao_id,
-            'legenda': legenda
-        })
-    
-    except Exception as e:
-        return jsonify({'erro': str(e)}), 500
+    return _responder(rotas.gerar_legenda_linkedin, acordao_id)
 
 # API para exportar acórdãos
 @app.route('/api/exportar', methods=['POST'])
 def exportar_acordaos():
-    try:
-        # Parâmetros
-        dados = request.get_json()
-        formato = dados.get('formato', 'csv')
-        acordaos = dados.get('acordaos', [])
-        
-        if not acordaos:
-            return jsonify({'erro': 'Nenhum acórdão fornecido para exportação'}), 400
-        
-        # Cria nome de arquivo temporário
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        nome_arquivo = f"acordaos_exportados_{timestamp}"
-        
-        # Define extensão baseada no formato
-        extensoes = {
-            'csv': '.csv',
-            'json': '.json',
-            'pdf': '.pdf'
-        }
-        
-        extensao = extensoes.get(formato, '.txt')
-        caminho_arquivo = os.path.join(DIRETORIO_TEMP, nome_arquivo + extensao)
-        
-        # Exporta acórdãos
-        resultado = exportacao_service.exportar(acordaos, formato, caminho_arquivo)
-        
-        if not resultado:
-            return jsonify({'erro': 'Falha ao exportar acórdãos'}), 500
-        
-        # Retorna o arquivo para download
-        return send_file(
-            caminho_arquivo,
-            as_attachment=True,
-            download_name=nome_arquivo + extensao
-        )
-    
-    except Exception as e:
-        return jsonify({'erro': str(e)}), 500
+    return _responder(rotas.exportar_acordaos)
+
+# API para criar exportações em segundo plano
+@app.route('/api/exportacoes', methods=['POST'])
+def criar_exportacao():
+    return _responder(rotas.criar_exportacao)
+
+# API para consultar o andamento de uma exportação
+@app.route('/api/exportacoes/<string:job_id>', methods=['GET'])
+def consultar_exportacao(job_id):
+    return _responder(rotas.consultar_exportacao, job_id)
+
+# API para baixar o arquivo de uma exportação concluída
+@app.route('/api/exportacoes/<string:job_id>/download', methods=['GET'])
+def baixar_exportacao(job_id):
+    return _responder(rotas.baixar_exportacao, job_id)
 
 # API para configurar alertas
 @app.route('/api/alertas', methods=['POST'])
 def configurar_alerta():
-    try:
-        # Parâmetros
-        dados = request.get_json()
-        usuario_id = dados.get('usuario_id')
-        email = dados.get('email')
-        temas = dados.get('temas')
-        subtemas = dados.get('subtemas')
-        palavras_chave = dados.get('palavras_chave')
-        frequencia = dados.get('frequencia', 'diaria')
-        
-        if not usuario_id or not email:
-            return jsonify({'erro': 'Usuário ID e email são obrigatórios'}), 400
-        
-        # Inicializa serviço de alertas
-        alerta_service = AlertaService()
-        
-        # Adiciona alerta
-        alerta_id = alerta_service.adicionar_alerta(
-            usuario_id=usuario_id,
-            email=email,
-            temas=temas,
-            subtemas=subtemas,
-            palavras_chave=palavras_chave,
-            frequencia=frequencia
-        )
-        
-        return jsonify({
-            'alerta_id': alerta_id,
-            'mensagem': 'Alerta configurado com sucesso'
-        })
-    
-    except Exception as e:
-        return jsonify({'erro': str(e)}), 500
+    return _responder(rotas.configurar_alerta)
 
 # Inicializa a aplicação
 if __name__ == '__main__':
@@ -317,9 +201,14 @@ if __name__ == '__main__':
                     <ul>
                         <li><code>/api/acordaos</code> - Buscar acórdãos</li>
                         <li><code>/api/acordaos/{id}</code> - Buscar acórdão específico</li>
+                        <li><code>/api/acordaos/batch</code> - Buscar vários acórdãos de uma vez</li>
+                        <li><code>/api/acordaos/facetas</code> - Contagens por colegiado, relator, ano e tema</li>
+                        <li><code>/api/acordaos/linha-tempo</code> - Linha do tempo por dia, mês ou ano</li>
+                        <li><code>/api/autocompletar</code> - Sugestões de relator, tema e subtema</li>
                         <li><code>/api/recomendacao/acordao/{id}</code> - Buscar acórdãos similares</li>
                         <li><code>/api/insights/acordao/{id}</code> - Gerar insights</li>
                         <li><code>/api/exportar</code> - Exportar acórdãos</li>
+                        <li><code>/api/exportacoes</code> - Exportar acórdãos em segundo plano</li>
                     </ul>
                 </div>
             </body>
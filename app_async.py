@@ -0,0 +1,207 @@
+import os
+import asyncio
+import functools
+import time
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, JSONResponse, StreamingResponse, FileResponse
+
+# Importa os módulos da aplicação
+from rotas_api import RotasAPI, Requisicao
+from alerta_service import obter_alerta_service
+from serializacao import serializar_json
+from metricas import LATENCIA_ROTAS, medir_etapa
+
+class RespostaJSON(JSONResponse):
+    """Resposta JSON com o serializador rápido (ver serializacao.py)"""
+    def render(self, content):
+        with medir_etapa('serializacao'):
+            return serializar_json(content)
+
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    """Inicia a execução dos alertas agendados e a interrompe no encerramento"""
+    alerta_service = await aguardar_io(obter_alerta_service)
+    yield
+    alerta_service.parar_monitoramento()
+    rotas.corpus.parar()
+
+
+# Inicializa a aplicação ASGI, com as mesmas rotas /api/* de app.py
+app = FastAPI(title='TCU Jurisprudência', default_response_class=RespostaJSON, lifespan=ciclo_de_vida)
+
+# Rotas /api/* (lógica comum com app.py) e os serviços que elas usam
+rotas = RotasAPI()
+
+# Threads para rotas que passam a maior parte do tempo esperando I/O
+# bloqueante (alertas, fila de exportações, primeira carga do acervo)
+MAX_THREADS_IO = int(os.environ.get('MAX_THREADS_IO', 64))
+
+# Threads para as rotas que processam o acervo já carregado (busca,
+# classificação, similaridade, exportação), limitadas para não competir com
+# o laço de eventos
+MAX_THREADS_CPU = int(os.environ.get('MAX_THREADS_CPU', os.cpu_count() or 2))
+
+executor_io = ThreadPoolExecutor(max_workers=MAX_THREADS_IO, thread_name_prefix='io')
+executor_cpu = ThreadPoolExecutor(max_workers=MAX_THREADS_CPU, thread_name_prefix='cpu')
+
+
+async def aguardar_io(funcao, *args, **kwargs):
+    """Executa uma chamada bloqueante de I/O sem bloquear o laço de eventos"""
+    return await asyncio.get_running_loop().run_in_executor(executor_io, functools.partial(funcao, *args, **kwargs))
+
+
+async def aguardar_cpu(funcao, *args, **kwargs):
+    """Executa uma etapa de CPU no executor dedicado"""
+    return await asyncio.get_running_loop().run_in_executor(executor_cpu, functools.partial(funcao, *args, **kwargs))
+
+
+async def _responder(request, rota, *args, aguardar=aguardar_cpu):
+    """
+    Executa uma rota de RotasAPI em uma thread, fora do laço de eventos
+    
+    Args:
+        request (Request): Requisição recebida
+        rota (callable): Método de RotasAPI
+        *args: Parâmetros do caminho (ex.: acordao_id)
+        aguardar (callable): aguardar_cpu ou aguardar_io, conforme a rota
+        
+    Returns:
+        Response: Resposta do Starlette
+    """
+    # Enquanto o acervo não foi carregado, a rota espera a API do TCU: roda no
+    # executor de I/O para não ocupar as threads de CPU com essa espera
+    if aguardar is aguardar_cpu and not rotas.corpus.carregado():
+        aguardar = aguardar_io
+    
+    corpo = None
+    
+    if request.method == 'POST':
+        try:
+            corpo = await request.json()
+        except ValueError:
+            corpo = None
+    
+    resposta = await aguardar(rota, Requisicao(request.method, request.query_params, request.headers, corpo), *args)
+    
+    # Os geradores das respostas em fluxo são percorridos pelo Starlette em
+    # threads, sem bloquear o laço de eventos
+    if resposta.arquivo is not None:
+        return FileResponse(resposta.arquivo, filename=resposta.nome_arquivo)
+    
+    if resposta.fluxo is not None:
+        return StreamingResponse(resposta.fluxo, status_code=resposta.status, media_type=resposta.tipo, headers=resposta.cabecalhos)
+    
+    if resposta.corpo is not None:
+        return Response(resposta.corpo, status_code=resposta.status, media_type=resposta.tipo, headers=resposta.cabecalhos)
+    
+    if resposta.dados is not None:
+        return RespostaJSON(resposta.dados, status_code=resposta.status, headers=resposta.cabecalhos)
+    
+    return Response(status_code=resposta.status, headers=resposta.cabecalhos)
+
+@app.middleware('http')
+async def registrar_medicao(request: Request, call_next):
+    inicio = time.perf_counter()
+    resposta = await call_next(request)
+    
+    # A rota é registrada pelo modelo (ex.: /api/acordaos/{acordao_id}), não pela URL
+    rota = request.scope.get('route')
+    rota = rota.path if rota is not None else 'desconhecida'
+    LATENCIA_ROTAS.observar(time.perf_counter() - inicio, rota, request.method, str(resposta.status_code))
+    
+    return resposta
+
+# Métricas no formato do Prometheus
+@app.get('/metrics')
+async def exportar_metricas(request: Request):
+    return await _responder(request, rotas.exportar_metricas)
+
+# API para buscar acórdãos
+@app.get('/api/acordaos')
+async def buscar_acordaos(request: Request):
+    return await _responder(request, rotas.buscar_acordaos)
+
+# API com as contagens por faceta dos acórdãos que atendem aos filtros
+# (declarada antes da rota /api/acordaos/{acordao_id})
+@app.get('/api/acordaos/facetas')
+async def contar_facetas(request: Request):
+    return await _responder(request, rotas.contar_facetas)
+
+# API com a linha do tempo de acórdãos (declarada antes da rota
+# /api/acordaos/{acordao_id})
+@app.get('/api/acordaos/linha-tempo')
+async def consultar_linha_tempo(request: Request):
+    return await _responder(request, rotas.consultar_linha_tempo)
+
+# API com sugestões de relator, tema ou subtema para o que o usuário digita
+@app.get('/api/autocompletar')
+async def autocompletar(request: Request):
+    return await _responder(request, rotas.autocompletar)
+
+# API para buscar vários acórdãos de uma vez (declarada antes da rota
+# /api/acordaos/{acordao_id}, que também corresponderia a "batch")
+@app.api_route('/api/acordaos/batch', methods=['GET', 'POST'])
+async def buscar_acordaos_lote(request: Request):
+    return await _responder(request, rotas.buscar_acordaos_lote)
+
+# API para buscar um acórdão específico
+@app.get('/api/acordaos/{acordao_id}')
+async def buscar_acordao(acordao_id: str, request: Request):
+    return await _responder(request, rotas.buscar_acordao, acordao_id)
+
+# API para buscar acórdãos similares
+@app.get('/api/recomendacao/acordao/{acordao_id}')
+async def recomendar_similares(acordao_id: str, request: Request):
+    return await _responder(request, rotas.recomendar_similares, acordao_id)
+
+# API para buscar acórdãos por texto similar
+@app.post('/api/recomendacao/texto')
+async def recomendar_por_texto(request: Request):
+    return await _responder(request, rotas.recomendar_por_texto)
+
+# API para gerar insights
+@app.get('/api/insights/acordao/{acordao_id}')
+async def gerar_insight(acordao_id: str, request: Request):
+    return await _responder(request, rotas.gerar_insight, acordao_id)
+
+# API para gerar legendas para LinkedIn
+@app.get('/api/linkedin/legenda/{acordao_id}')
+async def gerar_legenda_linkedin(acordao_id: str, request: Request):
+    return await _responder(request, rotas.gerar_legenda_linkedin, acordao_id)
+
+# API para exportar acórdãos
+@app.post('/api/exportar')
+async def exportar_acordaos(request: Request):
+    return await _responder(request, rotas.exportar_acordaos)
+
+# API para criar exportações em segundo plano
+@app.post('/api/exportacoes')
+async def criar_exportacao(request: Request):
+    return await _responder(request, rotas.criar_exportacao, aguardar=aguardar_io)
+
+# API para consultar o andamento de uma exportação
+@app.get('/api/exportacoes/{job_id}')
+async def consultar_exportacao(job_id: str, request: Request):
+    return await _responder(request, rotas.consultar_exportacao, job_id, aguardar=aguardar_io)
+
+# API para baixar o arquivo de uma exportação concluída
+@app.get('/api/exportacoes/{job_id}/download')
+async def baixar_exportacao(job_id: str, request: Request):
+    return await _responder(request, rotas.baixar_exportacao, job_id, aguardar=aguardar_io)
+
+# API para configurar alertas (a gravação no journal, com lock de arquivo e
+# fsync, é feita no executor de I/O)
+@app.post('/api/alertas')
+async def configurar_alerta(request: Request):
+    return await _responder(request, rotas.configurar_alerta, aguardar=aguardar_io)
+
+# Inicializa a aplicação
+if __name__ == '__main__':
+    import uvicorn
+    
+    port = int(os.environ.get('PORT', 5000))
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,110 @@
+from collections import Counter
+
+from busca_texto import normalizar_texto
+
+# Campos com sugestões e a função que extrai os valores de um acórdão
+CAMPOS_AUTOCOMPLETAR = {
+    'relator': lambda acordao: [acordao.get('relator')],
+    'tema': lambda acordao: acordao.get('temas') or [],
+    'subtema': lambda acordao: acordao.get('subtemas') or []
+}
+
+# Sugestões guardadas em cada nó (e máximo por consulta)
+MAX_SUGESTOES = 10
+
+
+class IndiceAutocompletar:
+    """
+    Árvores de prefixos (tries) com as sugestões de relator, tema e subtema
+    
+    Os valores são normalizados com normalizar_texto (sem acentos nem
+    maiúsculas) e inseridos a partir do início de cada palavra, de modo que
+    'zym' sugere 'Benjamin Zymler'. Cada nó guarda as sugestões mais
+    frequentes (quantidade de acórdãos) sob o prefixo: uma consulta apenas
+    percorre os caracteres digitados, sem consultar o acervo.
+    """
+    def __init__(self, acordaos, limite=MAX_SUGESTOES):
+        """
+        Args:
+            acordaos (iterable): Acórdãos do acervo
+            limite (int): Sugestões guardadas em cada nó
+        """
+        self.limite = limite
+        
+        # Quantidade de acórdãos com cada valor, por campo
+        frequencias = {campo: Counter() for campo in CAMPOS_AUTOCOMPLETAR}
+        
+        for acordao in acordaos:
+            for campo, extrair in CAMPOS_AUTOCOMPLETAR.items():
+                frequencias[campo].update({valor for valor in extrair(acordao) if valor})
+        
+        # Campo -> nó raiz; cada nó é (filhos por caractere, sugestões)
+        self.raizes = {campo: self._montar(contagem) for campo, contagem in frequencias.items()}
+    
+    def sugerir(self, campo, prefixo, limite=None):
+        """
+        Sugestões para o que o usuário digitou
+        
+        Args:
+            campo (str): 'relator', 'tema' ou 'subtema'
+            prefixo (str): Texto digitado (sem distinção de acentos e maiúsculas)
+            limite (int, optional): Quantidade máxima de sugestões (no máximo, e
+                por padrão, as guardadas em cada nó)
+            
+        Returns:
+            list: [{'valor', 'total'}], da mais frequente à menos frequente
+            
+        Raises:
+            ValueError: Se o campo for desconhecido ou o limite maior que a
+            quantidade de sugestões guardadas em cada nó
+        """
+        if campo not in self.raizes:
+            raise ValueError(f'Campo inválido: {campo} (opções: {", ".join(CAMPOS_AUTOCOMPLETAR)})')
+        
+        if limite is None:
+            limite = self.limite
+        
+        # Cada nó só guarda as primeiras sugestões; um limite maior devolveria
+        # menos sugestões do que as existentes sem avisar
+        if limite > self.limite:
+            raise ValueError(f'No máximo {self.limite} sugestões por consulta')
+        
+        no = self.raizes[campo]
+        
+        for caractere in normalizar_texto(prefixo):
+            no = no[0].get(caractere)
+            
+            if no is None:
+                return []
+        
+        return [{'valor': valor, 'total': total} for valor, total in no[1][:max(limite, 0)]]
+    
+    def _montar(self, contagem):
+        """Monta a trie de um campo a partir das frequências dos valores"""
+        raiz = ({}, [])
+        
+        # Os valores entram do mais frequente ao menos, de modo que as
+        # primeiras sugestões de cada nó são as de maior frequência
+        for valor, total in sorted(contagem.items(), key=lambda item: (-item[1], item[0])):
+            normalizado = normalizar_texto(valor)
+            sugestao = (valor, total)
+            
+            self._guardar(raiz, sugestao)
+            
+            inicios = [0] + [posicao + 1 for posicao, caractere in enumerate(normalizado) if caractere == ' ']
+            
+            for inicio in inicios:
+                no = raiz
+                
+                for caractere in normalizado[inicio:]:
+                    no = no[0].setdefault(caractere, ({}, []))
+                    self._guardar(no, sugestao)
+        
+        return raiz
+    
+    def _guardar(self, no, sugestao):
+        """Acrescenta a sugestão ao nó, se ainda houver espaço e ela não estiver lá"""
+        sugestoes = no[1]
+        
+        if len(sugestoes) < self.limite and sugestao not in sugestoes:
+            sugestoes.append(sugestao)
@@ -0,0 +1,241 @@
+"""
+Benchmarks das principais operações sobre acervos sintéticos de 1 mil a 1 milhão de acórdãos
+
+Mede a filtragem, as duas funções de similaridade, a classificação, todos os
+exportadores e a comparação de alertas com novos acórdãos em cada escala. Os
+resultados são gravados em JSON (com o commit atual), e podem ser comparados
+com os de outro commit.
+
+Uso:
+    python benchmarks/benchmark_desempenho.py
+    python benchmarks/benchmark_desempenho.py --escalas 1000 10000 100000 1000000
+    python benchmarks/benchmark_desempenho.py --casos filtrar classificar --comparar benchmarks/resultados/anterior.json
+    
+Acervos de 1 milhão de acórdãos ocupam alguns GB de memória.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus_sintetico import gerar_corpus, gerar_alertas
+from jurisprudencia_api import TCUJurisprudenciaAPI, AnalisadorAcordaos
+from exportacao_service import ExportadorAcordaos
+from alerta_service import IndiceAlertas
+
+ESCALAS_PADRAO = [1000, 10000, 100000]
+
+# Maior escala de cada caso (os demais não têm limite)
+LIMITES_ESCALA = {
+    'exportar_pdf': 10000,
+    'corresponder_alertas': 100000
+}
+
+# Quantidade de alertas comparados com o acervo (o vocabulário do acervo
+# sintético é pequeno, e cada acórdão corresponde a muitos alertas)
+QUANTIDADE_ALERTAS = 1000
+
+# Diferença relativa a partir da qual um caso é considerado uma regressão
+TOLERANCIA_REGRESSAO = 0.2
+
+DIRETORIO_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados')
+
+
+class CasoIndisponivel(Exception):
+    """Caso que não pode ser medido neste ambiente (ex.: dependência opcional ausente)"""
+
+
+def criar_casos(diretorio_temp):
+    """
+    Define os casos medidos
+    
+    Args:
+        diretorio_temp (str): Diretório para os arquivos exportados
+        
+    Returns:
+        dict: Função de preparação por nome do caso; a preparação recebe o
+        acervo e retorna a função medida
+    """
+    api = TCUJurisprudenciaAPI()
+    analisador = AnalisadorAcordaos()
+    exportador = ExportadorAcordaos()
+    
+    filtros = {
+        'colegiado': 'Plenário',
+        'texto': 'licitação',
+        'excluir_termos': ['aposentadoria', 'pensão'],
+        'excluir_relacao': True
+    }
+    
+    def exportar(metodo, extensao):
+        caminho = os.path.join(diretorio_temp, f'benchmark{extensao}')
+        
+        # Os exportadores informam falhas (inclusive a falta do pyarrow ou do
+        # reportlab) pelo retorno, e não por exceção
+        def executar(acordaos):
+            if not metodo(acordaos, caminho):
+                raise CasoIndisponivel(f'{metodo.__name__} falhou')
+        
+        return lambda acordaos: lambda: executar(acordaos)
+    
+    def corresponder_alertas(acordaos):
+        indice = IndiceAlertas(gerar_alertas(QUANTIDADE_ALERTAS))
+        return lambda: indice.corresponder(acordaos)
+    
+    return {
+        'filtrar': lambda acordaos: lambda: api.filtrar_acordaos(acordaos, filtros),
+        'similares': lambda acordaos: lambda: analisador.encontrar_acordaos_similares(acordaos, acordaos[0], 10),
+        'similares_por_texto': lambda acordaos: lambda: analisador.encontrar_acordaos_similares_por_texto(acordaos, 'sobrepreço em obra pública com BDI elevado', 10),
+        'classificar': lambda acordaos: lambda: analisador.classificar_acordaos(acordaos),
+        'exportar_csv': exportar(exportador.exportar_csv, '.csv'),
+        'exportar_json': exportar(exportador.exportar_json, '.json'),
+        'exportar_ndjson': exportar(exportador.exportar_ndjson, '.ndjson'),
+        'exportar_parquet': exportar(exportador.exportar_parquet, '.parquet'),
+        'exportar_arrow': exportar(exportador.exportar_arrow, '.arrows'),
+        'exportar_pdf': exportar(exportador.exportar_pdf, '.pdf'),
+        'corresponder_alertas': corresponder_alertas,
+        'indexar_alertas': lambda acordaos: lambda: IndiceAlertas(gerar_alertas(QUANTIDADE_ALERTAS))
+    }
+
+
+def medir(funcao, repeticoes):
+    """
+    Executa uma função várias vezes
+    
+    Returns:
+        list: Durações em segundos
+    """
+    tempos = []
+    
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    
+    return tempos
+
+
+def commit_atual():
+    """Commit do repositório, se disponível"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(resultados, arquivo_base, tolerancia):
+    """
+    Compara os resultados com os de outra execução
+    
+    Returns:
+        int: Quantidade de regressões acima da tolerância
+    """
+    with open(arquivo_base, 'r', encoding='utf-8') as f:
+        base = {(r['caso'], r['escala']): r for r in json.load(f)['resultados']}
+    
+    regressoes = 0
+    print(f"\nComparação com {arquivo_base}:")
+    
+    for resultado in resultados:
+        anterior = base.get((resultado['caso'], resultado['escala']))
+        
+        if not anterior or not anterior.get('mediana_s') or not resultado.get('mediana_s'):
+            continue
+        
+        variacao = resultado['mediana_s'] / anterior['mediana_s'] - 1
+        marcador = ''
+        
+        if variacao > tolerancia:
+            regressoes += 1
+            marcador = '  <- regressão'
+        
+        print(f"{resultado['caso']:>22} {resultado['escala']:>9} {anterior['mediana_s']:>10.4f}s {resultado['mediana_s']:>10.4f}s {variacao:>+8.1%}{marcador}")
+    
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks de desempenho sobre acervos sintéticos')
+    parser.add_argument('--escalas', type=int, nargs='+', default=ESCALAS_PADRAO)
+    parser.add_argument('--casos', nargs='+', help='Casos a medir (padrão: todos)')
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--saida', help='Arquivo JSON de resultados (padrão: benchmarks/resultados/<data>_<commit>.json)')
+    parser.add_argument('--comparar', help='Arquivo JSON de uma execução anterior')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_REGRESSAO)
+    args = parser.parse_args()
+    
+    resultados = []
+    
+    with tempfile.TemporaryDirectory() as diretorio_temp:
+        casos = criar_casos(diretorio_temp)
+        nomes = args.casos or list(casos)
+        
+        for nome in nomes:
+            if nome not in casos:
+                parser.error(f'Caso desconhecido: {nome} (disponíveis: {", ".join(casos)})')
+        
+        for escala in args.escalas:
+            acordaos = gerar_corpus(escala, args.semente)
+            
+            for nome in nomes:
+                if escala > LIMITES_ESCALA.get(nome, escala):
+                    continue
+                
+                try:
+                    tempos = medir(casos[nome](acordaos), args.repeticoes)
+                except (ImportError, CasoIndisponivel) as e:
+                    # Exportadores com dependências opcionais ausentes
+                    print(f"{nome:>22} {escala:>9}  ignorado ({e})")
+                    continue
+                
+                resultado = {
+                    'caso': nome,
+                    'escala': escala,
+                    'repeticoes': args.repeticoes,
+                    'min_s': min(tempos),
+                    'mediana_s': statistics.median(tempos),
+                    'por_acordao_us': statistics.median(tempos) / escala * 1e6
+                }
+                resultados.append(resultado)
+                
+                print(f"{nome:>22} {escala:>9} {resultado['mediana_s']:>10.4f}s {resultado['por_acordao_us']:>10.2f} µs/acórdão")
+            
+            del acordaos
+    
+    commit = commit_atual()
+    execucao = {
+        'commit': commit,
+        'data': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'semente': args.semente,
+        'resultados': resultados
+    }
+    
+    saida = args.saida or os.path.join(DIRETORIO_RESULTADOS, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(execucao, f, ensure_ascii=False, indent=2)
+    
+    print(f"\nResultados gravados em {saida}")
+    
+    if args.comparar and comparar(resultados, args.comparar, args.tolerancia):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Micro-benchmark da serialização das respostas da API
+
+Compara o jsonify padrão do Flask (json da biblioteca padrão, com escape de
+caracteres não ASCII) com serializacao.serializar_json em páginas de 20, 100
+e 1000 acórdãos.
+
+Uso:
+    python benchmarks/benchmark_serializacao.py [--repeticoes N]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serializacao
+from jurisprudencia_api import TCUJurisprudenciaAPI
+
+TAMANHOS_PAGINA = [20, 100, 1000]
+
+
+def serializar_padrao_flask(dados):
+    """Serialização equivalente ao provedor JSON padrão do Flask"""
+    return json.dumps(dados, ensure_ascii=True, sort_keys=True).encode('utf-8')
+
+
+def medir(funcao, dados, repeticoes):
+    """Retorna o menor tempo (em ms) entre as repetições"""
+    tempos = []
+    
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(dados)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de serialização JSON')
+    parser.add_argument('--repeticoes', type=int, default=50)
+    args = parser.parse_args()
+    
+    api = TCUJurisprudenciaAPI()
+    
+    print(f"Serializador rápido: {serializacao.nome_serializador()}")
+    print(f"{'acórdãos':>9} {'padrão (ms)':>12} {'rápido (ms)':>12} {'ganho':>7} {'padrão (KB)':>12} {'rápido (KB)':>12}")
+    
+    for tamanho in TAMANHOS_PAGINA:
+        pagina = {'total': tamanho, 'pagina': 0, 'limite': tamanho, 'acordaos': api._gerar_acordaos_simulados(tamanho)}
+        
+        tempo_padrao = medir(serializar_padrao_flask, pagina, args.repeticoes)
+        tempo_rapido = medir(serializacao.serializar_json, pagina, args.repeticoes)
+        
+        tamanho_padrao = len(serializar_padrao_flask(pagina)) / 1024
+        tamanho_rapido = len(serializacao.serializar_json(pagina)) / 1024
+        
+        print(f"{tamanho:>9} {tempo_padrao:>12.3f} {tempo_rapido:>12.3f} {tempo_padrao / tempo_rapido:>6.1f}x {tamanho_padrao:>12.1f} {tamanho_rapido:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Acervo sintético e determinístico para benchmarks e testes de carga
+
+O mesmo par (quantidade, semente) sempre produz os mesmos acórdãos e
+alertas, em qualquer máquina, de modo que resultados de commits diferentes
+podem ser comparados.
+"""
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jurisprudencia_api import TCUJurisprudenciaAPI
+
+# Acórdãos gerados por vez, para limitar o pico de memória em acervos grandes
+TAMANHO_BLOCO_CORPUS = 10000
+
+# Termos usados nos alertas sintéticos
+TEMAS_ALERTAS = ['Licitação', 'Contrato Administrativo', 'Responsabilidade', 'Convênio', 'Obra Pública']
+SUBTEMAS_ALERTAS = ['Pregão Eletrônico', 'Aditivo', 'Multa', 'Prestação de Contas', 'Superfaturamento', 'BDI']
+PALAVRAS_CHAVE_ALERTAS = ['dispensa', 'sobrepreço', 'inexigibilidade', 'prescrição', 'contrapartida', 'superfaturamento', 'oitivas', 'consulente']
+
+
+def iterar_corpus(quantidade, semente=0, tamanho_bloco=TAMANHO_BLOCO_CORPUS):
+    """
+    Percorre um acervo sintético sem mantê-lo inteiro em memória
+    
+    Args:
+        quantidade (int): Quantidade de acórdãos
+        semente (int): Semente do acervo
+        tamanho_bloco (int): Acórdãos gerados por vez
+        
+    Yields:
+        dict: Acórdãos do acervo
+    """
+    api = TCUJurisprudenciaAPI()
+    
+    for inicio in range(0, quantidade, tamanho_bloco):
+        yield from api._gerar_acordaos_simulados(min(tamanho_bloco, quantidade - inicio), inicio, semente)
+
+
+def gerar_corpus(quantidade, semente=0):
+    """
+    Gera um acervo sintético
+    
+    Args:
+        quantidade (int): Quantidade de acórdãos (de 1 mil a 1 milhão)
+        semente (int): Semente do acervo
+        
+    Returns:
+        list: Acórdãos do acervo
+    """
+    return list(iterar_corpus(quantidade, semente))
+
+
+def gerar_alertas(quantidade, semente=0):
+    """
+    Gera alertas sintéticos com combinações variadas de critérios (sempre
+    com um tema e ao menos uma palavra-chave, como os alertas dos usuários)
+    
+    Args:
+        quantidade (int): Quantidade de alertas
+        semente (int): Semente dos alertas
+        
+    Returns:
+        list: Alertas no formato do AlertaService
+    """
+    aleatorio = random.Random(semente)
+    alertas = []
+    
+    for i in range(quantidade):
+        alertas.append({
+            'id': f'alerta-{i}',
+            'usuario_id': f'usuario-{i % max(quantidade // 3, 1)}',
+            'email': f'usuario{i % max(quantidade // 3, 1)}@exemplo.com',
+            'temas': [aleatorio.choice(TEMAS_ALERTAS)],
+            'subtemas': aleatorio.sample(SUBTEMAS_ALERTAS, aleatorio.randint(0, 1)),
+            'palavras_chave': aleatorio.sample(PALAVRAS_CHAVE_ALERTAS, aleatorio.randint(1, 2)),
+            'frequencia': aleatorio.choice(['diaria', 'semanal', 'imediata']),
+            'criado_em': '2024-01-01T00:00:00',
+            'ultima_execucao': None,
+            'pendentes': [],
+            'ativo': True
+        })
+    
+    return alertas
@@ -0,0 +1,191 @@
+"""
+Servidor local que simula o serviço de acórdãos do TCU (recupera-acordaos)
+
+Serve um acervo sintético determinístico com latência e taxa de erros
+configuráveis, para testes de carga da aplicação sem acessar o TCU. A
+aplicação passa a usá-lo quando TCU_API_URL aponta para a sua URL.
+
+Rotas:
+    GET /api/acordao/recupera-acordaos?inicio=0&quantidade=20
+    GET /api/acordao/<id>
+
+Uso isolado:
+    python benchmarks/servidor_tcu_simulado.py --porta 8081 --latencia 0.05 --taxa-erros 0.01
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, unquote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jurisprudencia_api import TCUJurisprudenciaAPI, PREFIXO_ID_SIMULADO
+
+# Maior página servida por requisição
+MAX_QUANTIDADE_PAGINA = 1000
+
+
+class ServidorTCUSimulado:
+    """
+    Serviço de acórdãos simulado, executado em uma thread do processo
+    
+    Cada requisição espera a latência sorteada (distribuição normal, sem
+    valores negativos) e falha com 503 na proporção configurada.
+    """
+    def __init__(self, total=10000, latencia=0.05, variacao_latencia=0.02, taxa_erros=0.0,
+                 semente=0, host='127.0.0.1', porta=0):
+        """
+        Args:
+            total (int): Quantidade de acórdãos do acervo
+            latencia (float): Latência média das respostas, em segundos
+            variacao_latencia (float): Desvio padrão da latência, em segundos
+            taxa_erros (float): Proporção das requisições respondidas com 503
+            semente (int): Semente do acervo e dos sorteios
+            host (str): Endereço de escuta
+            porta (int): Porta de escuta (0 para uma porta livre)
+        """
+        self.total = total
+        self.latencia = latencia
+        self.variacao_latencia = variacao_latencia
+        self.taxa_erros = taxa_erros
+        self.semente = semente
+        
+        self._api = TCUJurisprudenciaAPI(url_acervo=None)
+        self._aleatorio = random.Random(semente)
+        self._lock = threading.Lock()
+        self._thread = None
+        
+        self._servidor = ThreadingHTTPServer((host, porta), self._criar_tratador())
+        self._servidor.daemon_threads = True
+    
+    @property
+    def url(self):
+        """URL base do serviço, no formato esperado por TCU_API_URL"""
+        host, porta = self._servidor.server_address[:2]
+        return f'http://{host}:{porta}/api'
+    
+    def iniciar(self):
+        """Inicia o servidor em uma thread em segundo plano"""
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def parar(self):
+        """Para o servidor e libera a porta"""
+        self._servidor.shutdown()
+        self._servidor.server_close()
+        
+        if self._thread:
+            self._thread.join()
+    
+    def recuperar_acordaos(self, inicio, quantidade):
+        """Página do acervo a partir da posição inicio"""
+        quantidade = max(0, min(quantidade, MAX_QUANTIDADE_PAGINA, self.total - inicio))
+        return self._api._gerar_acordaos_simulados(quantidade, inicio, self.semente)
+    
+    def recuperar_acordao(self, acordao_id):
+        """Acórdão com o ID dado, ou None"""
+        if not acordao_id.startswith(PREFIXO_ID_SIMULADO):
+            return None
+        
+        try:
+            indice = int(acordao_id[len(PREFIXO_ID_SIMULADO):]) - 1000
+        except ValueError:
+            return None
+        
+        if not 0 <= indice < self.total:
+            return None
+        
+        return self._api._gerar_acordaos_simulados(1, indice, self.semente)[0]
+    
+    def _sortear(self):
+        """Sorteia a latência e se a requisição deve falhar"""
+        with self._lock:
+            latencia = max(0.0, self._aleatorio.gauss(self.latencia, self.variacao_latencia))
+            falhar = self._aleatorio.random() < self.taxa_erros
+        
+        return latencia, falhar
+    
+    def _criar_tratador(self):
+        servidor = self
+        
+        class Tratador(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                latencia, falhar = servidor._sortear()
+                time.sleep(latencia)
+                
+                if falhar:
+                    return self._responder(503, {'erro': 'Serviço indisponível'})
+                
+                partes = urlsplit(self.path)
+                caminho = partes.path.rstrip('/')
+                
+                if caminho == '/api/acordao/recupera-acordaos':
+                    parametros = parse_qs(partes.query)
+                    
+                    try:
+                        inicio = int(parametros.get('inicio', ['0'])[0])
+                        quantidade = int(parametros.get('quantidade', ['20'])[0])
+                    except ValueError:
+                        return self._responder(400, {'erro': 'Parâmetros inválidos'})
+                    
+                    return self._responder(200, servidor.recuperar_acordaos(inicio, quantidade))
+                
+                if caminho.startswith('/api/acordao/'):
+                    acordao = servidor.recuperar_acordao(unquote(caminho[len('/api/acordao/'):]))
+                    
+                    if acordao is None:
+                        return self._responder(404, {'erro': 'Acórdão não encontrado'})
+                    
+                    return self._responder(200, acordao)
+                
+                self._responder(404, {'erro': 'Rota não encontrada'})
+            
+            def _responder(self, status, dados):
+                corpo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+                
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+            
+            def log_message(self, formato, *args):
+                pass
+        
+        return Tratador
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serviço de acórdãos do TCU simulado')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8081)
+    parser.add_argument('--total', type=int, default=10000)
+    parser.add_argument('--latencia', type=float, default=0.05)
+    parser.add_argument('--variacao-latencia', type=float, default=0.02)
+    parser.add_argument('--taxa-erros', type=float, default=0.0)
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+    
+    servidor = ServidorTCUSimulado(args.total, args.latencia, args.variacao_latencia, args.taxa_erros,
+                                   args.semente, args.host, args.porta)
+    print(f"Serviço simulado em {servidor.url} (TCU_API_URL={servidor.url})")
+    
+    servidor.iniciar()
+    
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.parar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+"""
+Teste de carga da aplicação com o serviço de acórdãos do TCU simulado
+
+Inicia o serviço simulado (benchmarks/servidor_tcu_simulado.py), com latência
+e taxa de erros configuráveis, e a aplicação Flask em outro processo apontada
+para ele (TCU_API_URL). Em seguida, dispara uma carga concorrente com uma
+mistura de operações (busca, detalhe, recomendação, exportação e alertas) e
+informa a vazão e as latências p50/p95/p99 por operação.
+
+Uso:
+    python benchmarks/teste_carga.py --duracao 30 --concorrencia 16
+    python benchmarks/teste_carga.py --latencia 0.2 --taxa-erros 0.05 --mistura busca=50 detalhe=50
+    python benchmarks/teste_carga.py --url http://localhost:5000 --saida carga.json
+
+Com --url, a carga é disparada contra uma aplicação já em execução (ex.: com
+gunicorn ou uvicorn), que deve estar configurada com o próprio TCU_API_URL.
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from servidor_tcu_simulado import ServidorTCUSimulado
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Peso de cada operação na carga
+MISTURA_PADRAO = {
+    'busca': 40,
+    'detalhe': 30,
+    'recomendacao': 15,
+    'exportacao': 5,
+    'alertas': 10
+}
+
+# Acórdãos por exportação
+ACORDAOS_POR_EXPORTACAO = 10
+
+# Tempo máximo (em segundos) para a aplicação começar a responder
+TIMEOUT_INICIALIZACAO = 30
+
+# Tempo máximo (em segundos) de cada requisição da carga
+TIMEOUT_REQUISICAO = 60
+
+PERCENTIS = (50, 95, 99)
+
+
+def criar_operacoes(total):
+    """
+    Define as requisições de cada operação da carga
+    
+    Args:
+        total (int): Quantidade de acórdãos do serviço simulado
+        
+    Returns:
+        dict: Função (aleatorio) -> (método, caminho, corpo JSON) por operação
+    """
+    def acordao_id(aleatorio):
+        return f'acordao-{aleatorio.randrange(total) + 1000}'
+    
+    def busca(aleatorio):
+        caminho = f'/api/acordaos?pagina={aleatorio.randrange(max(total // 20, 1))}&limite=20'
+        
+        if aleatorio.random() < 0.5:
+            caminho += '&colegiado=Plen%C3%A1rio&excluir_relacao=true'
+        
+        return 'GET', caminho, None
+    
+    def exportacao(aleatorio):
+        ids = [acordao_id(aleatorio) for _ in range(ACORDAOS_POR_EXPORTACAO)]
+        return 'POST', '/api/exportar', {'formato': aleatorio.choice(['csv', 'json', 'ndjson']), 'ids': ids}
+    
+    def alertas(aleatorio):
+        usuario = aleatorio.randrange(1000)
+        return 'POST', '/api/alertas', {
+            'usuario_id': f'carga-{usuario}',
+            'email': f'carga{usuario}@exemplo.com',
+            'temas': [aleatorio.choice(['Licitação', 'Convênio', 'Obra Pública'])],
+            'palavras_chave': [aleatorio.choice(['sobrepreço', 'dispensa', 'prescrição'])],
+            'frequencia': 'diaria'
+        }
+    
+    return {
+        'busca': busca,
+        'detalhe': lambda aleatorio: ('GET', f'/api/acordaos/{acordao_id(aleatorio)}', None),
+        'recomendacao': lambda aleatorio: ('GET', f'/api/recomendacao/acordao/{acordao_id(aleatorio)}?limite=5', None),
+        'exportacao': exportacao,
+        'alertas': alertas
+    }
+
+
+def percentil(valores, p):
+    """
+    Percentil pelo método do posto mais próximo
+    
+    Args:
+        valores (list): Valores ordenados
+        p (float): Percentil (0 a 100)
+        
+    Returns:
+        float: Valor do percentil, ou None se não houver valores
+    """
+    if not valores:
+        return None
+    
+    posicao = max(0, min(len(valores) - 1, int(-(-p * len(valores) // 100)) - 1))
+    return valores[posicao]
+
+
+def executar_carga(url_app, operacoes, mistura, concorrencia, duracao, semente=0):
+    """
+    Dispara a carga concorrente contra a aplicação
+    
+    Args:
+        url_app (str): URL base da aplicação
+        operacoes (dict): Requisições de cada operação (ver criar_operacoes)
+        mistura (dict): Peso de cada operação
+        concorrencia (int): Quantidade de clientes simultâneos
+        duracao (float): Duração da carga, em segundos
+        semente (int): Semente dos sorteios dos clientes
+        
+    Returns:
+        tuple: (medições [(operação, duração, status)], duração real)
+    """
+    nomes = list(mistura)
+    pesos = [mistura[nome] for nome in nomes]
+    medicoes = []
+    lock = threading.Lock()
+    
+    inicio = time.perf_counter()
+    fim = inicio + duracao
+    
+    def cliente(numero):
+        aleatorio = random.Random(semente * 1000003 + numero)
+        sessao = requests.Session()
+        locais = []
+        
+        while time.perf_counter() < fim:
+            nome = aleatorio.choices(nomes, pesos)[0]
+            metodo, caminho, corpo = operacoes[nome](aleatorio)
+            
+            antes = time.perf_counter()
+            try:
+                resposta = sessao.request(metodo, url_app + caminho, json=corpo, timeout=TIMEOUT_REQUISICAO)
+                resposta.content
+                status = resposta.status_code
+            except requests.RequestException:
+                status = None
+            
+            locais.append((nome, time.perf_counter() - antes, status))
+        
+        sessao.close()
+        
+        with lock:
+            medicoes.extend(locais)
+    
+    clientes = [threading.Thread(target=cliente, args=(numero,)) for numero in range(concorrencia)]
+    
+    for thread in clientes:
+        thread.start()
+    
+    for thread in clientes:
+        thread.join()
+    
+    return medicoes, time.perf_counter() - inicio
+
+
+def resumir(medicoes, duracao):
+    """
+    Calcula vazão, taxa de erros e percentis de latência
+    
+    Args:
+        medicoes (list): Medições (operação, duração, status)
+        duracao (float): Duração da carga, em segundos
+        
+    Returns:
+        dict: Resumo por operação e total ('total')
+    """
+    grupos = {}
+    for nome, tempo, status in medicoes:
+        grupos.setdefault(nome, []).append((tempo, status))
+        grupos.setdefault('total', []).append((tempo, status))
+    
+    resumo = {}
+    for nome, valores in grupos.items():
+        tempos = sorted(tempo for tempo, _ in valores)
+        erros = sum(1 for _, status in valores if status is None or status >= 500)
+        
+        resumo[nome] = {
+            'requisicoes': len(valores),
+            'erros': erros,
+            'taxa_erros': erros / len(valores),
+            'vazao_rps': len(valores) / duracao,
+            **{f'p{p}_ms': percentil(tempos, p) * 1000 for p in PERCENTIS}
+        }
+    
+    return resumo
+
+
+def porta_livre():
+    """Porta TCP livre na interface local"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def iniciar_aplicacao(url_acervo, diretorio_dados):
+    """
+    Inicia a aplicação Flask em outro processo, apontada para o serviço simulado
+    
+    Returns:
+        tuple: (processo, URL base da aplicação)
+    """
+    porta = porta_livre()
+    ambiente = dict(os.environ, TCU_API_URL=url_acervo, DIRETORIO_ALERTAS=diretorio_dados)
+    ambiente.pop('SMTP_HOST', None)
+    
+    processo = subprocess.Popen(
+        [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(porta), '--with-threads'],
+        cwd=DIRETORIO_PROJETO,
+        env=ambiente,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    url_app = f'http://127.0.0.1:{porta}'
+    
+    limite = time.monotonic() + TIMEOUT_INICIALIZACAO
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError('A aplicação terminou durante a inicialização')
+        
+        try:
+            requests.get(url_app + '/metrics', timeout=1)
+            return processo, url_app
+        except requests.RequestException:
+            time.sleep(0.1)
+    
+    processo.terminate()
+    raise RuntimeError('A aplicação não respondeu a tempo')
+
+
+def ler_mistura(itens):
+    """Converte ['busca=40', ...] no dicionário de pesos"""
+    mistura = {}
+    
+    for item in itens:
+        nome, _, peso = item.partition('=')
+        
+        if nome not in MISTURA_PADRAO or not peso:
+            raise ValueError(f'Item de mistura inválido: {item} (operações: {", ".join(MISTURA_PADRAO)})')
+        
+        mistura[nome] = float(peso)
+    
+    return mistura
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Teste de carga com o serviço de acórdãos simulado')
+    parser.add_argument('--duracao', type=float, default=30)
+    parser.add_argument('--concorrencia', type=int, default=16)
+    parser.add_argument('--mistura', nargs='+', help='Pesos das operações (ex.: busca=40 detalhe=30)')
+    parser.add_argument('--total', type=int, default=10000, help='Acórdãos do serviço simulado')
+    parser.add_argument('--latencia', type=float, default=0.05, help='Latência média do serviço simulado (s)')
+    parser.add_argument('--variacao-latencia', type=float, default=0.02)
+    parser.add_argument('--taxa-erros', type=float, default=0.0, help='Proporção de respostas 503 do serviço simulado')
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--url', help='Aplicação já em execução (não inicia o serviço simulado nem a aplicação)')
+    parser.add_argument('--saida', help='Arquivo JSON para gravar o resumo')
+    args = parser.parse_args()
+    
+    try:
+        mistura = ler_mistura(args.mistura) if args.mistura else MISTURA_PADRAO
+    except ValueError as e:
+        parser.error(str(e))
+    
+    servidor = processo = None
+    
+    with tempfile.TemporaryDirectory() as diretorio_dados:
+        try:
+            if args.url:
+                url_app = args.url.rstrip('/')
+            else:
+                servidor = ServidorTCUSimulado(args.total, args.latencia, args.variacao_latencia,
+                                               args.taxa_erros, args.semente).iniciar()
+                processo, url_app = iniciar_aplicacao(servidor.url, diretorio_dados)
+            
+            print(f"Carga de {args.duracao:.0f}s com {args.concorrencia} clientes contra {url_app}")
+            medicoes, duracao = executar_carga(url_app, criar_operacoes(args.total), mistura,
+                                               args.concorrencia, args.duracao, args.semente)
+        finally:
+            if processo:
+                processo.terminate()
+                processo.wait()
+            
+            if servidor:
+                servidor.parar()
+    
+    resumo = resumir(medicoes, duracao)
+    
+    print(f"\n{'operação':>14} {'req':>7} {'req/s':>8} {'erros':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for nome in [n for n in mistura if n in resumo] + ['total']:
+        r = resumo.get(nome)
+        
+        if r:
+            print(f"{nome:>14} {r['requisicoes']:>7} {r['vazao_rps']:>8.1f} {r['taxa_erros']:>7.1%} "
+                  f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+    
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump({
+                'data': datetime.now().isoformat(),
+                'python': platform.python_version(),
+                'plataforma': platform.platform(),
+                'parametros': {**vars(args), 'mistura': mistura},
+                'duracao_s': duracao,
+                'resumo': resumo
+            }, f, ensure_ascii=False, indent=2)
+        
+        print(f"\nResumo gravado em {args.saida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import unicodedata
+
+
+def normalizar_texto(texto):
+    """
+    Normaliza um texto para comparação
+    
+    Converte para minúsculas, remove acentos e reduz espaços repetidos, de
+    modo que 'Licitação', 'licitacao' e 'LICITAÇÃO ' sejam equivalentes.
+    
+    Args:
+        texto (str): Texto original
+        
+    Returns:
+        str: Texto normalizado
+    """
+    decomposto = unicodedata.normalize('NFKD', (texto or '').casefold())
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(sem_acentos.split())
+
+
+class AutomatoPalavras:
+    """
+    Automato de Aho-Corasick para localizar vários termos em uma só leitura
+    
+    Todos os termos são compilados em um único automato, de modo que o custo
+    de uma busca depende do tamanho do texto e da quantidade de ocorrências,
+    e não da quantidade de termos. Os termos e os textos são normalizados com
+    normalizar_texto, e só são aceitas ocorrências de palavras inteiras.
+    """
+    def __init__(self, termos):
+        # Termos normalizados, sem repetição
+        self.termos = sorted({normalizar_texto(termo) for termo in termos} - {''})
+        
+        # Transições, estado de falha e termos reconhecidos em cada estado
+        self._transicoes = [{}]
+        self._falhas = [0]
+        self._saidas = [[]]
+        
+        for indice, termo in enumerate(self.termos):
+            self._inserir(termo, indice)
+        
+        self._construir_falhas()
+    
+    def buscar(self, texto):
+        """
+        Busca os termos em um texto
+        
+        Args:
+            texto (str): Texto a pesquisar
+            
+        Returns:
+            set: Termos (normalizados) encontrados no texto
+        """
+        texto = normalizar_texto(texto)
+        encontrados = set()
+        estado = 0
+        
+        for posicao, caractere in enumerate(texto):
+            while estado and caractere not in self._transicoes[estado]:
+                estado = self._falhas[estado]
+            
+            estado = self._transicoes[estado].get(caractere, 0)
+            
+            for indice in self._saidas[estado]:
+                termo = self.termos[indice]
+                inicio = posicao - len(termo) + 1
+                
+                # Descarta ocorrências dentro de outras palavras
+                if inicio > 0 and texto[inicio - 1].isalnum():
+                    continue
+                if posicao + 1 < len(texto) and texto[posicao + 1].isalnum():
+                    continue
+                
+                encontrados.add(termo)
+        
+        return encontrados
+    
+    def _inserir(self, termo, indice):
+        """Insere um termo na árvore de transições"""
+        estado = 0
+        
+        for caractere in termo:
+            proximo = self._transicoes[estado].get(caractere)
+            
+            if proximo is None:
+                proximo = len(self._transicoes)
+                self._transicoes.append({})
+                self._falhas.append(0)
+                self._saidas.append([])
+                self._transicoes[estado][caractere] = proximo
+            
+            estado = proximo
+        
+        self._saidas[estado].append(indice)
+    
+    def _construir_falhas(self):
+        """Calcula os estados de falha em largura, herdando as saídas"""
+        fila = list(self._transicoes[0].values())
+        
+        for estado in fila:
+            for caractere, proximo in self._transicoes[estado].items():
+                falha = self._falhas[estado]
+                
+                while falha and caractere not in self._transicoes[falha]:
+                    falha = self._falhas[falha]
+                
+                falha = self._transicoes[falha].get(caractere, 0)
+                self._falhas[proximo] = falha
+                self._saidas[proximo] = self._saidas[proximo] + self._saidas[falha]
+                fila.append(proximo)
@@ -0,0 +1,173 @@
+import gzip
+import hashlib
+
+from jurisprudencia_api import versao_acordao, identificador_acordao
+
+# Tamanho mínimo (em bytes) para comprimir uma resposta
+TAMANHO_MINIMO_COMPRESSAO = 1024
+
+# Níveis de compressão para conteúdo gerado a cada requisição
+NIVEL_GZIP = 6
+QUALIDADE_BROTLI = 5
+
+# Tempo (em segundos) que clientes e proxies podem reutilizar uma resposta
+MAX_AGE_LISTA = 60
+MAX_AGE_ACORDAO = 3600
+
+# Alterar quando a representação das respostas mudar (ex.: nova classificação)
+VERSAO_REPRESENTACAO = 1
+
+# Módulo brotli, resolvido uma única vez (None se não estiver instalado)
+try:
+    import brotli as BROTLI
+except ImportError:
+    BROTLI = None
+
+
+def calcular_etag(acordaos, *partes, versao=versao_acordao):
+    """
+    Calcula uma ETag forte para uma resposta com acórdãos
+    
+    A ETag é derivada das versões dos acórdãos (ver versao_acordao), e não do
+    corpo serializado, de modo que pode ser conferida antes de classificar e
+    serializar a resposta.
+    
+    Args:
+        acordaos (list): Acórdãos da resposta, na ordem da resposta
+        *partes: Demais valores que alteram a representação (ex.: classificar)
+        versao (callable): Versão de cada acórdão (ex.: SnapshotCorpus.versao,
+            com as versões pré-calculadas)
+        
+    Returns:
+        str: ETag entre aspas
+    """
+    resumo = hashlib.sha256(f'{VERSAO_REPRESENTACAO}|{partes!r}'.encode('utf-8'))
+    
+    for acordao in acordaos:
+        resumo.update(f"|{identificador_acordao(acordao)}:{versao(acordao)}".encode('utf-8'))
+    
+    return f'"{resumo.hexdigest()[:32]}"'
+
+
+def etag_corresponde(if_none_match, etag):
+    """
+    Verifica se o cliente já possui a representação identificada pela ETag
+    
+    Segue a comparação fraca do If-None-Match; as variantes comprimidas
+    (ETag com sufixo da codificação) correspondem à mesma representação.
+    
+    Args:
+        if_none_match (str): Valor do cabeçalho If-None-Match
+        etag (str): ETag atual, sem sufixo de codificação
+        
+    Returns:
+        bool: True se a resposta 304 pode ser usada
+    """
+    if not if_none_match:
+        return False
+    
+    if if_none_match.strip() == '*':
+        return True
+    
+    base = etag.strip('"')
+    
+    for valor in if_none_match.split(','):
+        valor = valor.strip()
+        
+        if valor.startswith('W/'):
+            valor = valor[2:]
+        
+        if valor.strip('"').split('-')[0] == base:
+            return True
+    
+    return False
+
+
+def negociar_codificacao(accept_encoding, tamanho):
+    """
+    Escolhe a compressão da resposta a partir do Accept-Encoding
+    
+    Args:
+        accept_encoding (str): Valor do cabeçalho Accept-Encoding
+        tamanho (int): Tamanho do corpo sem compressão
+        
+    Returns:
+        str: 'br', 'gzip' ou None (sem compressão)
+    """
+    if not accept_encoding or tamanho < TAMANHO_MINIMO_COMPRESSAO:
+        return None
+    
+    aceitas = {}
+    for item in accept_encoding.split(','):
+        nome, _, parametros = item.strip().partition(';')
+        peso = 1.0
+        
+        if parametros.strip().startswith('q='):
+            try:
+                peso = float(parametros.strip()[2:])
+            except ValueError:
+                peso = 0.0
+        
+        aceitas[nome.strip().lower()] = peso
+    
+    candidatas = ['br', 'gzip'] if _brotli() is not None else ['gzip']
+    
+    for codificacao in candidatas:
+        if aceitas.get(codificacao, aceitas.get('*', 0)) > 0:
+            return codificacao
+    
+    return None
+
+
+def comprimir(corpo, codificacao):
+    """
+    Comprime o corpo de uma resposta
+    
+    Args:
+        corpo (bytes): Corpo sem compressão
+        codificacao (str): 'br', 'gzip' ou None
+        
+    Returns:
+        bytes: Corpo comprimido
+    """
+    if codificacao == 'br':
+        return _brotli().compress(corpo, quality=QUALIDADE_BROTLI)
+    
+    if codificacao == 'gzip':
+        return gzip.compress(corpo, compresslevel=NIVEL_GZIP)
+    
+    return corpo
+
+
+def cabecalhos_cache(etag, max_age, codificacao=None):
+    """
+    Cabeçalhos de validação e cache de uma resposta
+    
+    Args:
+        etag (str): ETag da representação sem compressão
+        max_age (int): Tempo de reutilização em segundos
+        codificacao (str, optional): Compressão aplicada ao corpo
+        
+    Returns:
+        dict: Cabeçalhos HTTP
+    """
+    # Cada codificação é uma representação diferente, com ETag própria
+    if codificacao:
+        base = etag.strip('"')
+        etag = f'"{base}-{codificacao}"'
+    
+    cabecalhos = {
+        'ETag': etag,
+        'Cache-Control': f'public, max-age={max_age}',
+        'Vary': 'Accept-Encoding'
+    }
+    
+    if codificacao:
+        cabecalhos['Content-Encoding'] = codificacao
+    
+    return cabecalhos
+
+
+def _brotli():
+    """Retorna o módulo brotli, se instalado"""
+    return BROTLI
@@ -0,0 +1,302 @@
+import os
+import threading
+from datetime import datetime
+
+from jurisprudencia_api import versao_acordao, identificador_acordao
+from facetas import IndiceFacetas
+from linha_tempo import CuboLinhaTempo
+from autocompletar import IndiceAutocompletar
+
+# Intervalo (em segundos) entre as atualizações do acervo em segundo plano
+INTERVALO_ATUALIZACAO_CORPUS = float(os.environ.get('INTERVALO_ATUALIZACAO_CORPUS', 300))
+
+# Acórdãos buscados por página ao montar uma nova geração
+TAMANHO_PAGINA_CORPUS = 500
+
+
+class SnapshotCorpus:
+    """
+    Geração imutável do acervo, com os índices usados pelas rotas
+    
+    Uma geração nunca é alterada depois de montada: cada atualização monta
+    uma geração nova, que substitui a anterior de uma só vez. As leituras não
+    precisam de lock, e uma requisição que guarda a geração no início vê o
+    mesmo acervo até o fim, mesmo que outra geração entre em uso no meio.
+    """
+    def __init__(self, acordaos, filtrar, geracao=1, anterior=None):
+        """
+        Args:
+            acordaos (iterable): Acórdãos do acervo, na ordem do serviço
+            filtrar (callable): Função de filtragem (ver filtrar_acordaos)
+            geracao (int): Número da geração
+            anterior (SnapshotCorpus, optional): Geração anterior, da qual
+                os agregados são derivados apenas com as diferenças
+        """
+        self.acordaos = tuple(acordaos)
+        self.geracao = geracao
+        self.criado_em = datetime.now()
+        self._filtrar = filtrar
+        
+        # Índices por identificador ('id' ou, na falta dele, 'key'): acórdão e
+        # versão do conteúdo (usada nas ETags)
+        self.por_id = {identificador_acordao(acordao): acordao for acordao in self.acordaos}
+        self.versoes = {identificador_acordao(acordao): versao_acordao(acordao) for acordao in self.acordaos}
+        
+        # Índice pela chave do serviço do TCU (campo 'key'), quando presente
+        self.por_chave = {acordao['key']: acordao for acordao in self.acordaos if acordao.get('key')}
+        
+        # Bitmaps para as contagens por faceta
+        self.facetas = IndiceFacetas(self.acordaos, filtrar)
+        
+        # Sugestões de relator, tema e subtema para o que o usuário digita
+        self.autocompletar = IndiceAutocompletar(self.acordaos)
+        
+        # Linha do tempo pré-agregada, atualizada só com os acórdãos que
+        # entraram, saíram ou mudaram desde a geração anterior (comparados
+        # pelo identificador, 'id' ou 'key')
+        if anterior is None:
+            self.linha_tempo = CuboLinhaTempo(self.acordaos)
+        else:
+            self.linha_tempo = anterior.linha_tempo.atualizar(
+                [acordao for acordao_id, acordao in self.por_id.items() if anterior.versoes.get(acordao_id) != self.versoes[acordao_id]],
+                [acordao for acordao_id, acordao in anterior.por_id.items() if self.versoes.get(acordao_id) != anterior.versoes[acordao_id]]
+            )
+    
+    def __len__(self):
+        return len(self.acordaos)
+    
+    def versao(self, acordao):
+        """Versão de um acórdão, pré-calculada para os acórdãos da geração"""
+        versao = self.versoes.get(identificador_acordao(acordao))
+        return versao if versao is not None else versao_acordao(acordao)
+    
+    def buscar_acordaos(self, pagina=0, limite=20, filtros=None):
+        """
+        Página do acervo, como em TCUJurisprudenciaAPI.buscar_acordaos
+        
+        Args:
+            pagina (int): Número da página
+            limite (int): Limite de resultados por página
+            filtros (dict, optional): Filtros aplicados à página
+            
+        Returns:
+            list: Acórdãos da página
+        """
+        inicio = pagina * limite
+        acordaos = list(self.acordaos[inicio:inicio + limite])
+        
+        if filtros:
+            acordaos = self._filtrar(acordaos, filtros)
+        
+        return acordaos
+    
+    def buscar_acordao_por_id(self, acordao_id):
+        """Acórdão com o ID dado, ou None"""
+        return self.por_id.get(str(acordao_id))
+    
+    def buscar_varios(self, ids):
+        """
+        Busca vários acórdãos por ID ou chave de uma só vez
+        
+        Args:
+            ids (list): IDs ou chaves (campo 'key') dos acórdãos
+            
+        Returns:
+            tuple: (acórdãos encontrados, na ordem pedida e sem repetições,
+            IDs não encontrados)
+        """
+        acordaos = []
+        nao_encontrados = []
+        vistos = set()
+        
+        for acordao_id in map(str, ids):
+            if acordao_id in vistos:
+                continue
+            vistos.add(acordao_id)
+            
+            acordao = self.por_id.get(acordao_id) or self.por_chave.get(acordao_id)
+            
+            if acordao is None:
+                nao_encontrados.append(acordao_id)
+            else:
+                acordaos.append(acordao)
+        
+        return acordaos, nao_encontrados
+    
+    def iterar_acordaos(self, filtros=None, ids=None, tamanho_pagina=TAMANHO_PAGINA_CORPUS):
+        """
+        Percorre o acervo, como em TCUJurisprudenciaAPI.iterar_acordaos
+        
+        Args:
+            filtros (dict, optional): Critérios de filtragem
+            ids (list, optional): IDs dos acórdãos desejados, na ordem desejada
+            tamanho_pagina (int): Quantidade de acórdãos filtrados por vez
+            
+        Yields:
+            dict: Acórdãos que atendem à consulta
+        """
+        if ids is not None:
+            for acordao_id in ids:
+                acordao = self.por_id.get(str(acordao_id))
+                
+                if acordao and (not filtros or self._filtrar([acordao], filtros)):
+                    yield acordao
+            return
+        
+        for inicio in range(0, len(self.acordaos), tamanho_pagina):
+            pagina = self.acordaos[inicio:inicio + tamanho_pagina]
+            yield from (self._filtrar(list(pagina), filtros) if filtros else pagina)
+
+
+class CorpusCompartilhado:
+    """
+    Acervo compartilhado por todas as rotas do processo
+    
+    Mantém a geração atual do acervo (SnapshotCorpus) e a substitui
+    periodicamente, em segundo plano, por uma geração nova buscada no serviço
+    de acórdãos. A troca é a atribuição de uma referência: as leituras nunca
+    esperam pela atualização, e apenas a primeira leitura do processo espera
+    a primeira carga.
+    
+    Oferece os mesmos métodos de leitura do TCUJurisprudenciaAPI, de modo que
+    pode substituí-lo onde só há leituras (ex.: FilaExportacaoService).
+    """
+    def __init__(self, api_client, intervalo=INTERVALO_ATUALIZACAO_CORPUS, tamanho_pagina=TAMANHO_PAGINA_CORPUS):
+        """
+        Args:
+            api_client (TCUJurisprudenciaAPI): Cliente do serviço de acórdãos
+            intervalo (float): Intervalo entre atualizações, em segundos
+            tamanho_pagina (int): Acórdãos buscados por página
+        """
+        self.api_client = api_client
+        self.intervalo = intervalo
+        self.tamanho_pagina = tamanho_pagina
+        
+        self._snapshot = None
+        
+        # Apenas uma geração é montada por vez
+        self._lock_atualizacao = threading.Lock()
+        
+        # Funções chamadas com (geração, novos acórdãos) a cada troca
+        self._observadores = []
+        
+        self._parar = threading.Event()
+        self._thread = None
+    
+    def atual(self):
+        """
+        Retorna a geração atual do acervo
+        
+        Na primeira chamada, carrega o acervo e inicia as atualizações em
+        segundo plano.
+        
+        Returns:
+            SnapshotCorpus: Geração atual
+            
+        Raises:
+            Exception: Se a primeira carga falhar
+        """
+        snapshot = self._snapshot
+        
+        if snapshot is None:
+            with self._lock_atualizacao:
+                if self._snapshot is None:
+                    self._trocar(self._montar(1))
+                    self.iniciar()
+            
+            snapshot = self._snapshot
+        
+        return snapshot
+    
+    def carregado(self):
+        """Indica se a primeira geração já foi carregada"""
+        return self._snapshot is not None
+    
+    def atualizar(self):
+        """
+        Monta uma nova geração e a coloca em uso
+        
+        Em caso de falha, a geração atual continua em uso.
+        
+        Returns:
+            SnapshotCorpus: Nova geração, ou None em caso de erro
+        """
+        with self._lock_atualizacao:
+            anterior = self._snapshot
+            
+            try:
+                snapshot = self._montar(anterior.geracao + 1 if anterior else 1)
+            except Exception as e:
+                print(f"Erro ao atualizar o acervo: {e}")
+                return None
+            
+            self._trocar(snapshot)
+            return snapshot
+    
+    def observar(self, funcao):
+        """
+        Registra uma função chamada a cada nova geração
+        
+        Args:
+            funcao (callable): Recebe (geração, novos acórdãos); na primeira
+                geração, a lista de novos acórdãos é vazia
+        """
+        self._observadores.append(funcao)
+    
+    def iniciar(self):
+        """Inicia as atualizações periódicas em segundo plano"""
+        if self._thread and self._thread.is_alive():
+            return
+        
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._monitorar, name='atualizacao-corpus', daemon=True)
+        self._thread.start()
+    
+    def parar(self):
+        """Interrompe as atualizações periódicas"""
+        self._parar.set()
+        
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+    
+    def buscar_acordaos(self, pagina=0, limite=20, filtros=None):
+        """Página da geração atual (ver SnapshotCorpus.buscar_acordaos)"""
+        return self.atual().buscar_acordaos(pagina, limite, filtros)
+    
+    def buscar_acordao_por_id(self, acordao_id):
+        """Acórdão da geração atual com o ID dado, ou None"""
+        return self.atual().buscar_acordao_por_id(acordao_id)
+    
+    def iterar_acordaos(self, filtros=None, ids=None, tamanho_pagina=TAMANHO_PAGINA_CORPUS):
+        """Percorre a geração atual (ver SnapshotCorpus.iterar_acordaos)"""
+        return self.atual().iterar_acordaos(filtros, ids, tamanho_pagina)
+    
+    def filtrar_acordaos(self, acordaos, filtros):
+        """Filtra acórdãos (ver TCUJurisprudenciaAPI.filtrar_acordaos)"""
+        return self.api_client.filtrar_acordaos(acordaos, filtros)
+    
+    def _montar(self, geracao):
+        """Busca o acervo completo e monta uma geração"""
+        acordaos = self.api_client.iterar_acordaos(tamanho_pagina=self.tamanho_pagina)
+        return SnapshotCorpus(acordaos, self.api_client.filtrar_acordaos, geracao, self._snapshot)
+    
+    def _trocar(self, snapshot):
+        """Coloca uma geração em uso e avisa os observadores"""
+        anterior = self._snapshot
+        self._snapshot = snapshot
+        
+        novos = []
+        if anterior is not None:
+            novos = [acordao for acordao in snapshot.acordaos if identificador_acordao(acordao) not in anterior.por_id]
+        
+        for funcao in self._observadores:
+            try:
+                funcao(snapshot, novos)
+            except Exception as e:
+                print(f"Erro ao notificar a nova geração do acervo: {e}")
+    
+    def _monitorar(self):
+        """Laço de atualização em segundo plano"""
+        while not self._parar.wait(self.intervalo):
+            self.atualizar()
@@ -0,0 +1,227 @@
+import os
+import time
+import queue
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+
+# Conexões SMTP simultâneas (e envios em paralelo)
+MAX_CONEXOES_SMTP = 4
+
+# Tentativas por email e espera inicial entre elas, dobrada a cada falha
+TENTATIVAS_ENVIO = 3
+ESPERA_INICIAL_ENVIO = 1.0
+
+# Tempo (em segundos) que uma conexão pode ficar ociosa no pool sem ser
+# conferida com NOOP antes de ser reaproveitada (servidores encerram conexões
+# ociosas, por exemplo entre os resumos diários)
+OCIOSIDADE_VERIFICACAO_SMTP = 5.0
+
+# Limite de acórdãos listados por alerta em um resumo
+MAX_ACORDAOS_POR_ALERTA = 50
+
+
+class EnvioEmailService:
+    """
+    Serviço de envio dos resumos de alertas por email
+    
+    Os acórdãos de todos os alertas de um mesmo email são reunidos em um único
+    resumo. Os resumos são enviados em paralelo por um pool de conexões SMTP
+    persistentes, reaproveitadas entre envios e execuções (e conferidas com
+    NOOP quando ficam ociosas), com novas tentativas e espera crescente em caso
+    de falha temporária.
+    
+    A configuração padrão vem das variáveis de ambiente SMTP_HOST, SMTP_PORTA,
+    SMTP_USUARIO, SMTP_SENHA, SMTP_REMETENTE e SMTP_TLS.
+    """
+    def __init__(self, host=None, porta=None, usuario=None, senha=None, remetente=None, usar_tls=None,
+                 max_conexoes=MAX_CONEXOES_SMTP, tentativas=TENTATIVAS_ENVIO, espera_inicial=ESPERA_INICIAL_ENVIO,
+                 obter_acordao=None, timeout=30, ociosidade_verificacao=OCIOSIDADE_VERIFICACAO_SMTP):
+        # Configuração do servidor SMTP
+        self.host = host or os.environ.get('SMTP_HOST', 'localhost')
+        self.porta = int(porta or os.environ.get('SMTP_PORTA', 25))
+        self.usuario = usuario or os.environ.get('SMTP_USUARIO')
+        self.senha = senha or os.environ.get('SMTP_SENHA')
+        self.remetente = remetente or os.environ.get('SMTP_REMETENTE', 'alertas@tcu-analisador.local')
+        self.usar_tls = usar_tls if usar_tls is not None else os.environ.get('SMTP_TLS', '').lower() == 'true'
+        self.timeout = timeout
+        
+        # Política de envio
+        self.max_conexoes = max_conexoes
+        self.tentativas = tentativas
+        self.espera_inicial = espera_inicial
+        self.ociosidade_verificacao = ociosidade_verificacao
+        
+        # Função que retorna os dados de um acórdão pelo ID (opcional)
+        self.obter_acordao = obter_acordao
+        
+        # Conexões abertas e ociosas, com o instante em que voltaram ao pool
+        self._conexoes = queue.LifoQueue()
+        self._executor = ThreadPoolExecutor(max_workers=max_conexoes, thread_name_prefix='smtp')
+    
+    def __call__(self, envios):
+        """Permite usar o serviço como função de notificação do AlertaService"""
+        return self.enviar_resumos(envios)
+    
+    def enviar_resumos(self, envios):
+        """
+        Envia um resumo por email com os acórdãos de todos os seus alertas
+        
+        Args:
+            envios (list): Pares (alerta, IDs dos acórdãos)
+            
+        Returns:
+            list: Emails que não puderam ser enviados
+        """
+        # Agrupa os alertas por destinatário
+        por_email = {}
+        for alerta, acordao_ids in envios:
+            if acordao_ids:
+                por_email.setdefault(alerta['email'], []).append((alerta, acordao_ids))
+        
+        mensagens = [self.montar_resumo(email, itens) for email, itens in por_email.items()]
+        
+        falhas = []
+        for email, enviado in zip(por_email, self._executor.map(self._enviar_com_tentativas, mensagens)):
+            if not enviado:
+                falhas.append(email)
+        
+        return falhas
+    
+    def montar_resumo(self, email, itens):
+        """
+        Monta o email de resumo de um destinatário
+        
+        Args:
+            email (str): Destinatário
+            itens (list): Pares (alerta, IDs dos acórdãos)
+            
+        Returns:
+            EmailMessage: Mensagem pronta para envio
+        """
+        total = len({acordao_id for _, acordao_ids in itens for acordao_id in acordao_ids})
+        
+        linhas = [f'Foram publicados {total} novos acórdãos relacionados aos seus alertas.', '']
+        
+        for alerta, acordao_ids in itens:
+            criterios = ', '.join(alerta.get('temas', []) + alerta.get('subtemas', []) + alerta.get('palavras_chave', []))
+            linhas.append(f'Alerta: {criterios or "todos os acórdãos"} ({len(acordao_ids)})')
+            
+            for acordao_id in acordao_ids[:MAX_ACORDAOS_POR_ALERTA]:
+                linhas.append(f'- {self._descrever_acordao(acordao_id)}')
+            
+            if len(acordao_ids) > MAX_ACORDAOS_POR_ALERTA:
+                linhas.append(f'- e mais {len(acordao_ids) - MAX_ACORDAOS_POR_ALERTA} acórdãos')
+            
+            linhas.append('')
+        
+        mensagem = EmailMessage()
+        mensagem['Subject'] = f'TCU Analisador: {total} novos acórdãos'
+        mensagem['From'] = self.remetente
+        mensagem['To'] = email
+        mensagem.set_content('\n'.join(linhas))
+        
+        return mensagem
+    
+    def fechar(self):
+        """Encerra as conexões ociosas do pool"""
+        while True:
+            try:
+                conexao, _ = self._conexoes.get_nowait()
+            except queue.Empty:
+                return
+            
+            try:
+                conexao.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+    
+    def _descrever_acordao(self, acordao_id):
+        """Linha do resumo para um acórdão"""
+        acordao = self.obter_acordao(acordao_id) if self.obter_acordao else None
+        
+        if not acordao:
+            return acordao_id
+        
+        return (f"Acórdão {acordao.get('numeroAcordao', '')}/{acordao.get('anoAcordao', '')} "
+                f"- {acordao.get('colegiado', '')}: {acordao.get('titulo', '')} {acordao.get('urlAcordao', '')}").strip()
+    
+    def _enviar_com_tentativas(self, mensagem):
+        """Envia uma mensagem, repetindo em caso de falha temporária"""
+        for tentativa in range(self.tentativas):
+            if tentativa:
+                time.sleep(self.espera_inicial * 2 ** (tentativa - 1))
+            
+            conexao = None
+            try:
+                conexao = self._obter_conexao()
+                conexao.send_message(mensagem)
+                self._devolver(conexao)
+                return True
+            
+            except smtplib.SMTPRecipientsRefused as e:
+                # Destinatário recusado: a conexão continua válida, mas não adianta repetir
+                self._devolver(conexao)
+                print(f"Destinatário recusado {mensagem['To']}: {e}")
+                return False
+            
+            except smtplib.SMTPResponseException as e:
+                # Códigos 5xx são falhas permanentes
+                self._descartar(conexao)
+                if e.smtp_code >= 500:
+                    print(f"Erro permanente ao enviar para {mensagem['To']}: {e}")
+                    return False
+                print(f"Erro temporário ao enviar para {mensagem['To']}: {e}")
+            
+            except (smtplib.SMTPException, OSError) as e:
+                # Conexão encerrada pelo servidor ou falha de rede
+                self._descartar(conexao)
+                print(f"Erro ao enviar para {mensagem['To']}: {e}")
+        
+        return False
+    
+    def _obter_conexao(self):
+        """Retorna uma conexão ociosa do pool ou abre uma nova"""
+        while True:
+            try:
+                conexao, devolvida_em = self._conexoes.get_nowait()
+            except queue.Empty:
+                break
+            
+            # Conexões ociosas há algum tempo são conferidas antes do uso; as
+            # encerradas pelo servidor são descartadas sem consumir tentativas
+            if time.monotonic() - devolvida_em < self.ociosidade_verificacao or self._ativa(conexao):
+                return conexao
+            
+            self._descartar(conexao)
+        
+        conexao = smtplib.SMTP(self.host, self.porta, timeout=self.timeout)
+        
+        if self.usar_tls:
+            conexao.starttls()
+        
+        if self.usuario:
+            conexao.login(self.usuario, self.senha)
+        
+        return conexao
+    
+    def _ativa(self, conexao):
+        """Confere com NOOP se o servidor ainda mantém a conexão"""
+        try:
+            return conexao.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+    
+    def _devolver(self, conexao):
+        """Devolve uma conexão válida ao pool"""
+        self._conexoes.put((conexao, time.monotonic()))
+    
+    def _descartar(self, conexao):
+        """Fecha uma conexão com falha, sem devolvê-la ao pool"""
+        if conexao is None:
+            return
+        
+        try:
+            conexao.close()
+        except (smtplib.SMTPException, OSError):
+            pass
@@ -1,19 +1,106 @@
 import os
-import pandas as pd
+import csv
+import io
 import json
+import time
+import uuid
+import hashlib
+import queue
 import tempfile
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import chain
+
+from jurisprudencia_api import versao_acordao, identificador_acordao
+from metricas import registrar_cache
+
+# Extensão dos arquivos gerados por formato de exportação
+EXTENSOES_EXPORTACAO = {
+    'csv': '.csv',
+    'json': '.json',
+    'ndjson': '.ndjson',
+    'parquet': '.parquet',
+    'arrow': '.arrows',
+    'pdf': '.pdf'
+}
+
+# Tipo MIME enviado na resposta HTTP por formato de exportação
+TIPOS_MIME_EXPORTACAO = {
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'pdf': 'application/pdf'
+}
+
+# Colunas exportadas em CSV, na ordem em que aparecem no arquivo
+COLUNAS_CSV = [
+    'numeroAcordao', 'anoAcordao', 'colegiado', 'relator', 
+    'dataSessao', 'titulo', 'sumario', 'urlAcordao'
+]
+
+# Colunas de classificação, incluídas apenas se presentes nos acórdãos
+COLUNAS_CLASSIFICACAO_CSV = ['relevancia', 'impacto', 'inovacao', 'temas', 'subtemas']
+
+# Quantidade de linhas acumuladas antes de emitir um bloco de CSV
+LINHAS_POR_BLOCO_CSV = 500
+
+# Quantidade de acórdãos serializados antes de emitir um bloco de JSON/NDJSON
+REGISTROS_POR_BLOCO_JSON = 500
+
+# Colunas exportadas em Parquet/Arrow (além das colunas de classificação)
+COLUNAS_ARROW = ['id', 'key'] + COLUNAS_CSV
+
+# Colunas com poucos valores distintos, gravadas com codificação de dicionário
+COLUNAS_DICIONARIO_ARROW = ['colegiado', 'relator']
+
+# Quantidade de acórdãos por lote (record batch) de Parquet/Arrow
+REGISTROS_POR_LOTE_ARROW = 10000
+
+# Formatos incluídos no pacote zip quando o cliente não escolhe
+FORMATOS_PACOTE = ['csv', 'json', 'parquet', 'pdf']
+
+# Formatos já comprimidos, armazenados sem nova compressão no pacote zip
+FORMATOS_COMPRIMIDOS = ['parquet', 'arrow', 'pdf']
+
+# Quantidade de acórdãos enviados de uma vez a cada exportador do pacote
+REGISTROS_POR_LOTE_PACOTE = 500
+
+# Lotes que cada exportador do pacote pode acumular antes de bloquear a leitura
+LOTES_EM_ESPERA_PACOTE = 8
+
+# Tamanho dos blocos lidos dos arquivos ao montar o pacote zip
+TAMANHO_BLOCO_ZIP = 1024 * 1024
+
+# Tempo, em segundos, que um arquivo em cache pode ficar sem ser usado
+TTL_CACHE_EXPORTACAO = 3600
+
+# Espaço máximo em disco ocupado pelo cache de exportações (1 GiB)
+TAMANHO_MAXIMO_CACHE_EXPORTACAO = 1024 ** 3
+
+# Versão do conteúdo gerado pelos exportadores; alterar invalida o cache
+VERSAO_CACHE_EXPORTACAO = 1
+
+# Quantidade de acórdãos por fragmento de PDF renderizado em paralelo
+# (múltiplo de 3 para manter as quebras de página do relatório)
+ACORDAOS_POR_FRAGMENTO_PDF = 60
 
 class ExportacaoService:
     """
     Serviço para exportação de acórdãos em diferentes formatos
     """
-    def __init__(self):
+    def __init__(self, cache=None):
         # Classe para exportação específica por formato
         self.exportador = ExportadorAcordaos()
         
         # Diretório para arquivos temporários
         self.diretorio_exportacao = tempfile.gettempdir()
+        
+        # Cache de arquivos exportados, endereçado pelo conteúdo
+        self.cache = cache or CacheExportacoes()
     
     def exportar(self, acordaos, formato, caminho_arquivo=None):
         """
@@ -21,7 +108,7 @@ class ExportacaoService:
         
         Args:
             acordaos (list): Lista de acórdãos para exportar
-            formato (str): Formato de exportação ('csv', 'json', 'pdf')
+            formato (str): Formato de exportação ('csv', 'json', 'ndjson', 'parquet', 'arrow', 'pdf')
             caminho_arquivo (str, optional): Caminho para salvar o arquivo
             
         Returns:
@@ -36,13 +123,7 @@ class ExportacaoService:
             nome_arquivo = f"acordaos_exportados_{timestamp}"
             
             # Define extensão baseada no formato
-            extensoes = {
-                'csv': '.csv',
-                'json': '.json',
-                'pdf': '.pdf'
-            }
-            
-            extensao = extensoes.get(formato, '.txt')
+            extensao = EXTENSOES_EXPORTACAO.get(formato, '.txt')
             caminho_arquivo = os.path.join(self.diretorio_exportacao, nome_arquivo + extensao)
         
         # Exporta no formato especificado
@@ -50,47 +131,353 @@ class ExportacaoService:
             return self.exportador.exportar_csv(acordaos, caminho_arquivo)
         elif formato.lower() == 'json':
             return self.exportador.exportar_json(acordaos, caminho_arquivo)
+        elif formato.lower() == 'ndjson':
+            return self.exportador.exportar_ndjson(acordaos, caminho_arquivo)
+        elif formato.lower() == 'parquet':
+            return self.exportador.exportar_parquet(acordaos, caminho_arquivo)
+        elif formato.lower() == 'arrow':
+            return self.exportador.exportar_arrow(acordaos, caminho_arquivo)
         elif formato.lower() == 'pdf':
             return self.exportador.exportar_pdf(acordaos, caminho_arquivo)
         else:
             return False
     
+    def exportar_com_cache(self, obter_acordaos, formato):
+        """
+        Exporta acórdãos reaproveitando um arquivo idêntico já gerado
+        
+        Os acórdãos são percorridos uma vez para calcular a chave do cache
+        e, apenas se o arquivo não existir, uma segunda vez para exportar.
+        
+        Args:
+            obter_acordaos (callable): Função sem argumentos que retorna um
+                novo iterável com os acórdãos a cada chamada
+            formato (str): Formato de exportação
+            
+        Returns:
+            str: Caminho do arquivo exportado, ou None em caso de falha
+        """
+        formato = formato.lower()
+        chave = self.cache.calcular_chave(obter_acordaos(), formato)
+        
+        caminho_arquivo = self.cache.obter(chave, formato)
+        if caminho_arquivo:
+            return caminho_arquivo
+        
+        return self.cache.gerar(
+            chave,
+            formato,
+            lambda destino: self.exportar(obter_acordaos(), formato, destino)
+        )
+    
+    def exportar_stream(self, acordaos, formato, comprimir=False):
+        """
+        Exporta acórdãos em blocos, para envio direto na resposta HTTP
+        
+        Args:
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
+            formato (str): Formato de exportação ('csv', 'json', 'ndjson')
+            comprimir (bool): Se True, comprime os blocos com gzip
+            
+        Returns:
+            generator: Blocos do arquivo exportado (str, ou bytes se
+            comprimido), ou None se o formato não suportar exportação em blocos
+        """
+        if formato.lower() == 'csv':
+            blocos = self.exportador.gerar_csv(acordaos)
+        elif formato.lower() == 'json':
+            blocos = self.exportador.gerar_json(acordaos)
+        elif formato.lower() == 'ndjson':
+            blocos = self.exportador.gerar_ndjson(acordaos)
+        else:
+            return None
+        
+        if comprimir:
+            return comprimir_gzip(blocos)
+        
+        return blocos
+    
     def exportar_multiplos_formatos(self, acordaos, formatos, nome_base):
         """
         Exporta acórdãos em múltiplos formatos
         
+        Os acórdãos são percorridos uma única vez e entregues em paralelo aos
+        exportadores de cada formato.
+        
         Args:
-            acordaos (list): Lista de acórdãos para exportar
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
             formatos (list): Lista de formatos para exportação
             nome_base (str): Nome base para os arquivos
             
         Returns:
             dict: Dicionário com resultados da exportação para cada formato
         """
-        resultados = {}
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        caminhos = {}
         
         for formato in formatos:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            
             # Define extensão baseada no formato
-            extensoes = {
-                'csv': '.csv',
-                'json': '.json',
-                'pdf': '.pdf'
+            extensao = EXTENSOES_EXPORTACAO.get(formato, '.txt')
+            caminhos[formato] = os.path.join(self.diretorio_exportacao, f"{nome_base}_{formato}_{timestamp}{extensao}")
+        
+        sucessos = self._exportar_em_paralelo(acordaos, caminhos)
+        
+        return {
+            formato: {
+                'sucesso': sucessos[formato],
+                'caminho': caminhos[formato] if sucessos[formato] else None
             }
+            for formato in formatos
+        }
+    
+    def exportar_pacote(self, acordaos, formatos=None, nome_base='acordaos_exportados'):
+        """
+        Exporta acórdãos em vários formatos reunidos em um único arquivo zip
+        
+        Os arquivos são gerados em paralelo, com uma única leitura dos
+        acórdãos, e o zip é emitido em blocos à medida que é montado.
+        
+        Args:
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
+            formatos (list, optional): Formatos incluídos (padrão: FORMATOS_PACOTE)
+            nome_base (str): Nome base dos arquivos dentro do zip
             
-            extensao = extensoes.get(formato, '.txt')
-            caminho_arquivo = os.path.join(self.diretorio_exportacao, f"{nome_base}_{formato}_{timestamp}{extensao}")
+        Yields:
+            bytes: Blocos do arquivo zip
+        """
+        formatos = [formato.lower() for formato in (formatos or FORMATOS_PACOTE)]
+        
+        with tempfile.TemporaryDirectory(prefix='acordaos_pacote_') as diretorio:
+            caminhos = {
+                formato: os.path.join(diretorio, nome_base + EXTENSOES_EXPORTACAO.get(formato, '.txt'))
+                for formato in formatos
+            }
             
-            # Exporta no formato
-            resultado = self.exportar(acordaos, formato, caminho_arquivo)
+            sucessos = self._exportar_em_paralelo(acordaos, caminhos)
             
-            resultados[formato] = {
-                'sucesso': resultado,
-                'caminho': caminho_arquivo if resultado else None
-            }
+            saida = _SaidaZip()
+            
+            with zipfile.ZipFile(saida, 'w') as pacote:
+                for formato, caminho_arquivo in caminhos.items():
+                    if not sucessos[formato]:
+                        continue
+                    
+                    info = zipfile.ZipInfo(os.path.basename(caminho_arquivo), datetime.now().timetuple()[:6])
+                    info.compress_type = zipfile.ZIP_STORED if formato in FORMATOS_COMPRIMIDOS else zipfile.ZIP_DEFLATED
+                    
+                    with open(caminho_arquivo, 'rb') as origem, pacote.open(info, 'w', force_zip64=True) as destino:
+                        for bloco in iter(lambda: origem.read(TAMANHO_BLOCO_ZIP), b''):
+                            destino.write(bloco)
+                            yield saida.retirar()
+                    
+                    yield saida.retirar()
+            
+            # Diretório central do zip, gravado ao fechar o arquivo
+            yield saida.retirar()
+    
+    def _exportar_em_paralelo(self, acordaos, caminhos):
+        """
+        Exporta os mesmos acórdãos em vários formatos com uma única leitura
+        
+        Cada formato tem seu exportador em uma thread, alimentado por uma fila
+        limitada de lotes; a leitura dos acórdãos avança no ritmo do
+        exportador mais lento, sem acumular todos em memória.
+        
+        Args:
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
+            caminhos (dict): Caminho do arquivo de destino por formato
+            
+        Returns:
+            dict: True ou False por formato, conforme o sucesso da exportação
+        """
+        filas = {formato: queue.Queue(maxsize=LOTES_EM_ESPERA_PACOTE) for formato in caminhos}
         
-        return resultados
+        def exportar_formato(formato):
+            try:
+                return self.exportar(_consumir_fila(filas[formato]), formato, caminhos[formato])
+            finally:
+                # Um exportador que falhou continua esvaziando sua fila, para
+                # não bloquear a leitura dos demais
+                for _ in _consumir_fila(filas[formato]):
+                    pass
+        
+        with ThreadPoolExecutor(max_workers=max(len(caminhos), 1), thread_name_prefix='pacote') as executor:
+            futuros = {formato: executor.submit(exportar_formato, formato) for formato in caminhos}
+            
+            try:
+                lote = []
+                for acordao in acordaos:
+                    lote.append(acordao)
+                    
+                    if len(lote) == REGISTROS_POR_LOTE_PACOTE:
+                        for fila in filas.values():
+                            fila.put(lote)
+                        lote = []
+                
+                if lote:
+                    for fila in filas.values():
+                        fila.put(lote)
+            finally:
+                for fila in filas.values():
+                    fila.put(None)
+            
+            return {formato: futuro.result() for formato, futuro in futuros.items()}
+
+
+class CacheExportacoes:
+    """
+    Cache de arquivos exportados, endereçado por um hash do conteúdo
+    
+    A chave combina o formato e o ID e a versão de cada acórdão, de modo que
+    exportações idênticas reaproveitam o mesmo arquivo. Arquivos sem uso há
+    mais que o TTL são removidos, assim como os menos usados recentemente
+    quando o cache ultrapassa o espaço máximo.
+    """
+    def __init__(self, diretorio=None, ttl=TTL_CACHE_EXPORTACAO, tamanho_maximo=TAMANHO_MAXIMO_CACHE_EXPORTACAO):
+        # Diretório para armazenar os arquivos em cache
+        self.diretorio = diretorio or os.path.join(tempfile.gettempdir(), 'acordaos_exportados')
+        os.makedirs(self.diretorio, exist_ok=True)
+        
+        # Limites de permanência e de espaço em disco
+        self.ttl = ttl
+        self.tamanho_maximo = tamanho_maximo
+    
+    def calcular_chave(self, acordaos, formato):
+        """
+        Calcula a chave do cache para uma exportação
+        
+        Args:
+            acordaos (iterable): Acórdãos da exportação, na ordem exportada
+            formato (str): Formato de exportação
+            
+        Returns:
+            str: Chave hexadecimal
+        """
+        hash_exportacao = hashlib.sha256(f'{VERSAO_CACHE_EXPORTACAO}:{formato}'.encode('utf-8'))
+        
+        for acordao in acordaos:
+            identificador = identificador_acordao(acordao) or ''
+            hash_exportacao.update(f'\n{identificador}\0{versao_acordao(acordao)}'.encode('utf-8'))
+        
+        return hash_exportacao.hexdigest()
+    
+    def obter(self, chave, formato):
+        """
+        Busca um arquivo no cache
+        
+        Args:
+            chave (str): Chave da exportação
+            formato (str): Formato de exportação
+            
+        Returns:
+            str: Caminho do arquivo ou None se não estiver em cache
+        """
+        caminho_arquivo = self._caminho(chave, formato)
+        
+        try:
+            # Marca o uso do arquivo, adiando sua expiração
+            os.utime(caminho_arquivo)
+        except FileNotFoundError:
+            registrar_cache('exportacao', False)
+            return None
+        
+        registrar_cache('exportacao', True)
+        return caminho_arquivo
+    
+    def gerar(self, chave, formato, exportar):
+        """
+        Gera um arquivo e o adiciona ao cache
+        
+        Args:
+            chave (str): Chave da exportação
+            formato (str): Formato de exportação
+            exportar (callable): Função que recebe o caminho de destino e
+                retorna True se o arquivo foi gerado com sucesso
+            
+        Returns:
+            str: Caminho do arquivo em cache, ou None em caso de falha
+        """
+        caminho_arquivo = self._caminho(chave, formato)
+        
+        # Gera em um nome exclusivo e publica com uma troca atômica, para que
+        # exportações concorrentes nunca vejam um arquivo incompleto
+        caminho_temp = os.path.join(self.diretorio, f'.{uuid.uuid4().hex}.tmp')
+        
+        try:
+            if not exportar(caminho_temp):
+                return None
+            
+            os.replace(caminho_temp, caminho_arquivo)
+        finally:
+            if os.path.exists(caminho_temp):
+                os.remove(caminho_temp)
+        
+        # O arquivo recém-publicado é o mais novo e seria o primeiro a sair
+        # se sozinho ultrapassasse o espaço máximo
+        self.limpar(preservar=caminho_arquivo)
+        
+        # Uma limpeza concorrente (ex.: de outro processo) pode tê-lo removido
+        if not os.path.exists(caminho_arquivo):
+            return None
+        
+        return caminho_arquivo
+    
+    def limpar(self, preservar=None):
+        """
+        Remove arquivos expirados e, se necessário, os menos usados recentemente
+        
+        Args:
+            preservar (str, optional): Caminho de um arquivo que não deve ser
+                removido (ex.: o que acabou de ser gerado)
+            
+        Returns:
+            int: Quantidade de arquivos removidos
+        """
+        agora = time.time()
+        arquivos = []
+        removidos = 0
+        tamanho_preservado = 0
+        
+        for entrada in os.scandir(self.diretorio):
+            try:
+                info = entrada.stat()
+            except FileNotFoundError:
+                continue
+            
+            # Temporários só são removidos se abandonados (ex.: processo encerrado)
+            if entrada.name.endswith('.tmp') and agora - info.st_mtime <= self.ttl:
+                continue
+            
+            if entrada.path == preservar:
+                tamanho_preservado = info.st_size
+            elif agora - info.st_mtime > self.ttl:
+                removidos += self._remover(entrada.path)
+            else:
+                arquivos.append((info.st_mtime, info.st_size, entrada.path))
+        
+        # Respeita o espaço máximo removendo os arquivos usados há mais tempo
+        tamanho_total = tamanho_preservado + sum(tamanho for _, tamanho, _ in arquivos)
+        
+        for _, tamanho, caminho_arquivo in sorted(arquivos):
+            if tamanho_total <= self.tamanho_maximo:
+                break
+            
+            removidos += self._remover(caminho_arquivo)
+            tamanho_total -= tamanho
+        
+        return removidos
+    
+    def _caminho(self, chave, formato):
+        """Caminho do arquivo em cache para uma chave"""
+        return os.path.join(self.diretorio, chave + EXTENSOES_EXPORTACAO.get(formato, '.txt'))
+    
+    def _remover(self, caminho_arquivo):
+        """Remove um arquivo, ignorando se já tiver sido removido"""
+        try:
+            os.remove(caminho_arquivo)
+            return 1
+        except FileNotFoundError:
+            return 0
 
 
 class ExportadorAcordaos:
@@ -102,44 +489,71 @@ class ExportadorAcordaos:
         Exporta acórdãos para CSV
         
         Args:
-            acordaos (list): Lista de acórdãos para exportar
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
             caminho_arquivo (str): Caminho para salvar o arquivo CSV
             
         Returns:
             bool: True se a exportação foi bem-sucedida, False caso contrário
         """
         try:
-            # Converte a lista de acórdãos para DataFrame
-            df = pd.DataFrame(acordaos)
-            
-            # Seleciona colunas relevantes
-            colunas = [
-                'numeroAcordao', 'anoAcordao', 'colegiado', 'relator', 
-                'dataSessao', 'titulo', 'sumario', 'urlAcordao'
-            ]
-            
-            # Adiciona colunas de classificação se existirem
-            for col in ['relevancia', 'impacto', 'inovacao', 'temas', 'subtemas']:
-                if col in df.columns:
-                    colunas.append(col)
-            
-            # Filtra apenas as colunas existentes
-            colunas_existentes = [col for col in colunas if col in df.columns]
-            
-            # Exporta para CSV
-            df[colunas_existentes].to_csv(caminho_arquivo, index=False, encoding='utf-8-sig')
+            # Grava os blocos à medida que são gerados (o BOM vem no primeiro)
+            with open(caminho_arquivo, 'w', encoding='utf-8', newline='') as f:
+                for bloco in self.gerar_csv(acordaos):
+                    f.write(bloco)
             
             return True
         except Exception as e:
             print(f"Erro ao exportar para CSV: {e}")
             return False
     
+    def gerar_csv(self, acordaos, linhas_por_bloco=LINHAS_POR_BLOCO_CSV):
+        """
+        Gera o conteúdo CSV em blocos, sem carregar todos os acórdãos em memória
+        
+        As colunas são definidas a partir do primeiro acórdão, que deve ter o
+        mesmo formato dos demais (por exemplo, todos classificados ou nenhum).
+        
+        Args:
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
+            linhas_por_bloco (int): Quantidade de linhas por bloco emitido
+            
+        Yields:
+            str: Bloco de texto CSV; o primeiro contém o BOM e o cabeçalho
+        """
+        iterador = iter(acordaos)
+        primeiro = next(iterador, None)
+        
+        if primeiro is None:
+            return
+        
+        # Seleciona colunas relevantes existentes no acórdão
+        colunas = [col for col in COLUNAS_CSV + COLUNAS_CLASSIFICACAO_CSV if col in primeiro]
+        
+        buffer = io.StringIO()
+        escritor = csv.DictWriter(buffer, fieldnames=colunas, extrasaction='ignore', lineterminator='\n')
+        
+        # BOM para que planilhas reconheçam o arquivo como UTF-8
+        buffer.write('\ufeff')
+        escritor.writeheader()
+        
+        for i, acordao in enumerate(chain([primeiro], iterador), 1):
+            escritor.writerow(acordao)
+            
+            # Emite o bloco acumulado e reaproveita o buffer
+            if i % linhas_por_bloco == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        
+        if buffer.tell():
+            yield buffer.getvalue()
+    
     def exportar_json(self, acordaos, caminho_arquivo):
         """
         Exporta acórdãos para JSON
         
         Args:
-            acordaos (list): Lista de acórdãos para exportar
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
             caminho_arquivo (str): Caminho para salvar o arquivo JSON
             
         Returns:
@@ -147,57 +561,313 @@ class ExportadorAcordaos:
         """
         try:
             with open(caminho_arquivo, 'w', encoding='utf-8') as f:
-                json.dump(acordaos, f, ensure_ascii=False, indent=4)
+                for bloco in self.gerar_json(acordaos):
+                    f.write(bloco)
             
             return True
         except Exception as e:
             print(f"Erro ao exportar para JSON: {e}")
             return False
     
-    def exportar_pdf(self, acordaos, caminho_arquivo):
+    def exportar_ndjson(self, acordaos, caminho_arquivo):
+        """
+        Exporta acórdãos para NDJSON (um objeto JSON por linha)
+        
+        Args:
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
+            caminho_arquivo (str): Caminho para salvar o arquivo NDJSON
+            
+        Returns:
+            bool: True se a exportação foi bem-sucedida, False caso contrário
+        """
+        try:
+            with open(caminho_arquivo, 'w', encoding='utf-8') as f:
+                for bloco in self.gerar_ndjson(acordaos):
+                    f.write(bloco)
+            
+            return True
+        except Exception as e:
+            print(f"Erro ao exportar para NDJSON: {e}")
+            return False
+    
+    def gerar_json(self, acordaos, registros_por_bloco=REGISTROS_POR_BLOCO_JSON):
+        """
+        Gera um array JSON em blocos, serializando um acórdão por vez
+        
+        Args:
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
+            registros_por_bloco (int): Quantidade de acórdãos por bloco emitido
+            
+        Yields:
+            str: Bloco de texto JSON; a concatenação dos blocos é um array válido
+        """
+        partes = ['[']
+        separador = '\n'
+        
+        for i, acordao in enumerate(acordaos, 1):
+            partes.append(separador)
+            partes.append(json.dumps(acordao, ensure_ascii=False))
+            separador = ',\n'
+            
+            if i % registros_por_bloco == 0:
+                yield ''.join(partes)
+                partes = []
+        
+        partes.append('\n]\n' if separador == ',\n' else ']\n')
+        yield ''.join(partes)
+    
+    def gerar_ndjson(self, acordaos, registros_por_bloco=REGISTROS_POR_BLOCO_JSON):
+        """
+        Gera NDJSON em blocos, serializando um acórdão por linha
+        
+        Args:
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
+            registros_por_bloco (int): Quantidade de acórdãos por bloco emitido
+            
+        Yields:
+            str: Bloco de linhas NDJSON
+        """
+        partes = []
+        
+        for i, acordao in enumerate(acordaos, 1):
+            partes.append(json.dumps(acordao, ensure_ascii=False))
+            partes.append('\n')
+            
+            if i % registros_por_bloco == 0:
+                yield ''.join(partes)
+                partes = []
+        
+        if partes:
+            yield ''.join(partes)
+    
+    def exportar_parquet(self, acordaos, caminho_arquivo, registros_por_lote=REGISTROS_POR_LOTE_ARROW):
+        """
+        Exporta acórdãos para Parquet, em lotes e com compressão zstd
+        
+        Args:
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
+            caminho_arquivo (str): Caminho para salvar o arquivo Parquet
+            registros_por_lote (int): Quantidade de acórdãos por lote
+            
+        Returns:
+            bool: True se a exportação foi bem-sucedida, False caso contrário
+        """
+        try:
+            import pyarrow.parquet as pq
+            
+            escritor = None
+            
+            try:
+                for lote in self.gerar_lotes_arrow(acordaos, registros_por_lote):
+                    if escritor is None:
+                        escritor = pq.ParquetWriter(
+                            caminho_arquivo,
+                            lote.schema,
+                            compression='zstd',
+                            use_dictionary=COLUNAS_DICIONARIO_ARROW
+                        )
+                    escritor.write_batch(lote)
+            finally:
+                if escritor is not None:
+                    escritor.close()
+            
+            return escritor is not None
+        except Exception as e:
+            print(f"Erro ao exportar para Parquet: {e}")
+            return False
+    
+    def exportar_arrow(self, acordaos, caminho_arquivo, registros_por_lote=REGISTROS_POR_LOTE_ARROW):
+        """
+        Exporta acórdãos para Arrow IPC (formato stream), com compressão zstd
+        
+        O formato stream permite que os dicionários de colegiado e relator
+        cresçam entre lotes (deltas), sem reconstruir lotes já gravados.
+        
+        Args:
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
+            caminho_arquivo (str): Caminho para salvar o arquivo Arrow
+            registros_por_lote (int): Quantidade de acórdãos por lote
+            
+        Returns:
+            bool: True se a exportação foi bem-sucedida, False caso contrário
+        """
+        try:
+            import pyarrow as pa
+            
+            opcoes = pa.ipc.IpcWriteOptions(compression='zstd', emit_dictionary_deltas=True)
+            escritor = None
+            
+            with pa.OSFile(caminho_arquivo, 'wb') as arquivo:
+                for lote in self.gerar_lotes_arrow(acordaos, registros_por_lote):
+                    if escritor is None:
+                        escritor = pa.ipc.new_stream(arquivo, lote.schema, options=opcoes)
+                    escritor.write_batch(lote)
+                
+                if escritor is not None:
+                    escritor.close()
+            
+            return escritor is not None
+        except Exception as e:
+            print(f"Erro ao exportar para Arrow: {e}")
+            return False
+    
+    def gerar_lotes_arrow(self, acordaos, registros_por_lote=REGISTROS_POR_LOTE_ARROW):
+        """
+        Converte acórdãos em lotes colunares do Arrow
+        
+        As colunas são definidas a partir do primeiro acórdão. Colegiado e
+        relator usam dicionários que só crescem, compartilhados entre os lotes;
+        temas e subtemas viram colunas de listas de texto.
+        
+        Args:
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
+            registros_por_lote (int): Quantidade de acórdãos por lote
+            
+        Yields:
+            pyarrow.RecordBatch: Lote de acórdãos
+        """
+        import pyarrow as pa
+        
+        iterador = iter(acordaos)
+        primeiro = next(iterador, None)
+        
+        if primeiro is None:
+            return
+        
+        # Seleciona colunas relevantes existentes no acórdão
+        colunas = [col for col in COLUNAS_ARROW + COLUNAS_CLASSIFICACAO_CSV if col in primeiro]
+        
+        tipos = {}
+        for col in colunas:
+            if col in COLUNAS_DICIONARIO_ARROW:
+                tipos[col] = pa.dictionary(pa.int32(), pa.string())
+            elif col in ('temas', 'subtemas'):
+                tipos[col] = pa.list_(pa.string())
+            elif col in ('relevancia', 'impacto', 'inovacao'):
+                tipos[col] = pa.float64()
+            else:
+                tipos[col] = pa.string()
+        
+        schema = pa.schema([(col, tipos[col]) for col in colunas])
+        
+        # Valores já vistos em cada coluna de dicionário, na ordem de inclusão
+        dicionarios = {col: {} for col in colunas if col in COLUNAS_DICIONARIO_ARROW}
+        
+        def montar_lote(registros):
+            arrays = []
+            for col in colunas:
+                valores = [acordao.get(col) for acordao in registros]
+                
+                if col in dicionarios:
+                    indices_valores = dicionarios[col]
+                    indices = [
+                        None if valor is None else indices_valores.setdefault(str(valor), len(indices_valores))
+                        for valor in valores
+                    ]
+                    arrays.append(pa.DictionaryArray.from_arrays(
+                        pa.array(indices, type=pa.int32()),
+                        pa.array(list(indices_valores), type=pa.string())
+                    ))
+                elif col in ('temas', 'subtemas'):
+                    arrays.append(pa.array(
+                        [None if valor is None else [str(item) for item in valor] for valor in valores],
+                        type=tipos[col]
+                    ))
+                elif col in ('relevancia', 'impacto', 'inovacao'):
+                    arrays.append(pa.array(
+                        [None if valor is None else float(valor) for valor in valores],
+                        type=tipos[col]
+                    ))
+                else:
+                    arrays.append(pa.array(
+                        [None if valor is None else str(valor) for valor in valores],
+                        type=tipos[col]
+                    ))
+            
+            return pa.RecordBatch.from_arrays(arrays, schema=schema)
+        
+        registros = []
+        
+        for acordao in chain([primeiro], iterador):
+            registros.append(acordao)
+            
+            if len(registros) == registros_por_lote:
+                yield montar_lote(registros)
+                registros = []
+        
+        if registros:
+            yield montar_lote(registros)
+    
+    def exportar_pdf(self, acordaos, caminho_arquivo, acordaos_por_fragmento=ACORDAOS_POR_FRAGMENTO_PDF, max_processos=None):
         """
         Exporta acórdãos para PDF
         
+        Relatórios maiores que um fragmento são divididos e renderizados em
+        processos paralelos, e os PDFs parciais são unidos ao final.
+        
         Args:
-            acordaos (list): Lista de acórdãos para exportar
+            acordaos (iterable): Acórdãos para exportar (lista ou gerador)
             caminho_arquivo (str): Caminho para salvar o arquivo PDF
+            acordaos_por_fragmento (int): Quantidade de acórdãos por fragmento
+            max_processos (int, optional): Limite de processos de renderização
             
         Returns:
             bool: True se a exportação foi bem-sucedida, False caso contrário
         """
         try:
-            # Gera o HTML para o PDF
-            html_content = self.gerar_html_para_pdf(acordaos)
-            
-            # Salva o HTML temporariamente
-            html_temp = os.path.join(tempfile.gettempdir(), 'temp.html')
-            with open(html_temp, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            acordaos = list(acordaos)
+            fragmentos = [
+                acordaos[i:i + acordaos_por_fragmento]
+                for i in range(0, len(acordaos), acordaos_por_fragmento)
+            ]
             
             try:
-                # Tenta usar pdfkit se disponível
-                import pdfkit
-                pdfkit.from_file(html_temp, caminho_arquivo)
+                # A união dos fragmentos depende do pypdf
+                from pypdf import PdfWriter
             except ImportError:
-                # Fallback para reportlab se pdfkit não estiver disponível
-                self.exportar_pdf_reportlab(acordaos, caminho_arquivo)
+                PdfWriter = None
+            
+            # Importados aqui para não pesar na inicialização de quem não gera PDF
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
             
-            # Remove o arquivo HTML temporário
-            if os.path.exists(html_temp):
-                os.remove(html_temp)
+            if len(fragmentos) <= 1 or PdfWriter is None:
+                _renderizar_pdf(acordaos, caminho_arquivo)
+                return True
+            
+            with tempfile.TemporaryDirectory(prefix='acordaos_pdf_') as diretorio:
+                caminhos = [os.path.join(diretorio, f'fragmento_{i}.pdf') for i in range(len(fragmentos))]
+                
+                # Apenas o primeiro fragmento leva o título do relatório
+                titulos = [i == 0 for i in range(len(fragmentos))]
+                
+                processos = min(len(fragmentos), max_processos or os.cpu_count() or 1)
+                
+                # 'spawn' evita herdar locks de outras threads do servidor web
+                with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn')) as executor:
+                    list(executor.map(_renderizar_pdf, fragmentos, caminhos, titulos))
+                
+                # Une os fragmentos na ordem original
+                escritor = PdfWriter()
+                for caminho in caminhos:
+                    escritor.append(caminho)
+                
+                with open(caminho_arquivo, 'wb') as f:
+                    escritor.write(f)
             
             return True
         except Exception as e:
             print(f"Erro ao exportar para PDF: {e}")
             return False
     
-    def exportar_pdf_reportlab(self, acordaos, caminho_arquivo):
+    def exportar_pdf_reportlab(self, acordaos, caminho_arquivo, incluir_titulo=True):
         """
         Exporta acórdãos para PDF usando reportlab (fallback)
         
         Args:
             acordaos (list): Lista de acórdãos para exportar
             caminho_arquivo (str): Caminho para salvar o arquivo PDF
+            incluir_titulo (bool): Se True, inclui o título do relatório
         """
         try:
             from reportlab.lib.pagesizes import letter
@@ -211,21 +881,21 @@ class ExportadorAcordaos:
             
             # Cria estilos personalizados
             styles.add(ParagraphStyle(
-                name='Heading1',
+                name='AcordaoTitulo',
                 parent=styles['Heading1'],
                 fontSize=14,
                 spaceAfter=12
             ))
             
             styles.add(ParagraphStyle(
-                name='Heading2',
+                name='AcordaoSecao',
                 parent=styles['Heading2'],
                 fontSize=12,
                 spaceAfter=6
             ))
             
             styles.add(ParagraphStyle(
-                name='Normal',
+                name='AcordaoTexto',
                 parent=styles['Normal'],
                 fontSize=10,
                 spaceAfter=10
@@ -235,41 +905,42 @@ class ExportadorAcordaos:
             conteudo = []
             
             # Título do documento
-            conteudo.append(Paragraph("Acórdãos do TCU - Relatório", styles['Title']))
-            conteudo.append(Spacer(1, 12))
+            if incluir_titulo:
+                conteudo.append(Paragraph("Acórdãos do TCU - Relatório", styles['Title']))
+                conteudo.append(Spacer(1, 12))
             
             # Adiciona cada acórdão
             for acordao in acordaos:
                 # Título do acórdão
                 titulo = f"ACÓRDÃO Nº {acordao.get('numeroAcordao', 'N/A')}/{acordao.get('anoAcordao', 'N/A')} - {acordao.get('colegiado', 'N/A')}"
-                conteudo.append(Paragraph(titulo, styles['Heading1']))
+                conteudo.append(Paragraph(titulo, styles['AcordaoTitulo']))
                 
                 # Metadados
                 metadados = f"Relator: {acordao.get('relator', 'N/A')} | Data: {acordao.get('dataSessao', 'N/A')}"
-                conteudo.append(Paragraph(metadados, styles['Normal']))
+                conteudo.append(Paragraph(metadados, styles['AcordaoTexto']))
                 
                 # Temas e subtemas
                 if 'temas' in acordao and acordao['temas']:
                     temas = f"Temas: {', '.join(acordao['temas'])}"
-                    conteudo.append(Paragraph(temas, styles['Normal']))
+                    conteudo.append(Paragraph(temas, styles['AcordaoTexto']))
                 
                 if 'subtemas' in acordao and acordao['subtemas']:
                     subtemas = f"Subtemas: {', '.join(acordao['subtemas'])}"
-                    conteudo.append(Paragraph(subtemas, styles['Normal']))
+                    conteudo.append(Paragraph(subtemas, styles['AcordaoTexto']))
                 
                 # Classificações
                 if all(key in acordao for key in ['relevancia', 'impacto', 'inovacao']):
                     classificacoes = f"Relevância: {acordao['relevancia']} | Impacto: {acordao['impacto']} | Inovação: {acordao['inovacao']}"
-                    conteudo.append(Paragraph(classificacoes, styles['Normal']))
+                    conteudo.append(Paragraph(classificacoes, styles['AcordaoTexto']))
                 
                 # Sumário
-                conteudo.append(Paragraph("Sumário:", styles['Heading2']))
-                conteudo.append(Paragraph(acordao.get('sumario', 'Sumário não disponível'), styles['Normal']))
+                conteudo.append(Paragraph("Sumário:", styles['AcordaoSecao']))
+                conteudo.append(Paragraph(acordao.get('sumario', 'Sumário não disponível'), styles['AcordaoTexto']))
                 
                 # URL
                 if 'urlAcordao' in acordao:
                     url = f"URL: {acordao['urlAcordao']}"
-                    conteudo.append(Paragraph(url, styles['Normal']))
+                    conteudo.append(Paragraph(url, styles['AcordaoTexto']))
                 
                 # Separador
                 conteudo.append(Spacer(1, 20))
@@ -281,17 +952,19 @@ class ExportadorAcordaos:
             print(f"Erro ao exportar para PDF com reportlab: {e}")
             raise
     
-    def gerar_html_para_pdf(self, acordaos):
+    def gerar_html_para_pdf(self, acordaos, incluir_titulo=True):
         """
         Gera HTML formatado para conversão em PDF
         
         Args:
             acordaos (list): Lista de acórdãos
+            incluir_titulo (bool): Se True, inclui o título do relatório
             
         Returns:
             str: Conteúdo HTML formatado
         """
-        html = """
+        # As partes são acumuladas em lista e unidas uma única vez
+        partes = ["""
         <!DOCTYPE html>
         <html>
         <head>
@@ -309,45 +982,49 @@ class ExportadorAcordaos:
             </style>
         </head>
         <body>
+        """]
+        
+        if incluir_titulo:
+            partes.append("""
             <h1>Acórdãos do TCU - Relatório</h1>
-        """
+        """)
         
         for i, acordao in enumerate(acordaos):
-            html += f"""
+            partes.append(f"""
             <div class="acordao">
                 <div class="header">ACÓRDÃO Nº {acordao.get('numeroAcordao', 'N/A')}/{acordao.get('anoAcordao', 'N/A')} - {acordao.get('colegiado', 'N/A')}</div>
                 <div class="metadata">
                     <strong>Relator:</strong> {acordao.get('relator', 'N/A')} | 
                     <strong>Data:</strong> {acordao.get('dataSessao', 'N/A')}
                 </div>
-            """
+            """)
             
             # Adiciona temas e subtemas se existirem
             if 'temas' in acordao and acordao['temas']:
-                html += f"""
+                partes.append(f"""
                 <div class="metadata">
                     <strong>Temas:</strong> {', '.join(acordao['temas'])}
                 </div>
-                """
+                """)
             
             if 'subtemas' in acordao and acordao['subtemas']:
-                html += f"""
+                partes.append(f"""
                 <div class="metadata">
                     <strong>Subtemas:</strong> {', '.join(acordao['subtemas'])}
                 </div>
-                """
+                """)
             
             # Adiciona classificações se existirem
             if all(key in acordao for key in ['relevancia', 'impacto', 'inovacao']):
-                html += f"""
+                partes.append(f"""
                 <div class="metadata">
                     <strong>Relevância:</strong> {acordao['relevancia']} | 
                     <strong>Impacto:</strong> {acordao['impacto']} | 
                     <strong>Inovação:</strong> {acordao['inovacao']}
                 </div>
-                """
+                """)
             
-            html += f"""
+            partes.append(f"""
                 <div class="sumario">
                     <strong>Sumário:</strong><br>
                     {acordao.get('sumario', 'Sumário não disponível')}
@@ -356,15 +1033,107 @@ class ExportadorAcordaos:
                     <strong>URL:</strong> <a href="{acordao.get('urlAcordao', '#')}">{acordao.get('urlAcordao', 'Link não disponível')}</a>
                 </div>
             </div>
-            """
+            """)
             
             # Adiciona quebra de página a cada 3 acórdãos
             if (i + 1) % 3 == 0 and i < len(acordaos) - 1:
-                html += '<div class="page-break"></div>'
+                partes.append('<div class="page-break"></div>')
         
-        html += """
+        partes.append("""
         </body>
         </html>
-        """
+        """)
+        
+        return ''.join(partes)
+
+
+def comprimir_gzip(blocos, nivel=6):
+    """
+    Comprime blocos de texto com gzip à medida que são gerados
+    
+    Args:
+        blocos (iterable): Blocos de texto (str) ou bytes
+        nivel (int): Nível de compressão (1 a 9)
         
-        return html
+    Yields:
+        bytes: Blocos comprimidos; a concatenação forma um arquivo .gz válido
+    """
+    # wbits=31 gera o cabeçalho e o rodapé do formato gzip
+    compressor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+    
+    for bloco in blocos:
+        if isinstance(bloco, str):
+            bloco = bloco.encode('utf-8')
+        
+        comprimido = compressor.compress(bloco)
+        if comprimido:
+            yield comprimido
+    
+    yield compressor.flush()
+
+
+def _renderizar_pdf(acordaos, caminho_arquivo, incluir_titulo=True):
+    """
+    Renderiza um PDF (ou fragmento de PDF) a partir de uma lista de acórdãos
+    
+    Função de módulo para poder ser executada em processos separados.
+    
+    Args:
+        acordaos (list): Lista de acórdãos
+        caminho_arquivo (str): Caminho para salvar o arquivo PDF
+        incluir_titulo (bool): Se True, inclui o título do relatório
+    """
+    exportador = ExportadorAcordaos()
+    
+    # Gera o HTML para o PDF
+    html_content = exportador.gerar_html_para_pdf(acordaos, incluir_titulo)
+    
+    # Salva o HTML em arquivo temporário exclusivo desta renderização
+    descritor, html_temp = tempfile.mkstemp(prefix='acordaos_', suffix='.html')
+    
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        
+        try:
+            # Tenta usar pdfkit se disponível
+            import pdfkit
+            pdfkit.from_file(html_temp, caminho_arquivo)
+        except ImportError:
+            # Fallback para reportlab se pdfkit não estiver disponível
+            exportador.exportar_pdf_reportlab(acordaos, caminho_arquivo, incluir_titulo)
+    finally:
+        # Remove o arquivo HTML temporário
+        os.remove(html_temp)
+
+
+def _consumir_fila(fila):
+    """Percorre os acórdãos recebidos em lotes por uma fila, até o lote None"""
+    while True:
+        lote = fila.get()
+        
+        if lote is None:
+            # Recoloca o marcador de fim para leituras posteriores da fila
+            fila.put(None)
+            return
+        
+        yield from lote
+
+
+class _SaidaZip:
+    """Destino sem posicionamento para o zipfile, lido em blocos"""
+    def __init__(self):
+        self.blocos = []
+    
+    def write(self, dados):
+        self.blocos.append(bytes(dados))
+        return len(dados)
+    
+    def flush(self):
+        pass
+    
+    def retirar(self):
+        """Retorna e descarta os bytes gravados desde a última chamada"""
+        dados = b''.join(self.blocos)
+        self.blocos = []
+        return dados
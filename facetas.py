@@ -0,0 +1,153 @@
+# Campos com contagem por faceta e a função que extrai os valores de um acórdão
+CAMPOS_FACETAS = {
+    'colegiado': lambda acordao: [acordao.get('colegiado')],
+    'relator': lambda acordao: [acordao.get('relator')],
+    'ano': lambda acordao: [acordao.get('anoAcordao')],
+    'tema': lambda acordao: acordao.get('temas') or []
+}
+
+# Filtros de filtrar_acordaos resolvidos pelos bitmaps; os demais são
+# conferidos apenas nos acórdãos que passaram por estes
+FILTROS_INDEXADOS = ('colegiado', 'relator')
+
+# Quantidade máxima de valores por faceta na resposta
+MAX_VALORES_FACETA = 50
+
+# Posições dos bits ligados em cada byte
+_BITS_BYTE = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def _contar_bits(valor):
+    """Quantidade de bits ligados (int.bit_count, a partir do Python 3.10)"""
+    return bin(valor).count('1')
+
+
+contar_bits = getattr(int, 'bit_count', _contar_bits)
+
+
+class IndiceFacetas:
+    """
+    Bitmaps dos acórdãos de cada valor de faceta
+    
+    Cada valor (ex.: colegiado 'Plenário') tem um inteiro em que o bit i indica
+    se o acórdão na posição i do acervo tem esse valor. O conjunto de
+    resultados de uma consulta também é um bitmap, e a contagem de cada valor
+    é a interseção dos dois seguida da contagem de bits, sem percorrer os
+    acórdãos.
+    """
+    def __init__(self, acordaos, filtrar):
+        """
+        Args:
+            acordaos (tuple): Acórdãos do acervo, na ordem das posições
+            filtrar (callable): Função de filtragem (ver filtrar_acordaos)
+        """
+        self.acordaos = acordaos
+        self.tamanho = len(acordaos)
+        self.todos = (1 << self.tamanho) - 1
+        self._filtrar = filtrar
+        
+        posicoes = {campo: {} for campo in CAMPOS_FACETAS}
+        
+        for posicao, acordao in enumerate(acordaos):
+            for campo, extrair in CAMPOS_FACETAS.items():
+                for valor in set(extrair(acordao)):
+                    if valor:
+                        posicoes[campo].setdefault(valor, []).append(posicao)
+        
+        # Campo -> valor -> bitmap
+        self.bitmaps = {
+            campo: {valor: self._bitmap(lista) for valor, lista in valores.items()}
+            for campo, valores in posicoes.items()
+        }
+    
+    def consultar(self, filtros=None):
+        """
+        Bitmap dos acórdãos que atendem aos filtros
+        
+        Colegiado e relator são resolvidos pelos bitmaps; os demais filtros
+        (texto, datas, exclusões) são conferidos só nos acórdãos restantes.
+        
+        Args:
+            filtros (dict, optional): Filtros (ver filtrar_acordaos)
+            
+        Returns:
+            int: Bitmap do conjunto de resultados
+        """
+        filtros = filtros or {}
+        resultado = self.todos
+        
+        colegiado = filtros.get('colegiado')
+        if colegiado:
+            resultado &= self._uniao('colegiado', lambda valor: valor.lower() == colegiado.lower())
+        
+        relator = filtros.get('relator')
+        if relator:
+            resultado &= self._uniao('relator', lambda valor: relator.lower() in valor.lower())
+        
+        restantes = {campo: valor for campo, valor in filtros.items() if campo not in FILTROS_INDEXADOS}
+        
+        if restantes and resultado:
+            candidatas = list(self.posicoes(resultado))
+            aceitos = {id(acordao) for acordao in self._filtrar([self.acordaos[posicao] for posicao in candidatas], restantes)}
+            resultado = self._bitmap(posicao for posicao in candidatas if id(self.acordaos[posicao]) in aceitos)
+        
+        return resultado
+    
+    def contar(self, resultado, limite=MAX_VALORES_FACETA):
+        """
+        Conta os resultados por valor de cada faceta
+        
+        Args:
+            resultado (int): Bitmap do conjunto de resultados
+            limite (int): Quantidade máxima de valores por faceta
+            
+        Returns:
+            dict: Campo -> [{'valor', 'total'}], do valor mais frequente ao menos
+        """
+        facetas = {}
+        
+        for campo, bitmaps in self.bitmaps.items():
+            contagens = []
+            
+            for valor, bitmap in bitmaps.items():
+                total = contar_bits(resultado & bitmap)
+                
+                if total:
+                    contagens.append((-total, valor))
+            
+            contagens.sort()
+            facetas[campo] = [{'valor': valor, 'total': -total} for total, valor in contagens[:limite]]
+        
+        return facetas
+    
+    def posicoes(self, bitmap):
+        """
+        Posições dos bits ligados de um bitmap, em ordem crescente
+        
+        Yields:
+            int: Posições no acervo
+        """
+        for indice, byte in enumerate(bitmap.to_bytes((self.tamanho + 7) // 8, 'little')):
+            if byte:
+                base = indice * 8
+                for bit in _BITS_BYTE[byte]:
+                    yield base + bit
+    
+    def _uniao(self, campo, corresponde):
+        """União dos bitmaps dos valores de um campo que atendem a um critério"""
+        resultado = 0
+        
+        for valor, bitmap in self.bitmaps[campo].items():
+            if corresponde(valor):
+                resultado |= bitmap
+        
+        return resultado
+    
+    def _bitmap(self, posicoes):
+        """Monta um bitmap a partir de posições"""
+        bits = bytearray((self.tamanho + 7) // 8)
+        
+        for posicao in posicoes:
+            bits[posicao >> 3] |= 1 << (posicao & 7)
+        
+        return int.from_bytes(bits, 'little')
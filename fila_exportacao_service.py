@@ -0,0 +1,249 @@
+import os
+import json
+import uuid
+import fcntl
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from exportacao_service import ExportacaoService
+
+# Quantidade de acórdãos processados entre duas atualizações de progresso
+PASSO_PROGRESSO = 500
+
+# Situações de um job de exportação
+STATUS_PENDENTE = 'pendente'
+STATUS_PROCESSANDO = 'processando'
+STATUS_CONCLUIDO = 'concluido'
+STATUS_ERRO = 'erro'
+
+
+class FilaExportacaoService:
+    """
+    Fila de exportações processadas em segundo plano
+    
+    Cada job é persistido em disco (estado e acórdãos de entrada, com o
+    arquivo gerado no cache de exportações), de modo que qualquer processo da
+    aplicação pode consultá-lo e jobs interrompidos são retomados quando o
+    serviço é reiniciado.
+    """
+    def __init__(self, exportacao_service=None, api_client=None, diretorio_jobs=None, max_workers=2):
+        # Serviço usado para gerar os arquivos
+        self.exportacao_service = exportacao_service or ExportacaoService()
+        
+        # Cliente usado para resolver exportações por consulta ao acervo
+        self.api_client = api_client
+        
+        # Diretório para armazenar os jobs
+        self.diretorio_jobs = diretorio_jobs or os.environ.get('DIRETORIO_EXPORTACOES') or os.path.join(os.path.dirname(__file__), 'data', 'exportacoes')
+        os.makedirs(self.diretorio_jobs, exist_ok=True)
+        
+        # Pool local de workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='exportacao')
+        self._lock = threading.Lock()
+        
+        # Retoma jobs que não terminaram antes do último reinício
+        self._retomar_jobs()
+    
+    def criar_job(self, acordaos, formato, consulta=None):
+        """
+        Cria um job de exportação e o envia para processamento
+        
+        Args:
+            acordaos (list): Lista de acórdãos para exportar (None se houver consulta)
+            formato (str): Formato de exportação ('csv', 'json', 'ndjson', 'parquet', 'arrow', 'pdf')
+            consulta (dict, optional): Argumentos de api_client.iterar_acordaos
+                ('filtros' e 'ids'), resolvidos apenas no processamento
+            
+        Returns:
+            str: ID do job criado
+        """
+        job_id = str(uuid.uuid4())
+        agora = datetime.now().isoformat()
+        
+        # A entrada guarda os acórdãos ou apenas a consulta que os seleciona
+        entrada = {'consulta': consulta} if consulta is not None else {'acordaos': acordaos}
+        
+        job = {
+            'id': job_id,
+            'formato': formato,
+            'status': STATUS_PENDENTE,
+            'processados': 0,
+            'total': len(acordaos) if consulta is None else None,
+            'criado_em': agora,
+            'atualizado_em': agora,
+            'arquivo': None,
+            'erro': None
+        }
+        
+        # Os acórdãos de entrada são gravados antes do estado do job, para
+        # que um job visível em disco sempre possa ser retomado
+        self._gravar_json(self._caminho_entrada(job_id), entrada)
+        self._gravar_json(self._caminho_job(job_id), job)
+        
+        self._executor.submit(self._processar_job, job_id)
+        
+        return job_id
+    
+    def consultar_job(self, job_id):
+        """
+        Consulta o estado de um job
+        
+        Args:
+            job_id (str): ID do job
+            
+        Returns:
+            dict: Estado do job ou None se não encontrado
+        """
+        # O ID compõe caminhos de arquivo, então só UUIDs são aceitos
+        try:
+            uuid.UUID(job_id)
+        except (ValueError, TypeError):
+            return None
+        
+        return self._ler_json(self._caminho_job(job_id))
+    
+    def caminho_artefato(self, job_id):
+        """
+        Retorna o caminho do arquivo gerado por um job concluído
+        
+        Args:
+            job_id (str): ID do job
+            
+        Returns:
+            str: Caminho do arquivo ou None se o job não estiver concluído ou
+            se o arquivo já tiver sido removido do cache de exportações
+        """
+        job = self.consultar_job(job_id)
+        
+        if not job or job['status'] != STATUS_CONCLUIDO:
+            return None
+        
+        return job['arquivo'] if os.path.exists(job['arquivo']) else None
+    
+    def _processar_job(self, job_id):
+        """Processa um job, se nenhum outro processo já o estiver processando"""
+        # Jobs já terminados não chegam a criar o arquivo de lock
+        if not self._em_aberto(self.consultar_job(job_id)):
+            return
+        
+        # O lock de arquivo é liberado pelo sistema se o processo morrer,
+        # permitindo que outro processo retome o job
+        with open(os.path.join(self.diretorio_jobs, f'{job_id}.lock'), 'w') as arquivo_lock:
+            try:
+                fcntl.flock(arquivo_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # O processo que detém o lock remove o arquivo ao terminar
+                return
+            
+            # Job terminado por outro processo entre a consulta e o lock
+            job = self.consultar_job(job_id)
+            
+            if not self._em_aberto(job):
+                os.remove(arquivo_lock.name)
+                return
+            
+            try:
+                self._atualizar_job(job_id, status=STATUS_PROCESSANDO, processados=0)
+                
+                entrada = self._ler_json(self._caminho_entrada(job_id))
+                formato = job['formato']
+                
+                def obter_acordaos():
+                    if 'consulta' in entrada:
+                        return self.api_client.iterar_acordaos(**entrada['consulta'])
+                    return entrada['acordaos']
+                
+                # Arquivos idênticos já gerados são reaproveitados do cache
+                cache = self.exportacao_service.cache
+                contador = {'processados': 0}
+                chave = cache.calcular_chave(self._contar(obter_acordaos(), contador), formato)
+                caminho_arquivo = cache.obter(chave, formato)
+                
+                if not caminho_arquivo:
+                    caminho_arquivo = cache.gerar(
+                        chave,
+                        formato,
+                        lambda destino: self.exportacao_service.exportar(
+                            self._iterar_com_progresso(job_id, obter_acordaos()),
+                            formato,
+                            destino
+                        )
+                    )
+                
+                if caminho_arquivo:
+                    self._atualizar_job(job_id, status=STATUS_CONCLUIDO, processados=contador['processados'], arquivo=caminho_arquivo)
+                else:
+                    self._atualizar_job(job_id, status=STATUS_ERRO, erro='Falha ao exportar acórdãos')
+            
+            except Exception as e:
+                print(f"Erro ao processar exportação {job_id}: {e}")
+                self._atualizar_job(job_id, status=STATUS_ERRO, erro=str(e))
+            
+            # A entrada e o lock só são necessários enquanto o job pode ser retomado
+            if os.path.exists(self._caminho_entrada(job_id)):
+                os.remove(self._caminho_entrada(job_id))
+            
+            os.remove(arquivo_lock.name)
+    
+    def _em_aberto(self, job):
+        """Indica se o job existe e ainda não terminou"""
+        return bool(job) and job['status'] in (STATUS_PENDENTE, STATUS_PROCESSANDO)
+    
+    def _contar(self, acordaos, contador):
+        """Percorre os acórdãos contando quantos foram lidos"""
+        for i, acordao in enumerate(acordaos, 1):
+            contador['processados'] = i
+            yield acordao
+    
+    def _iterar_com_progresso(self, job_id, acordaos):
+        """Percorre os acórdãos registrando o progresso do job"""
+        for i, acordao in enumerate(acordaos, 1):
+            yield acordao
+            
+            if i % PASSO_PROGRESSO == 0:
+                self._atualizar_job(job_id, processados=i)
+    
+    def _atualizar_job(self, job_id, **campos):
+        """Atualiza campos do estado de um job"""
+        with self._lock:
+            job = self.consultar_job(job_id)
+            job.update(campos)
+            job['atualizado_em'] = datetime.now().isoformat()
+            self._gravar_json(self._caminho_job(job_id), job)
+    
+    def _retomar_jobs(self):
+        """Reenvia para processamento os jobs pendentes ou interrompidos"""
+        for nome in os.listdir(self.diretorio_jobs):
+            if not nome.endswith('.job.json'):
+                continue
+            
+            job = self._ler_json(os.path.join(self.diretorio_jobs, nome))
+            
+            if job and job['status'] in (STATUS_PENDENTE, STATUS_PROCESSANDO):
+                self._executor.submit(self._processar_job, job['id'])
+    
+    def _caminho_job(self, job_id):
+        """Caminho do arquivo de estado de um job"""
+        return os.path.join(self.diretorio_jobs, f'{job_id}.job.json')
+    
+    def _caminho_entrada(self, job_id):
+        """Caminho do arquivo com os acórdãos de entrada de um job"""
+        return os.path.join(self.diretorio_jobs, f'{job_id}.entrada.json')
+    
+    def _ler_json(self, caminho):
+        """Lê um arquivo JSON, retornando None se não existir"""
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+    
+    def _gravar_json(self, caminho, dados):
+        """Grava um arquivo JSON de forma atômica"""
+        caminho_temp = f'{caminho}.{uuid.uuid4().hex}.tmp'
+        
+        with open(caminho_temp, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False)
+        
+        os.replace(caminho_temp, caminho)
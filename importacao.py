@@ -0,0 +1,52 @@
+import sys
+import threading
+import importlib
+import importlib.util
+
+
+def importar_sob_demanda(nome):
+    """
+    Importa um módulo adiando sua execução até o primeiro uso de um atributo
+    
+    Usado para dependências pesadas que muitos processos nunca chegam a usar,
+    evitando o custo de importação na inicialização da aplicação.
+    
+    Args:
+        nome (str): Nome do módulo
+        
+    Returns:
+        Módulo, carregado de fato no primeiro acesso a um atributo
+    """
+    if nome in sys.modules:
+        return sys.modules[nome]
+    
+    if importlib.util.find_spec(nome) is None:
+        raise ImportError(f"Módulo não encontrado: {nome}")
+    
+    return ModuloSobDemanda(nome)
+
+
+class ModuloSobDemanda:
+    """
+    Representa um módulo ainda não importado, importando-o no primeiro acesso
+    
+    O importlib.util.LazyLoader não é seguro entre threads antes do Python
+    3.12: enquanto uma thread executa o módulo, as demais veem o módulo pela
+    metade (AttributeError). Aqui a importação é feita sob um lock, e os
+    acessos seguintes são delegados ao módulo já carregado.
+    """
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+        self._lock = threading.Lock()
+    
+    def __getattr__(self, atributo):
+        modulo = self._modulo
+        
+        if modulo is None:
+            with self._lock:
+                if self._modulo is None:
+                    self._modulo = importlib.import_module(self._nome)
+                modulo = self._modulo
+        
+        return getattr(modulo, atributo)
@@ -1,19 +1,84 @@
-import requests
+import os
 import json
 import re
+import hashlib
 import random
+import threading
 from datetime import datetime
+from urllib.parse import quote
+
+from importacao import importar_sob_demanda
+
+# Cliente HTTP, carregado apenas quando a API do TCU é de fato acessada
+requests = importar_sob_demanda('requests')
+
+# Tamanho do acervo simulado usado em desenvolvimento
+TOTAL_ACORDAOS_SIMULADOS = 2000
+
+# Prefixo dos IDs dos acórdãos simulados (seguido do índice + 1000)
+PREFIXO_ID_SIMULADO = 'acordao-'
+
+# URL do serviço de acórdãos (ex.: http://localhost:8081/api); sem ela, o
+# acervo é simulado localmente
+URL_ACERVO = os.environ.get('TCU_API_URL')
+
+# Tempo máximo (em segundos) de espera por uma resposta do serviço de acórdãos
+TIMEOUT_ACERVO = float(os.environ.get('TCU_API_TIMEOUT', 10))
+
+
+def versao_acordao(acordao):
+    """
+    Retorna a versão do conteúdo de um acórdão
+    
+    Usa a data da última atualização quando disponível; caso contrário, um
+    hash do conteúdo, que muda sempre que qualquer campo muda.
+    
+    Args:
+        acordao (dict): Acórdão
+        
+    Returns:
+        str: Versão do acórdão
+    """
+    if acordao.get('ultima_atualizacao'):
+        return str(acordao['ultima_atualizacao'])
+    
+    conteudo = json.dumps(acordao, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
+
+
+def identificador_acordao(acordao):
+    """
+    Retorna o identificador de um acórdão
+    
+    Os acórdãos simulados têm o campo 'id'; os do serviço do TCU
+    (recupera-acordaos) têm apenas a chave 'key'.
+    
+    Args:
+        acordao (dict): Acórdão
+        
+    Returns:
+        str: 'id' do acórdão ou, na falta dele, 'key' (None se não houver nenhum)
+    """
+    return acordao.get('id') or acordao.get('key')
+
 
 class TCUJurisprudenciaAPI:
     """
     Cliente para API de jurisprudência do TCU
     """
-    def __init__(self):
+    def __init__(self, url_acervo=None, timeout=TIMEOUT_ACERVO):
         self.base_url = "https://contas.tcu.gov.br/pesquisaJurisprudencia/api"
         self.headers = {
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
+        
+        # Serviço de acórdãos consultado por HTTP (None para o acervo simulado)
+        self.url_acervo = (url_acervo or URL_ACERVO or '').rstrip('/') or None
+        self.timeout = timeout
+        
+        # Uma sessão por thread, reaproveitando as conexões com o serviço
+        self._sessoes = threading.local()
     
     def buscar_acordaos(self, pagina=0, limite=20, filtros=None) :
         """
@@ -26,10 +91,18 @@ class TCUJurisprudenciaAPI:
             
         Returns:
             list: Lista de acórdãos
+            
+        Raises:
+            requests.RequestException: Se o serviço de acórdãos falhar
         """
-        # Implementação simulada para desenvolvimento
-        # Em produção, seria substituída pela chamada real à API
-        acordaos = self._gerar_acordaos_simulados(limite)
+        inicio = pagina * limite
+        
+        if self.url_acervo:
+            acordaos = self._consultar_acervo('acordao/recupera-acordaos', {'inicio': inicio, 'quantidade': limite}) or []
+        else:
+            # Acervo simulado para desenvolvimento
+            quantidade = max(0, min(limite, TOTAL_ACORDAOS_SIMULADOS - inicio))
+            acordaos = self._gerar_acordaos_simulados(quantidade, inicio)
         
         # Aplica filtros se fornecidos
         if filtros:
@@ -46,17 +119,62 @@ class TCUJurisprudenciaAPI:
             
         Returns:
             dict: Dados do acórdão
+            
+        Raises:
+            requests.RequestException: Se o serviço de acórdãos falhar
         """
-        # Implementação simulada para desenvolvimento
-        # Em produção, seria substituída pela chamada real à API
-        acordaos = self._gerar_acordaos_simulados(20)
+        if self.url_acervo:
+            return self._consultar_acervo(f'acordao/{quote(str(acordao_id), safe="")}')
         
-        # Simula a busca por ID
-        for acordao in acordaos:
-            if str(acordao.get('id', '')) == acordao_id:
-                return acordao
+        # Acervo simulado para desenvolvimento
+        if not str(acordao_id).startswith(PREFIXO_ID_SIMULADO):
+            return None
+        
+        try:
+            indice = int(str(acordao_id)[len(PREFIXO_ID_SIMULADO):]) - 1000
+        except ValueError:
+            return None
+        
+        if not 0 <= indice < TOTAL_ACORDAOS_SIMULADOS:
+            return None
         
-        return None
+        return self._gerar_acordaos_simulados(1, indice)[0]
+    
+    def iterar_acordaos(self, filtros=None, ids=None, tamanho_pagina=100):
+        """
+        Percorre o acervo de acórdãos sob demanda, página a página
+        
+        Args:
+            filtros (dict, optional): Critérios de filtragem (ver filtrar_acordaos)
+            ids (list, optional): IDs dos acórdãos desejados, na ordem desejada
+            tamanho_pagina (int): Quantidade de acórdãos buscados por vez
+            
+        Yields:
+            dict: Acórdãos que atendem à consulta
+        """
+        # Busca por IDs: cada acórdão é buscado diretamente, na ordem pedida
+        if ids is not None:
+            for acordao_id in ids:
+                acordao = self.buscar_acordao_por_id(str(acordao_id))
+                
+                if acordao and (not filtros or self.filtrar_acordaos([acordao], filtros)):
+                    yield acordao
+            return
+        
+        # Busca por filtros: percorre as páginas até o fim do acervo
+        pagina = 0
+        while True:
+            acordaos = self.buscar_acordaos(pagina, tamanho_pagina)
+            
+            if filtros:
+                yield from self.filtrar_acordaos(acordaos, filtros)
+            else:
+                yield from acordaos
+            
+            if len(acordaos) < tamanho_pagina:
+                break
+            
+            pagina += 1
     
     def filtrar_acordaos(self, acordaos, filtros):
         """
@@ -128,12 +246,43 @@ class TCUJurisprudenciaAPI:
         
         return 'relação' in titulo or 'relacao' in titulo or 'relação' in sumario or 'relacao' in sumario
     
-    def _gerar_acordaos_simulados(self, quantidade):
+    def _consultar_acervo(self, caminho, parametros=None):
+        """
+        Consulta o serviço de acórdãos
+        
+        Args:
+            caminho (str): Caminho relativo à URL do acervo
+            parametros (dict, optional): Parâmetros da consulta
+            
+        Returns:
+            Resposta JSON do serviço, ou None se o recurso não existir (404)
+        """
+        sessao = getattr(self._sessoes, 'sessao', None)
+        
+        if sessao is None:
+            sessao = self._sessoes.sessao = requests.Session()
+            sessao.headers.update(self.headers)
+        
+        resposta = sessao.get(f'{self.url_acervo}/{caminho}', params=parametros, timeout=self.timeout)
+        
+        if resposta.status_code == 404:
+            return None
+        
+        resposta.raise_for_status()
+        return resposta.json()
+    
+    def _gerar_acordaos_simulados(self, quantidade, inicio=0, semente=0):
         """
         Gera acórdãos simulados para desenvolvimento
         
+        Cada acórdão é gerado a partir do seu índice, de modo que o mesmo
+        índice (e, portanto, o mesmo ID) sempre produz o mesmo acórdão.
+        
         Args:
             quantidade (int): Quantidade de acórdãos a gerar
+            inicio (int): Índice do primeiro acórdão
+            semente (int): Semente do acervo; sementes diferentes geram
+                acervos diferentes com os mesmos IDs
             
         Returns:
             list: Lista de acórdãos simulados
@@ -158,33 +307,35 @@ class TCUJurisprudenciaAPI:
             ['Superfaturamento', 'Projeto Básico', 'BDI']
         ]
         
-        # Gera acórdãos aleatórios
-        for i in range(quantidade):
+        # Gera acórdãos aleatórios, com semente fixa por índice
+        for i in range(inicio, inicio + quantidade):
+            aleatorio = random.Random(i + (semente << 32))
+            
             # Seleciona tema e subtema
-            tema_idx = random.randint(0, len(temas) - 1)
+            tema_idx = aleatorio.randint(0, len(temas) - 1)
             
             acordao = {
-                'id': f'acordao-{i+1000}',
-                'numeroAcordao': str(random.randint(1000, 9999)),
-                'anoAcordao': str(random.randint(2018, 2023)),
-                'colegiado': random.choice(colegiados),
-                'relator': random.choice(relatores),
-                'dataSessao': f'{random.randint(1, 28):02d}/{random.randint(1, 12):02d}/{random.randint(2018, 2023)}',
-                'titulo': f'Acórdão sobre {random.choice(temas[tema_idx])}',
-                'sumario': self._gerar_sumario_simulado(temas[tema_idx], subtemas[tema_idx]),
-                'urlAcordao': f'https://pesquisa.apps.tcu.gov.br/#/documento/acordao-completo/{random.randint(1000, 9999) }',
+                'id': f'{PREFIXO_ID_SIMULADO}{i+1000}',
+                'numeroAcordao': str(aleatorio.randint(1000, 9999)),
+                'anoAcordao': str(aleatorio.randint(2018, 2023)),
+                'colegiado': aleatorio.choice(colegiados),
+                'relator': aleatorio.choice(relatores),
+                'dataSessao': f'{aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}/{aleatorio.randint(2018, 2023)}',
+                'titulo': f'Acórdão sobre {aleatorio.choice(temas[tema_idx])}',
+                'sumario': self._gerar_sumario_simulado(temas[tema_idx], subtemas[tema_idx], aleatorio),
+                'urlAcordao': f'https://pesquisa.apps.tcu.gov.br/#/documento/acordao-completo/{aleatorio.randint(1000, 9999) }',
                 'temas': temas[tema_idx],
-                'subtemas': random.sample(subtemas[tema_idx], random.randint(1, len(subtemas[tema_idx])))
+                'subtemas': aleatorio.sample(subtemas[tema_idx], aleatorio.randint(1, len(subtemas[tema_idx])))
             }
             
             acordaos.append(acordao)
         
         return acordaos
     
-    def _gerar_sumario_simulado(self, temas, subtemas):
+    def _gerar_sumario_simulado(self, temas, subtemas, aleatorio=random):
         """Gera um sumário simulado para desenvolvimento"""
-        tema = random.choice(temas)
-        subtema = random.choice(subtemas)
+        tema = aleatorio.choice(temas)
+        subtema = aleatorio.choice(subtemas)
         
         templates = [
             f"Representação formulada a partir de trabalho realizado pela Secretaria de Controle Externo versando sobre {tema.lower()} com foco em {subtema.lower()}. Análise de oitivas. Procedência parcial. Determinações.",
@@ -194,7 +345,7 @@ class TCUJurisprudenciaAPI:
             f"Consulta acerca da aplicabilidade de normativos relacionados a {tema.lower()}. {subtema}. Conhecimento. Resposta ao consulente."
         ]
         
-        return random.choice(templates)
+        return aleatorio.choice(templates)
 
 
 class AnalisadorAcordaos:
@@ -259,7 +410,7 @@ class AnalisadorAcordaos:
         # Em produção, seria substituída por algoritmos de similaridade
         
         # Filtra para não incluir o próprio acórdão
-        candidatos = [a for a in acordaos if a.get('id') != acordao_referencia.get('id')]
+        candidatos = [a for a in acordaos if identificador_acordao(a) != identificador_acordao(acordao_referencia)]
         
         # Calcula similaridade simulada
         similares = []
@@ -0,0 +1,226 @@
+from datetime import date
+from collections import Counter
+
+# Granularidades da linha do tempo; os períodos (aaaa-mm-dd, aaaa-mm e aaaa)
+# ordenam cronologicamente como texto e são prefixos uns dos outros
+GRANULARIDADES = ('dia', 'mes', 'ano')
+
+# Dimensões pelas quais a linha do tempo pode ser filtrada ou detalhada
+DIMENSOES = ('colegiado', 'tema')
+
+
+def periodos_data(data_sessao):
+    """
+    Períodos de cada granularidade de uma data de sessão
+    
+    Args:
+        data_sessao (str): Data no formato dd/mm/aaaa (campo dataSessao)
+        
+    Returns:
+        dict: Granularidade -> período, ou None se a data for inválida
+    """
+    try:
+        dia, mes, ano = (data_sessao or '').split('/')
+        data = date(int(ano), int(mes), int(dia))
+    except ValueError:
+        return None
+    
+    return {
+        'dia': f'{data.year:04d}-{data.month:02d}-{data.day:02d}',
+        'mes': f'{data.year:04d}-{data.month:02d}',
+        'ano': f'{data.year:04d}'
+    }
+
+
+class CuboLinhaTempo:
+    """
+    Contagens de acórdãos pré-agregadas por período, colegiado e tema
+    
+    Para cada granularidade, guarda uma série (período -> quantidade) para
+    cada combinação de colegiado e tema, incluindo None como "todos" em cada
+    dimensão. Qualquer consulta é a leitura de uma série, sem percorrer os
+    acórdãos. O cubo não é alterado depois de montado: atualizar() devolve um
+    cubo novo que compartilha com este as séries não afetadas.
+    """
+    def __init__(self, acordaos=()):
+        """
+        Args:
+            acordaos (iterable): Acórdãos a contar
+        """
+        # Granularidade -> (colegiado, tema) -> período -> quantidade
+        self._series = {granularidade: {} for granularidade in GRANULARIDADES}
+        self._aplicar(acordaos, ())
+        self._indexar_valores()
+    
+    def atualizar(self, novos=(), removidos=()):
+        """
+        Cubo com os acórdãos novos somados e os removidos descontados
+        
+        Só as séries afetadas são copiadas; as demais são compartilhadas com
+        este cubo, que continua inalterado.
+        
+        Args:
+            novos (iterable): Acórdãos que entraram no acervo
+            removidos (iterable): Acórdãos que saíram do acervo
+            
+        Returns:
+            CuboLinhaTempo: Novo cubo
+        """
+        cubo = CuboLinhaTempo.__new__(CuboLinhaTempo)
+        cubo._series = {granularidade: dict(series) for granularidade, series in self._series.items()}
+        
+        cubo._aplicar(novos, removidos)
+        cubo._indexar_valores()
+        
+        return cubo
+    
+    def valores(self, dimensao):
+        """
+        Valores conhecidos de uma dimensão
+        
+        Args:
+            dimensao (str): 'colegiado' ou 'tema'
+            
+        Returns:
+            list: Valores em ordem alfabética
+        """
+        return list(self._valores[dimensao])
+    
+    def consultar(self, granularidade='mes', colegiado=None, tema=None, inicio=None, fim=None):
+        """
+        Série da linha do tempo para um colegiado e um tema
+        
+        Args:
+            granularidade (str): 'dia', 'mes' ou 'ano'
+            colegiado (str, optional): Colegiado (sem distinção de maiúsculas)
+            tema (str, optional): Tema (sem distinção de maiúsculas)
+            inicio (str, optional): Primeiro período (aaaa, aaaa-mm ou aaaa-mm-dd)
+            fim (str, optional): Último período (aaaa, aaaa-mm ou aaaa-mm-dd)
+            
+        Returns:
+            list: [{'periodo', 'total'}] em ordem cronológica
+            
+        Raises:
+            ValueError: Se a granularidade for desconhecida
+        """
+        if granularidade not in GRANULARIDADES:
+            raise ValueError(f'Granularidade inválida: {granularidade} (opções: {", ".join(GRANULARIDADES)})')
+        
+        chave = (self._resolver('colegiado', colegiado), self._resolver('tema', tema))
+        serie = self._series[granularidade].get(chave, {})
+        
+        # Compara só o trecho comum: o ano 2020 está entre 2019-03 e 2020-06,
+        # e o mês 2020-07 está até 2020
+        def no_intervalo(periodo):
+            if inicio and periodo[:len(inicio)] < inicio[:len(periodo)]:
+                return False
+            return not fim or periodo[:len(fim)] <= fim[:len(periodo)]
+        
+        return [{'periodo': periodo, 'total': serie[periodo]} for periodo in sorted(serie) if no_intervalo(periodo)]
+    
+    def detalhar(self, dimensao, granularidade='mes', colegiado=None, tema=None, inicio=None, fim=None):
+        """
+        Uma série para cada valor de uma dimensão (ex.: por colegiado)
+        
+        Args:
+            dimensao (str): 'colegiado' ou 'tema'
+            granularidade, colegiado, tema, inicio, fim: Ver consultar()
+            
+        Returns:
+            dict: Valor da dimensão -> série (ver consultar)
+        """
+        if dimensao not in DIMENSOES:
+            raise ValueError(f'Dimensão inválida: {dimensao} (opções: {", ".join(DIMENSOES)})')
+        
+        filtros = {'colegiado': colegiado, 'tema': tema}
+        detalhes = {}
+        
+        for valor in self.valores(dimensao):
+            filtros[dimensao] = valor
+            serie = self.consultar(granularidade, filtros['colegiado'], filtros['tema'], inicio, fim)
+            
+            if serie:
+                detalhes[valor] = serie
+        
+        return detalhes
+    
+    def _resolver(self, dimensao, valor):
+        """Valor conhecido da dimensão igual ao informado, sem distinção de maiúsculas"""
+        if not valor:
+            return None
+        
+        return self._por_chave[dimensao].get(valor.casefold(), valor)
+    
+    def _indexar_valores(self):
+        """Guarda os valores de cada dimensão, em ordem e por chave sem maiúsculas"""
+        # Dimensão -> valores em ordem alfabética
+        self._valores = {}
+        
+        # Dimensão -> valor em casefold -> valor conhecido (o primeiro em
+        # ordem alfabética, se houver mais de um)
+        self._por_chave = {}
+        
+        for posicao, dimensao in enumerate(DIMENSOES):
+            valores = sorted({chave[posicao] for chave in self._series['ano'] if chave[posicao] is not None})
+            por_chave = {}
+            
+            for valor in valores:
+                por_chave.setdefault(valor.casefold(), valor)
+            
+            self._valores[dimensao] = valores
+            self._por_chave[dimensao] = por_chave
+    
+    def _aplicar(self, novos, removidos):
+        """Soma os acórdãos novos às séries e desconta os removidos"""
+        # Agrupa os acórdãos com a mesma data, colegiado e temas, que afetam
+        # as mesmas células
+        grupos = Counter()
+        
+        for sinal, acordaos in ((1, novos), (-1, removidos)):
+            for acordao in acordaos:
+                grupos[acordao.get('dataSessao'), acordao.get('colegiado') or None, frozenset(acordao.get('temas') or ())] += sinal
+        
+        # Variação de cada célula (granularidade, colegiado, tema, período)
+        variacoes = Counter()
+        
+        for (data_sessao, colegiado_acordao, temas_acordao), quantidade in grupos.items():
+            periodos = periodos_data(data_sessao)
+            
+            if not quantidade or periodos is None:
+                continue
+            
+            colegiados = {colegiado_acordao, None}
+            temas = {tema for tema in temas_acordao if tema} | {None}
+            
+            for granularidade, periodo in periodos.items():
+                for colegiado in colegiados:
+                    for tema in temas:
+                        variacoes[granularidade, colegiado, tema, periodo] += quantidade
+        
+        # Séries já copiadas neste cubo; as demais podem estar compartilhadas
+        # com o cubo anterior e são copiadas antes da primeira alteração
+        copiadas = set()
+        
+        for (granularidade, colegiado, tema, periodo), variacao in variacoes.items():
+            if not variacao:
+                continue
+            
+            series = self._series[granularidade]
+            chave = (colegiado, tema)
+            
+            if (granularidade, chave) not in copiadas:
+                series[chave] = dict(series.get(chave, {}))
+                copiadas.add((granularidade, chave))
+            
+            serie = series[chave]
+            total = serie.get(periodo, 0) + variacao
+            
+            if total > 0:
+                serie[periodo] = total
+            else:
+                serie.pop(periodo, None)
+        
+        # Séries que ficaram vazias
+        for granularidade, chave in copiadas:
+            if not self._series[granularidade][chave]:
+                del self._series[granularidade][chave]
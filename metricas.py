@@ -0,0 +1,269 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Limites (em segundos) dos intervalos dos histogramas de latência
+INTERVALOS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Tipo de conteúdo do formato de texto do Prometheus
+TIPO_CONTEUDO_METRICAS = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histograma:
+    """
+    Histograma com intervalos cumulativos, no modelo do Prometheus
+    
+    Cada combinação de rótulos tem sua própria série. Uma observação custa uma
+    busca binária e três somas sob um lock; nada é calculado até a exportação.
+    """
+    tipo = 'histogram'
+    
+    def __init__(self, nome, descricao, rotulos=(), intervalos=INTERVALOS_LATENCIA):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self.intervalos = tuple(intervalos)
+        
+        # Valores dos rótulos -> [contagem por intervalo (+Inf no final), soma]
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observar(self, valor, *rotulos):
+        """
+        Registra uma observação
+        
+        Args:
+            valor (float): Valor observado (em segundos, para latências)
+            *rotulos: Valores dos rótulos, na ordem da declaração
+        """
+        posicao = bisect.bisect_left(self.intervalos, valor)
+        
+        with self._lock:
+            serie = self._series.get(rotulos)
+            
+            if serie is None:
+                serie = self._series[rotulos] = [[0] * (len(self.intervalos) + 1), 0.0]
+            
+            serie[0][posicao] += 1
+            serie[1] += valor
+    
+    def exportar(self):
+        """Linhas da métrica no formato de texto do Prometheus"""
+        with self._lock:
+            series = [(rotulos, list(contagens), soma) for rotulos, (contagens, soma) in self._series.items()]
+        
+        linhas = []
+        for rotulos, contagens, soma in sorted(series):
+            acumulado = 0
+            
+            for limite, contagem in zip(self.intervalos + (float('inf'),), contagens):
+                acumulado += contagem
+                le = '+Inf' if limite == float('inf') else repr(limite)
+                linhas.append(f'{self.nome}_bucket{_formatar_rotulos(self.rotulos + ("le",), rotulos + (le,))} {acumulado}')
+            
+            linhas.append(f'{self.nome}_sum{_formatar_rotulos(self.rotulos, rotulos)} {soma!r}')
+            linhas.append(f'{self.nome}_count{_formatar_rotulos(self.rotulos, rotulos)} {acumulado}')
+        
+        return linhas
+
+
+class Contador:
+    """Contador crescente, com uma série por combinação de rótulos"""
+    tipo = 'counter'
+    
+    def __init__(self, nome, descricao, rotulos=()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def incrementar(self, *rotulos, valor=1):
+        """
+        Incrementa o contador
+        
+        Args:
+            *rotulos: Valores dos rótulos, na ordem da declaração
+            valor (float): Incremento
+        """
+        with self._lock:
+            self._series[rotulos] = self._series.get(rotulos, 0) + valor
+    
+    def exportar(self):
+        """Linhas da métrica no formato de texto do Prometheus"""
+        with self._lock:
+            series = sorted(self._series.items())
+        
+        return [f'{self.nome}{_formatar_rotulos(self.rotulos, rotulos)} {valor!r}' for rotulos, valor in series]
+
+
+class Medidor:
+    """Valor instantâneo calculado apenas quando as métricas são exportadas"""
+    tipo = 'gauge'
+    
+    def __init__(self, nome, descricao, funcao):
+        self.nome = nome
+        self.descricao = descricao
+        self.funcao = funcao
+    
+    def exportar(self):
+        """Linhas da métrica no formato de texto do Prometheus"""
+        try:
+            valor = self.funcao()
+        except Exception as e:
+            print(f"Erro ao calcular a métrica {self.nome}: {e}")
+            return []
+        
+        if valor is None:
+            return []
+        
+        return [f'{self.nome} {float(valor)!r}']
+
+
+class RegistroMetricas:
+    """
+    Conjunto de métricas da aplicação, exportado no formato do Prometheus
+    """
+    def __init__(self):
+        self._metricas = {}
+        self._lock = threading.Lock()
+    
+    def histograma(self, nome, descricao, rotulos=(), intervalos=INTERVALOS_LATENCIA):
+        """Registra (ou retorna, se já registrado) um histograma"""
+        return self._registrar(nome, lambda: Histograma(nome, descricao, rotulos, intervalos))
+    
+    def contador(self, nome, descricao, rotulos=()):
+        """Registra (ou retorna, se já registrado) um contador"""
+        return self._registrar(nome, lambda: Contador(nome, descricao, rotulos))
+    
+    def medidor(self, nome, descricao, funcao):
+        """Registra (ou substitui) um medidor calculado na exportação"""
+        with self._lock:
+            self._metricas[nome] = Medidor(nome, descricao, funcao)
+            return self._metricas[nome]
+    
+    def exportar(self):
+        """
+        Exporta todas as métricas
+        
+        Returns:
+            str: Métricas no formato de texto do Prometheus
+        """
+        with self._lock:
+            metricas = list(self._metricas.values())
+        
+        linhas = []
+        for metrica in metricas:
+            linhas.append(f'# HELP {metrica.nome} {metrica.descricao}')
+            linhas.append(f'# TYPE {metrica.nome} {metrica.tipo}')
+            linhas.extend(metrica.exportar())
+        
+        return '\n'.join(linhas) + '\n'
+    
+    def _registrar(self, nome, criar):
+        """Retorna a métrica com o nome dado, criando-a se necessário"""
+        with self._lock:
+            if nome not in self._metricas:
+                self._metricas[nome] = criar()
+            return self._metricas[nome]
+
+
+def _formatar_rotulos(nomes, valores):
+    """Formata os rótulos de uma série ({nome="valor",...})"""
+    if not nomes:
+        return ''
+    
+    pares = []
+    for nome, valor in zip(nomes, valores):
+        valor = str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        pares.append(f'{nome}="{valor}"')
+    
+    return '{' + ','.join(pares) + '}'
+
+
+# Registro compartilhado pelo processo e métricas da aplicação
+registro = RegistroMetricas()
+
+LATENCIA_ROTAS = registro.histograma(
+    'tcu_requisicao_duracao_segundos',
+    'Duração das requisições por rota',
+    ['rota', 'metodo', 'status']
+)
+
+LATENCIA_ETAPAS = registro.histograma(
+    'tcu_etapa_duracao_segundos',
+    'Duração das etapas de processamento (busca, filtro, classificacao, similaridade, exportacao, serializacao)',
+    ['etapa']
+)
+
+CONSULTAS_CACHE = registro.contador(
+    'tcu_cache_consultas_total',
+    'Consultas aos caches por resultado (acerto ou falha)',
+    ['cache', 'resultado']
+)
+
+ENTREGAS_ALERTAS = registro.contador(
+    'tcu_alertas_entregas_total',
+    'Entregas de alertas por frequência e resultado (entregue ou falha)',
+    ['frequencia', 'resultado']
+)
+
+
+@contextmanager
+def medir_etapa(etapa):
+    """
+    Mede a duração de uma etapa de processamento
+    
+    Args:
+        etapa (str): Nome da etapa
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        LATENCIA_ETAPAS.observar(time.perf_counter() - inicio, etapa)
+
+
+def medir_gerador(etapa, gerador):
+    """
+    Mede o tempo gasto gerando os itens de um gerador (exportações em fluxo)
+    
+    Apenas o tempo dentro do gerador é somado, sem o tempo em que o cliente
+    ainda não pediu o próximo bloco.
+    
+    Args:
+        etapa (str): Nome da etapa
+        gerador: Gerador a percorrer
+        
+    Yields:
+        Itens do gerador
+    """
+    total = 0.0
+    iterador = iter(gerador)
+    
+    try:
+        while True:
+            inicio = time.perf_counter()
+            try:
+                item = next(iterador)
+            except StopIteration:
+                return
+            finally:
+                total += time.perf_counter() - inicio
+            
+            yield item
+    finally:
+        LATENCIA_ETAPAS.observar(total, etapa)
+
+
+def registrar_cache(cache, acerto):
+    """
+    Registra uma consulta a um cache
+    
+    Args:
+        cache (str): Nome do cache
+        acerto (bool): True se o valor estava no cache
+    """
+    CONSULTAS_CACHE.incrementar(cache, 'acerto' if acerto else 'falha')
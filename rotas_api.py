@@ -0,0 +1,747 @@
+import functools
+from datetime import datetime
+from itertools import chain
+
+from jurisprudencia_api import TCUJurisprudenciaAPI, AnalisadorAcordaos, GeradorInsights
+from corpus import CorpusCompartilhado
+from facetas import contar_bits, MAX_VALORES_FACETA
+from autocompletar import MAX_SUGESTOES
+from exportacao_service import ExportacaoService, EXTENSOES_EXPORTACAO, TIPOS_MIME_EXPORTACAO, FORMATOS_PACOTE
+from alerta_service import obter_alerta_service
+from fila_exportacao_service import FilaExportacaoService
+from serializacao import serializar_json
+from metricas import registro as registro_metricas, TIPO_CONTEUDO_METRICAS, medir_etapa, medir_gerador, registrar_cache
+from cache_http import calcular_etag, etag_corresponde, negociar_codificacao, comprimir, cabecalhos_cache, MAX_AGE_LISTA, MAX_AGE_ACORDAO
+
+# Configuração
+RESULTADOS_POR_PAGINA = 20
+
+# Quantidade máxima de acórdãos por busca em lote
+MAX_ACORDAOS_LOTE = 100
+
+
+class Requisicao:
+    """
+    Dados de uma requisição, extraídos pelo adaptador de cada framework
+    (app.py com Flask, app_async.py com FastAPI)
+    """
+    def __init__(self, metodo, args, cabecalhos, corpo=None):
+        """
+        Args:
+            metodo (str): Método HTTP
+            args: Parâmetros da URL (request.args ou request.query_params)
+            cabecalhos: Cabeçalhos, sem distinção de maiúsculas
+            corpo: Corpo JSON, ou None se ausente ou inválido
+        """
+        self.metodo = metodo
+        self.args = args
+        self.cabecalhos = cabecalhos
+        self.corpo = corpo
+
+
+class Resposta:
+    """
+    Resposta de uma rota, convertida pelo adaptador de cada framework
+    
+    Apenas um conteúdo é usado, nesta ordem: arquivo (enviado para download),
+    fluxo (gerador de blocos), corpo (bytes prontos) ou dados (serializados
+    em JSON). Sem nenhum deles, a resposta não tem corpo (ex.: 304).
+    """
+    def __init__(self, dados=None, status=200, cabecalhos=None, corpo=None, tipo='application/json', fluxo=None, arquivo=None, nome_arquivo=None):
+        """
+        Args:
+            dados: Dados da resposta JSON
+            status (int): Código de status HTTP
+            cabecalhos (dict, optional): Cabeçalhos adicionais
+            corpo (bytes, optional): Corpo já serializado (e comprimido)
+            tipo (str): Tipo de conteúdo do corpo ou do fluxo
+            fluxo (iterable, optional): Blocos de uma resposta em fluxo
+            arquivo (str, optional): Caminho do arquivo a enviar
+            nome_arquivo (str, optional): Nome do arquivo para o cliente
+        """
+        self.dados = dados
+        self.status = status
+        self.cabecalhos = cabecalhos or {}
+        self.corpo = corpo
+        self.tipo = tipo
+        self.fluxo = fluxo
+        self.arquivo = arquivo
+        self.nome_arquivo = nome_arquivo
+
+
+def _erro(mensagem, status):
+    """Resposta de erro no formato usado pela API"""
+    return Resposta({'erro': mensagem}, status)
+
+
+def _tratar_erros(rota):
+    """Converte as exceções de uma rota em respostas de erro (ValueError: 400)"""
+    @functools.wraps(rota)
+    def executar(self, *args):
+        try:
+            return rota(self, *args)
+        
+        except ValueError as e:
+            return _erro(str(e), 400)
+        
+        except Exception as e:
+            return _erro(str(e), 500)
+    
+    return executar
+
+
+def _parametro_verdadeiro(args, nome):
+    """Indica se um parâmetro da URL é 'true' (ex.: ?classificar=true)"""
+    return args.get(nome, '').lower() == 'true'
+
+
+def _corpo_objeto(requisicao):
+    """
+    Corpo JSON da requisição
+    
+    Args:
+        requisicao (Requisicao): Requisição recebida
+        
+    Returns:
+        dict: Corpo da requisição
+        
+    Raises:
+        ValueError: Se o corpo não for um objeto JSON
+    """
+    if not isinstance(requisicao.corpo, dict):
+        raise ValueError('O corpo da requisição deve ser um objeto JSON')
+    
+    return requisicao.corpo
+
+
+def _filtros_busca(args):
+    """
+    Extrai dos parâmetros da URL os filtros de busca de acórdãos
+    
+    Args:
+        args: Parâmetros da requisição
+        
+    Returns:
+        dict: Filtros (ver filtrar_acordaos)
+    """
+    filtros = {}
+    
+    # Filtros de colegiado
+    if 'colegiado' in args:
+        filtros['colegiado'] = args.get('colegiado')
+    
+    # Filtros de relator
+    if 'relator' in args:
+        filtros['relator'] = args.get('relator')
+    
+    # Filtros de data
+    if 'data_inicio' in args and 'data_fim' in args:
+        filtros['data_inicio'] = args.get('data_inicio')
+        filtros['data_fim'] = args.get('data_fim')
+    
+    # Filtros de texto
+    if 'texto' in args:
+        filtros['texto'] = args.get('texto')
+    
+    # Exclusões
+    if 'excluir_termos' in args:
+        termos = args.get('excluir_termos').split(',')
+        filtros['excluir_termos'] = [termo.strip() for termo in termos]
+    
+    if 'excluir_relacao' in args:
+        filtros['excluir_relacao'] = _parametro_verdadeiro(args, 'excluir_relacao')
+    
+    return filtros
+
+
+def _ids_lote(ids):
+    """
+    Valida os IDs de uma busca em lote
+    
+    Args:
+        ids (list): IDs ou chaves enviados pelo cliente
+        
+    Returns:
+        list: IDs como texto
+    """
+    if not isinstance(ids, list) or not ids:
+        raise ValueError("'ids' deve ser uma lista não vazia")
+    
+    if len(ids) > MAX_ACORDAOS_LOTE:
+        raise ValueError(f'No máximo {MAX_ACORDAOS_LOTE} acórdãos por lote')
+    
+    return [str(acordao_id) for acordao_id in ids]
+
+
+def _consulta_exportacao(dados):
+    """
+    Extrai do corpo da requisição a consulta de acórdãos a exportar
+    
+    Args:
+        dados (dict): Corpo JSON da requisição
+        
+    Returns:
+        dict: Argumentos para corpus.iterar_acordaos ('filtros' e 'ids'),
+        ou None se o cliente enviou os próprios acórdãos
+    """
+    if 'ids' not in dados and 'filtros' not in dados:
+        return None
+    
+    ids = dados.get('ids')
+    filtros = dados.get('filtros') or {}
+    
+    if ids is not None and not isinstance(ids, list):
+        raise ValueError("'ids' deve ser uma lista")
+    
+    if not isinstance(filtros, dict):
+        raise ValueError("'filtros' deve ser um objeto")
+    
+    return {'filtros': filtros, 'ids': ids}
+
+
+def _nao_modificada(requisicao, etag, max_age):
+    """
+    Resposta 304 se o cliente já possui a representação identificada pela ETag
+    
+    Args:
+        requisicao (Requisicao): Requisição recebida
+        etag (str): ETag da representação
+        max_age (int): Tempo de reutilização em segundos
+        
+    Returns:
+        Resposta: Resposta 304, ou None se a representação deve ser enviada
+    """
+    if etag_corresponde(requisicao.cabecalhos.get('If-None-Match'), etag):
+        registrar_cache('http', True)
+        return Resposta(status=304, cabecalhos=cabecalhos_cache(etag, max_age))
+    
+    registrar_cache('http', False)
+    return None
+
+
+def _resposta_cacheavel(requisicao, dados, etag, max_age):
+    """
+    Serializa a resposta, comprime conforme o Accept-Encoding e acrescenta os
+    cabeçalhos de cache
+    
+    Args:
+        requisicao (Requisicao): Requisição recebida
+        dados: Dados da resposta JSON
+        etag (str): ETag da representação
+        max_age (int): Tempo de reutilização em segundos
+        
+    Returns:
+        Resposta: Resposta com os cabeçalhos de cache
+    """
+    with medir_etapa('serializacao'):
+        corpo = serializar_json(dados)
+    
+    codificacao = negociar_codificacao(requisicao.cabecalhos.get('Accept-Encoding'), len(corpo))
+    
+    if codificacao:
+        corpo = comprimir(corpo, codificacao)
+    
+    return Resposta(corpo=corpo, cabecalhos=cabecalhos_cache(etag, max_age, codificacao))
+
+
+class RotasAPI:
+    """
+    Lógica das rotas /api/*, comum às versões Flask (app.py) e ASGI
+    (app_async.py) da aplicação
+    
+    Cada rota recebe uma Requisicao (e os parâmetros do caminho) e devolve uma
+    Resposta; os adaptadores de cada framework apenas extraem a requisição e
+    convertem a resposta. As rotas são síncronas: a versão ASGI as executa em
+    threads, fora do laço de eventos.
+    """
+    def __init__(self):
+        # Inicializa os serviços
+        self.api_client = TCUJurisprudenciaAPI()
+        self.analisador = AnalisadorAcordaos()
+        self.gerador_insights = GeradorInsights()
+        self.exportacao_service = ExportacaoService()
+        
+        # Acervo compartilhado pelas rotas, carregado no primeiro uso e
+        # atualizado em segundo plano
+        self.corpus = CorpusCompartilhado(self.api_client)
+        self.fila_exportacao = FilaExportacaoService(self.exportacao_service, self.corpus)
+        
+        self.corpus.observar(self._registrar_novos_acordaos)
+        
+        # Tamanho e geração do acervo, calculados apenas quando as métricas são lidas
+        corpus = self.corpus
+        registro_metricas.medidor('tcu_corpus_acordaos', 'Quantidade de acórdãos no acervo', lambda: len(corpus.atual()) if corpus.carregado() else None)
+        registro_metricas.medidor('tcu_corpus_geracao', 'Geração do acervo em uso', lambda: corpus.atual().geracao if corpus.carregado() else None)
+    
+    def _registrar_novos_acordaos(self, snapshot, novos):
+        # Acórdãos que entraram no acervo desde a geração anterior
+        if novos:
+            obter_alerta_service().registrar_novos_acordaos(novos)
+    
+    def exportar_metricas(self, requisicao):
+        """Métricas no formato do Prometheus (GET /metrics)"""
+        return Resposta(corpo=registro_metricas.exportar(), tipo=TIPO_CONTEUDO_METRICAS)
+    
+    @_tratar_erros
+    def buscar_acordaos(self, requisicao):
+        """Busca de acórdãos (GET /api/acordaos)"""
+        args = requisicao.args
+        
+        # Parâmetros de paginação
+        pagina = int(args.get('pagina', 0))
+        limite = int(args.get('limite', RESULTADOS_POR_PAGINA))
+        
+        # Parâmetros de filtro
+        filtros = _filtros_busca(args)
+        
+        # Busca acórdãos na geração atual do acervo
+        with medir_etapa('busca'):
+            snapshot = self.corpus.atual()
+            acordaos = snapshot.buscar_acordaos(pagina, limite)
+        
+        # Aplica filtros
+        if filtros:
+            with medir_etapa('filtro'):
+                acordaos = self.api_client.filtrar_acordaos(acordaos, filtros)
+        
+        classificar = _parametro_verdadeiro(args, 'classificar')
+        
+        # Responde 304 se o cliente já possui esta versão da página
+        etag = calcular_etag(acordaos, pagina, limite, classificar, versao=snapshot.versao)
+        nao_modificada = _nao_modificada(requisicao, etag, MAX_AGE_LISTA)
+        
+        if nao_modificada:
+            return nao_modificada
+        
+        # Classifica acórdãos
+        if classificar:
+            with medir_etapa('classificacao'):
+                acordaos = self.analisador.classificar_acordaos(acordaos)
+        
+        return _resposta_cacheavel(requisicao, {
+            'total': len(acordaos),
+            'pagina': pagina,
+            'limite': limite,
+            'acordaos': acordaos
+        }, etag, MAX_AGE_LISTA)
+    
+    @_tratar_erros
+    def contar_facetas(self, requisicao):
+        """
+        Contagens por colegiado, relator, ano e tema dos acórdãos do acervo que
+        atendem aos filtros (mesmos parâmetros de buscar_acordaos)
+        
+        Rota GET /api/acordaos/facetas
+        """
+        limite = int(requisicao.args.get('limite', MAX_VALORES_FACETA))
+        filtros = _filtros_busca(requisicao.args)
+        
+        snapshot = self.corpus.atual()
+        
+        # As contagens só mudam com a geração do acervo
+        etag = calcular_etag([], 'facetas', snapshot.geracao, snapshot.criado_em.isoformat(), sorted(filtros.items()), limite)
+        nao_modificada = _nao_modificada(requisicao, etag, MAX_AGE_LISTA)
+        
+        if nao_modificada:
+            return nao_modificada
+        
+        # Conjunto de resultados e contagens pelos bitmaps da geração
+        with medir_etapa('filtro'):
+            resultado = snapshot.facetas.consultar(filtros)
+        
+        with medir_etapa('facetas'):
+            facetas = snapshot.facetas.contar(resultado, limite)
+        
+        return _resposta_cacheavel(requisicao, {
+            'total': contar_bits(resultado),
+            'facetas': facetas
+        }, etag, MAX_AGE_LISTA)
+    
+    @_tratar_erros
+    def consultar_linha_tempo(self, requisicao):
+        """
+        Linha do tempo de acórdãos por dia, mês ou ano, opcionalmente filtrada e
+        detalhada por colegiado ou tema
+        
+        Rota GET /api/acordaos/linha-tempo
+        """
+        args = requisicao.args
+        consulta = {campo: args.get(campo) for campo in ('colegiado', 'tema', 'inicio', 'fim')}
+        granularidade = args.get('granularidade', 'mes')
+        detalhar = args.get('detalhar')
+        
+        snapshot = self.corpus.atual()
+        
+        etag = calcular_etag([], 'linha-tempo', snapshot.geracao, snapshot.criado_em.isoformat(), granularidade, detalhar, sorted(consulta.items()))
+        nao_modificada = _nao_modificada(requisicao, etag, MAX_AGE_LISTA)
+        
+        if nao_modificada:
+            return nao_modificada
+        
+        # Séries pré-agregadas da geração atual
+        serie = snapshot.linha_tempo.consultar(granularidade, **consulta)
+        resultado = {
+            'granularidade': granularidade,
+            'total': sum(ponto['total'] for ponto in serie),
+            'serie': serie
+        }
+        
+        if detalhar:
+            resultado['detalhes'] = snapshot.linha_tempo.detalhar(detalhar, granularidade, **consulta)
+        
+        return _resposta_cacheavel(requisicao, resultado, etag, MAX_AGE_LISTA)
+    
+    @_tratar_erros
+    def autocompletar(self, requisicao):
+        """Sugestões de relator, tema ou subtema para o que o usuário digita (GET /api/autocompletar)"""
+        args = requisicao.args
+        campo = args.get('campo', 'relator')
+        prefixo = args.get('prefixo', '')
+        limite = int(args.get('limite', MAX_SUGESTOES))
+        
+        snapshot = self.corpus.atual()
+        
+        etag = calcular_etag([], 'autocompletar', snapshot.geracao, snapshot.criado_em.isoformat(), campo, prefixo, limite)
+        nao_modificada = _nao_modificada(requisicao, etag, MAX_AGE_LISTA)
+        
+        if nao_modificada:
+            return nao_modificada
+        
+        return _resposta_cacheavel(requisicao, {
+            'campo': campo,
+            'prefixo': prefixo,
+            'sugestoes': snapshot.autocompletar.sugerir(campo, prefixo, limite)
+        }, etag, MAX_AGE_LISTA)
+    
+    @_tratar_erros
+    def buscar_acordaos_lote(self, requisicao):
+        """
+        Busca de vários acórdãos de uma vez (GET com ?ids=a,b,c ou POST com
+        {"ids": [...], "classificar": true})
+        
+        Rota GET e POST /api/acordaos/batch
+        """
+        if requisicao.metodo == 'POST':
+            dados = _corpo_objeto(requisicao)
+            ids = _ids_lote(dados.get('ids'))
+            classificar = bool(dados.get('classificar', False))
+        else:
+            ids = _ids_lote([i.strip() for i in requisicao.args.get('ids', '').split(',') if i.strip()])
+            classificar = _parametro_verdadeiro(requisicao.args, 'classificar')
+        
+        # Uma única consulta aos índices da geração atual
+        with medir_etapa('busca'):
+            snapshot = self.corpus.atual()
+            acordaos, nao_encontrados = snapshot.buscar_varios(ids)
+        
+        # Responde 304 se o cliente já possui esta versão do lote (GET)
+        etag = calcular_etag(acordaos, 'lote', nao_encontrados, classificar, versao=snapshot.versao)
+        
+        if requisicao.metodo == 'GET':
+            nao_modificada = _nao_modificada(requisicao, etag, MAX_AGE_ACORDAO)
+            
+            if nao_modificada:
+                return nao_modificada
+        
+        # Classifica os acórdãos
+        if classificar:
+            with medir_etapa('classificacao'):
+                acordaos = self.analisador.classificar_acordaos(acordaos)
+        
+        resultado = {
+            'total': len(acordaos),
+            'acordaos': acordaos,
+            'nao_encontrados': nao_encontrados
+        }
+        
+        if requisicao.metodo == 'GET':
+            return _resposta_cacheavel(requisicao, resultado, etag, MAX_AGE_ACORDAO)
+        
+        return Resposta(resultado)
+    
+    @_tratar_erros
+    def buscar_acordao(self, requisicao, acordao_id):
+        """Busca de um acórdão específico (GET /api/acordaos/{id})"""
+        with medir_etapa('busca'):
+            snapshot = self.corpus.atual()
+            acordao = snapshot.buscar_acordao_por_id(acordao_id)
+        
+        if not acordao:
+            return _erro('Acórdão não encontrado', 404)
+        
+        classificar = _parametro_verdadeiro(requisicao.args, 'classificar')
+        
+        # Responde 304 se o cliente já possui esta versão do acórdão
+        etag = calcular_etag([acordao], classificar, versao=snapshot.versao)
+        nao_modificada = _nao_modificada(requisicao, etag, MAX_AGE_ACORDAO)
+        
+        if nao_modificada:
+            return nao_modificada
+        
+        # Classifica o acórdão
+        if classificar:
+            with medir_etapa('classificacao'):
+                acordao = self.analisador.classificar_acordao(acordao)
+        
+        return _resposta_cacheavel(requisicao, acordao, etag, MAX_AGE_ACORDAO)
+    
+    @_tratar_erros
+    def recomendar_similares(self, requisicao, acordao_id):
+        """Acórdãos similares a um acórdão (GET /api/recomendacao/acordao/{id})"""
+        # Parâmetros
+        limite = int(requisicao.args.get('limite', 5))
+        
+        # Busca o acórdão de referência e os de comparação na mesma geração
+        with medir_etapa('busca'):
+            snapshot = self.corpus.atual()
+            acordao = snapshot.buscar_acordao_por_id(acordao_id)
+        
+        if not acordao:
+            return _erro('Acórdão não encontrado', 404)
+        
+        acordaos_comparacao = snapshot.buscar_acordaos(0, 100)
+        
+        # Encontra similares
+        with medir_etapa('similaridade'):
+            similares = self.analisador.encontrar_acordaos_similares(
+                acordaos_comparacao,
+                acordao,
+                limite
+            )
+        
+        return Resposta(similares)
+    
+    @_tratar_erros
+    def recomendar_por_texto(self, requisicao):
+        """Acórdãos com texto similar ao informado (POST /api/recomendacao/texto)"""
+        # Parâmetros
+        dados = _corpo_objeto(requisicao)
+        texto = dados.get('texto', '')
+        limite = int(requisicao.args.get('limite', 5))
+        
+        if not texto:
+            return _erro('Texto não fornecido', 400)
+        
+        # Busca acórdãos para comparação
+        with medir_etapa('busca'):
+            acordaos_comparacao = self.corpus.buscar_acordaos(0, 100)
+        
+        # Encontra similares por texto
+        with medir_etapa('similaridade'):
+            similares = self.analisador.encontrar_acordaos_similares_por_texto(
+                acordaos_comparacao,
+                texto,
+                limite
+            )
+        
+        return Resposta(similares)
+    
+    @_tratar_erros
+    def gerar_insight(self, requisicao, acordao_id):
+        """Insights de um acórdão (GET /api/insights/acordao/{id})"""
+        # Parâmetros
+        formato = requisicao.args.get('formato', 'post_padrao')
+        
+        # Busca acórdão
+        acordao = self.corpus.buscar_acordao_por_id(acordao_id)
+        
+        if not acordao:
+            return _erro('Acórdão não encontrado', 404)
+        
+        # Gera insight
+        insight = self.gerador_insights.gerar_insight(acordao, formato)
+        
+        return Resposta({
+            'acordao_id': acordao_id,
+            'formato': formato,
+            'insight': insight
+        })
+    
+    @_tratar_erros
+    def gerar_legenda_linkedin(self, requisicao, acordao_id):
+        """Legenda de um acórdão para o LinkedIn (GET /api/linkedin/legenda/{id})"""
+        from gerador_legendas_linkedin import GeradorLegendasLinkedIn
+        
+        # Inicializa o gerador de legendas
+        gerador = GeradorLegendasLinkedIn()
+        
+        # Busca acórdão
+        acordao = self.corpus.buscar_acordao_por_id(acordao_id)
+        
+        if not acordao:
+            return _erro('Acórdão não encontrado', 404)
+        
+        # Gera legenda
+        legenda = gerador.gerar_legenda(acordao)
+        
+        return Resposta({
+            'acordao_id': acordao_id,
+            'legenda': legenda
+        })
+    
+    @_tratar_erros
+    def exportar_acordaos(self, requisicao):
+        """Exportação de acórdãos (POST /api/exportar)"""
+        # Parâmetros
+        dados = _corpo_objeto(requisicao)
+        formato = dados.get('formato', 'csv').lower()
+        consulta = _consulta_exportacao(dados)
+        
+        if consulta is not None:
+            # Acórdãos selecionados no servidor e lidos do acervo sob demanda
+            snapshot = self.corpus.atual()
+            acordaos = snapshot.iterar_acordaos(**consulta)
+            primeiro = next(acordaos, None)
+            
+            if primeiro is None:
+                return _erro('Nenhum acórdão encontrado para exportação', 404)
+            
+            acordaos = chain([primeiro], acordaos)
+        else:
+            acordaos = dados.get('acordaos', [])
+            
+            if not acordaos:
+                return _erro('Nenhum acórdão fornecido para exportação', 400)
+        
+        # Cria nome de arquivo temporário
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        nome_arquivo = f"acordaos_exportados_{timestamp}"
+        
+        # Define extensão baseada no formato
+        extensao = EXTENSOES_EXPORTACAO.get(formato, '.txt')
+        
+        # Pacote zip com vários formatos, gerados com uma única leitura
+        if formato == 'zip':
+            formatos = [f.lower() for f in dados.get('formatos') or FORMATOS_PACOTE]
+            
+            for formato_pacote in formatos:
+                if formato_pacote not in EXTENSOES_EXPORTACAO:
+                    return _erro(f'Formato não suportado: {formato_pacote}', 400)
+            
+            return Resposta(
+                fluxo=medir_gerador('exportacao', self.exportacao_service.exportar_pacote(acordaos, formatos)),
+                tipo='application/zip',
+                cabecalhos={'Content-Disposition': f'attachment; filename={nome_arquivo}.zip'}
+            )
+        
+        # Formatos com suporte a blocos são enviados à medida que são gerados
+        usar_gzip = bool(dados.get('gzip', False))
+        fluxo = self.exportacao_service.exportar_stream(acordaos, formato, usar_gzip)
+        
+        if fluxo is not None:
+            if usar_gzip:
+                extensao += '.gz'
+                tipo = 'application/gzip'
+            else:
+                tipo = TIPOS_MIME_EXPORTACAO[formato]
+            
+            return Resposta(
+                fluxo=medir_gerador('exportacao', fluxo),
+                tipo=tipo,
+                cabecalhos={'Content-Disposition': f'attachment; filename={nome_arquivo}{extensao}'}
+            )
+        
+        # Demais formatos são gerados em arquivo, reaproveitado entre
+        # exportações idênticas pelo cache de exportações
+        if consulta is not None:
+            obter_acordaos = lambda: snapshot.iterar_acordaos(**consulta)
+        else:
+            obter_acordaos = lambda: acordaos
+        
+        # Exporta acórdãos
+        with medir_etapa('exportacao'):
+            caminho_arquivo = self.exportacao_service.exportar_com_cache(obter_acordaos, formato)
+        
+        if not caminho_arquivo:
+            return _erro('Falha ao exportar acórdãos', 500)
+        
+        # Retorna o arquivo para download
+        return Resposta(arquivo=caminho_arquivo, nome_arquivo=nome_arquivo + extensao)
+    
+    @_tratar_erros
+    def criar_exportacao(self, requisicao):
+        """Criação de exportações em segundo plano (POST /api/exportacoes)"""
+        # Parâmetros
+        dados = _corpo_objeto(requisicao)
+        formato = dados.get('formato', 'csv').lower()
+        consulta = _consulta_exportacao(dados)
+        acordaos = dados.get('acordaos', [])
+        
+        if consulta is None and not acordaos:
+            return _erro('Nenhum acórdão fornecido para exportação', 400)
+        
+        if formato not in EXTENSOES_EXPORTACAO:
+            return _erro(f'Formato não suportado: {formato}', 400)
+        
+        # Cria job de exportação (a consulta é resolvida pelo worker)
+        if consulta is not None:
+            job_id = self.fila_exportacao.criar_job(None, formato, consulta)
+        else:
+            job_id = self.fila_exportacao.criar_job(acordaos, formato)
+        
+        return Resposta({
+            'job_id': job_id,
+            'status_url': f'/api/exportacoes/{job_id}',
+            'download_url': f'/api/exportacoes/{job_id}/download'
+        }, 202)
+    
+    @_tratar_erros
+    def consultar_exportacao(self, requisicao, job_id):
+        """Andamento de uma exportação (GET /api/exportacoes/{id})"""
+        job = self.fila_exportacao.consultar_job(job_id)
+        
+        if not job:
+            return _erro('Exportação não encontrada', 404)
+        
+        return Resposta(job)
+    
+    @_tratar_erros
+    def baixar_exportacao(self, requisicao, job_id):
+        """Arquivo de uma exportação concluída (GET /api/exportacoes/{id}/download)"""
+        job = self.fila_exportacao.consultar_job(job_id)
+        
+        if not job:
+            return _erro('Exportação não encontrada', 404)
+        
+        caminho_arquivo = self.fila_exportacao.caminho_artefato(job_id)
+        
+        if not caminho_arquivo and job['status'] == 'concluido':
+            return _erro('Arquivo da exportação expirado', 410)
+        
+        if not caminho_arquivo:
+            return Resposta({'erro': 'Exportação ainda não concluída', 'status': job['status']}, 409)
+        
+        # Nome do arquivo baseado na data de criação do job
+        timestamp = datetime.fromisoformat(job['criado_em']).strftime('%Y%m%d_%H%M%S')
+        extensao = EXTENSOES_EXPORTACAO.get(job['formato'], '.txt')
+        
+        return Resposta(arquivo=caminho_arquivo, nome_arquivo=f"acordaos_exportados_{timestamp}{extensao}")
+    
+    @_tratar_erros
+    def configurar_alerta(self, requisicao):
+        """Configuração de alertas (POST /api/alertas)"""
+        # Parâmetros
+        dados = _corpo_objeto(requisicao)
+        usuario_id = dados.get('usuario_id')
+        email = dados.get('email')
+        
+        if not usuario_id or not email:
+            return _erro('Usuário ID e email são obrigatórios', 400)
+        
+        # Serviço de alertas compartilhado pelo processo
+        alerta_service = obter_alerta_service()
+        
+        # Adiciona alerta
+        alerta_id = alerta_service.adicionar_alerta(
+            usuario_id=usuario_id,
+            email=email,
+            temas=dados.get('temas'),
+            subtemas=dados.get('subtemas'),
+            palavras_chave=dados.get('palavras_chave'),
+            frequencia=dados.get('frequencia', 'diaria')
+        )
+        
+        return Resposta({
+            'alerta_id': alerta_id,
+            'mensagem': 'Alerta configurado com sucesso'
+        })
@@ -0,0 +1,86 @@
+import os
+import json
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime
+
+# Serializador usado pelas respostas da API ('orjson' ou 'json'); por
+# padrão, orjson quando instalado
+SERIALIZADOR_JSON = os.environ.get('SERIALIZADOR_JSON')
+
+# Módulo orjson, resolvido uma única vez (None se não estiver instalado)
+try:
+    import orjson as ORJSON
+except ImportError:
+    ORJSON = None
+
+
+def serializar_json(dados):
+    """
+    Serializa dados em JSON (UTF-8), sem escapar caracteres não ASCII
+    
+    Args:
+        dados: Dados a serializar
+        
+    Returns:
+        bytes: JSON codificado em UTF-8
+    """
+    orjson = _orjson()
+    
+    if orjson is not None:
+        return orjson.dumps(dados, default=_converter, option=orjson.OPT_NON_STR_KEYS)
+    
+    return json.dumps(dados, ensure_ascii=False, separators=(',', ':'), default=_converter).encode('utf-8')
+
+
+def desserializar_json(conteudo):
+    """
+    Lê um documento JSON
+    
+    Args:
+        conteudo (bytes | str): JSON a ler
+        
+    Returns:
+        Dados lidos
+    """
+    orjson = _orjson()
+    
+    if orjson is not None:
+        return orjson.loads(conteudo)
+    
+    return json.loads(conteudo)
+
+
+def nome_serializador():
+    """Nome do serializador em uso ('orjson' ou 'json')"""
+    return 'orjson' if _orjson() is not None else 'json'
+
+
+def _converter(valor):
+    """Converte tipos que o JSON não representa diretamente"""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    
+    if isinstance(valor, (set, frozenset, tuple)):
+        return list(valor)
+    
+    if isinstance(valor, (decimal.Decimal, uuid.UUID)):
+        return str(valor)
+    
+    if dataclasses.is_dataclass(valor) and not isinstance(valor, type):
+        return dataclasses.asdict(valor)
+    
+    # Escalares do numpy (usados na classificação)
+    if hasattr(valor, 'item'):
+        return valor.item()
+    
+    raise TypeError(f'Objeto do tipo {type(valor).__name__} não é serializável em JSON')
+
+
+def _orjson():
+    """Retorna o módulo orjson, se instalado e não desativado"""
+    if SERIALIZADOR_JSON == 'json':
+        return None
+    
+    return ORJSON
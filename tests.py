@@ -1,11 +1,82 @@
 import unittest
+import unittest.mock
 from unittest.mock import patch, MagicMock
+import gzip
+import io
 import json
+import zipfile
 import os
+import socket
+import socketserver
+import subprocess
+import threading
 import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+import requests
 sys.path.append('/home/ubuntu/tcu_app')
 
-from jurisprudencia_api import TCUJurisprudenciaAPI, AnalisadorAcordaos, GeradorInsights, ExportadorAcordaos
+from jurisprudencia_api import TCUJurisprudenciaAPI, AnalisadorAcordaos, GeradorInsights
+from exportacao_service import ExportacaoService, ExportadorAcordaos, CacheExportacoes, comprimir_gzip
+from fila_exportacao_service import FilaExportacaoService
+from alerta_service import AlertaService, IndiceAlertas
+from busca_texto import normalizar_texto, AutomatoPalavras
+from envio_email_service import EnvioEmailService
+import serializacao
+from metricas import RegistroMetricas
+from benchmarks.servidor_tcu_simulado import ServidorTCUSimulado
+from corpus import CorpusCompartilhado
+from cache_http import calcular_etag
+from linha_tempo import CuboLinhaTempo
+from autocompletar import IndiceAutocompletar
+
+# Orçamento para importar app.py em um processo novo, em milissegundos
+ORCAMENTO_IMPORTACAO_APP_MS = float(os.environ.get('ORCAMENTO_IMPORTACAO_APP_MS', 400))
+
+# Dependências pesadas que não podem ser carregadas na inicialização
+DEPENDENCIAS_SOB_DEMANDA = ['pandas', 'pyarrow', 'reportlab', 'pdfkit', 'pypdf', 'requests', 'multiprocessing']
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import pypdf
+    import reportlab
+except ImportError:
+    pypdf = None
+
+try:
+    import fastapi
+    import httpx
+except ImportError:
+    fastapi = None
+
+# Diretórios de dados das aplicações importadas nos testes (journal de alertas
+# e jobs de exportação), fora da pasta data/ do repositório
+diretorio_dados_testes = None
+
+def setUpModule():
+    global diretorio_dados_testes
+    diretorio_dados_testes = tempfile.TemporaryDirectory()
+    
+    for variavel, subdiretorio in (('DIRETORIO_ALERTAS', 'alertas'), ('DIRETORIO_EXPORTACOES', 'exportacoes')):
+        substituicao = patch.dict(os.environ, {variavel: os.path.join(diretorio_dados_testes.name, subdiretorio)})
+        substituicao.start()
+        unittest.addModuleCleanup(substituicao.stop)
+
+def tearDownModule():
+    import alerta_service
+    
+    # Interrompe o serviço de alertas compartilhado antes de apagar o journal
+    if alerta_service._alerta_service is not None:
+        alerta_service._alerta_service.parar_monitoramento()
+        alerta_service._alerta_service = None
+    
+    diretorio_dados_testes.cleanup()
 
 class TestTCUJurisprudenciaAPI(unittest.TestCase):
     """Testes para a classe TCUJurisprudenciaAPI"""
@@ -27,6 +98,55 @@ class TestTCUJurisprudenciaAPI(unittest.TestCase):
         self.assertEqual(resultado[0]["key"], "123")
         mock_get.assert_called_once()
     
+    def test_iterar_acordaos(self):
+        api = TCUJurisprudenciaAPI()
+        
+        # O mesmo ID sempre corresponde ao mesmo acórdão
+        self.assertEqual(api.buscar_acordao_por_id('acordao-1010'), api.buscar_acordao_por_id('acordao-1010'))
+        self.assertIsNone(api.buscar_acordao_por_id('inexistente'))
+        
+        # Busca por IDs preserva a ordem pedida e ignora IDs inexistentes
+        ids = [a['id'] for a in api.iterar_acordaos(ids=['acordao-1003', 'inexistente', 'acordao-1001'])]
+        self.assertEqual(ids, ['acordao-1003', 'acordao-1001'])
+        
+        # Busca por filtros percorre todas as páginas do acervo
+        filtros = {"colegiado": "Plenário"}
+        resultado = list(api.iterar_acordaos(filtros=filtros, tamanho_pagina=64))
+        esperado = api.filtrar_acordaos(list(api.iterar_acordaos(tamanho_pagina=1000)), filtros)
+        self.assertEqual(resultado, esperado)
+        self.assertTrue(all(a['colegiado'] == 'Plenário' for a in resultado))
+    
+    def test_acervo_simulado_com_semente(self):
+        api = TCUJurisprudenciaAPI()
+        
+        # Gerar em blocos produz o mesmo acervo que gerar de uma vez
+        acervo = api._gerar_acordaos_simulados(20, 0, semente=7)
+        em_blocos = api._gerar_acordaos_simulados(8, 0, semente=7) + api._gerar_acordaos_simulados(12, 8, semente=7)
+        self.assertEqual(acervo, em_blocos)
+        
+        # Outra semente mantém os IDs e altera o conteúdo
+        outro = api._gerar_acordaos_simulados(20, 0, semente=8)
+        self.assertEqual([a['id'] for a in outro], [a['id'] for a in acervo])
+        self.assertNotEqual(outro, acervo)
+    
+    def test_acervo_http(self):
+        # Serviço de acórdãos local, com o mesmo acervo do modo simulado
+        servidor = ServidorTCUSimulado(total=50, latencia=0, variacao_latencia=0).iniciar()
+        self.addCleanup(servidor.parar)
+        
+        api = TCUJurisprudenciaAPI(url_acervo=servidor.url)
+        local = TCUJurisprudenciaAPI()
+        
+        self.assertEqual(api.buscar_acordaos(1, 20), local.buscar_acordaos(1, 20))
+        self.assertEqual(len(api.buscar_acordaos(2, 20)), 10)
+        self.assertEqual(api.buscar_acordao_por_id('acordao-1010'), local.buscar_acordao_por_id('acordao-1010'))
+        self.assertIsNone(api.buscar_acordao_por_id('acordao-1050'))
+        
+        # Falhas do serviço são propagadas, e não confundidas com acervo vazio
+        servidor.taxa_erros = 1.0
+        with self.assertRaises(requests.HTTPError):
+            api.buscar_acordaos(0, 20)
+    
     def test_filtrar_acordaos(self):
         # Dados de teste
         acordaos = [
@@ -66,6 +186,130 @@ class TestTCUJurisprudenciaAPI(unittest.TestCase):
         self.assertEqual(resultado[0]["sumario"], "Teste de licitação")
 
 
+class TestCorpusCompartilhado(unittest.TestCase):
+    """Testes do acervo compartilhado com gerações imutáveis"""
+    
+    def test_geracoes(self):
+        servidor = ServidorTCUSimulado(total=30, latencia=0, variacao_latencia=0).iniciar()
+        self.addCleanup(servidor.parar)
+        
+        corpus = CorpusCompartilhado(TCUJurisprudenciaAPI(url_acervo=servidor.url), intervalo=3600, tamanho_pagina=8)
+        self.addCleanup(corpus.parar)
+        
+        geracoes = []
+        corpus.observar(lambda snapshot, novos: geracoes.append((snapshot.geracao, [a['id'] for a in novos])))
+        
+        anterior = corpus.atual()
+        self.assertEqual(len(anterior), 30)
+        self.assertEqual(anterior.buscar_acordaos(1, 20), TCUJurisprudenciaAPI().buscar_acordaos(1, 20)[:10])
+        self.assertEqual([a['id'] for a in anterior.iterar_acordaos(ids=['acordao-1003', 'x', 'acordao-1001'])], ['acordao-1003', 'acordao-1001'])
+        
+        # Acórdãos publicados entram na próxima geração e são informados aos observadores
+        servidor.total = 32
+        atual = corpus.atualizar()
+        self.assertEqual(geracoes, [(1, []), (2, ['acordao-1030', 'acordao-1031'])])
+        self.assertIs(corpus.atual(), atual)
+        
+        # A geração anterior não muda
+        self.assertEqual(len(anterior), 30)
+        self.assertIsNone(anterior.buscar_acordao_por_id('acordao-1031'))
+        
+        # Linha do tempo derivada da anterior igual à montada do zero
+        for granularidade in ('dia', 'mes', 'ano'):
+            self.assertEqual(atual.linha_tempo.detalhar('tema', granularidade), CuboLinhaTempo(atual.acordaos).detalhar('tema', granularidade))
+        self.assertEqual(sum(p['total'] for p in anterior.linha_tempo.consultar('ano')), 30)
+        self.assertEqual(sum(p['total'] for p in atual.linha_tempo.consultar('ano')), 32)
+        
+        # Colegiado e tema sem distinção de maiúsculas, também no cubo derivado
+        colegiado = atual.linha_tempo.valores('colegiado')[0]
+        self.assertEqual(atual.linha_tempo.consultar('ano', colegiado=colegiado.upper()), atual.linha_tempo.consultar('ano', colegiado=colegiado))
+        self.assertTrue(atual.linha_tempo.consultar('ano', colegiado=colegiado.upper()))
+        
+        # Falhas na atualização mantêm a geração em uso
+        servidor.taxa_erros = 1.0
+        self.assertIsNone(corpus.atualizar())
+        self.assertIs(corpus.atual(), atual)
+    
+    def criar_corpus_por_chave(self, acordaos):
+        # Acervo com acórdãos como os do serviço do TCU, só com a chave 'key'
+        api = TCUJurisprudenciaAPI()
+        api.iterar_acordaos = lambda tamanho_pagina: iter(list(acordaos))
+        
+        corpus = CorpusCompartilhado(api, intervalo=3600)
+        self.addCleanup(corpus.parar)
+        return corpus
+    
+    def test_acordaos_so_com_chave(self):
+        acordaos = [{'key': f'ACORDAO-{i}', 'titulo': f'Acórdão {i}', 'colegiado': 'Plenário', 'dataSessao': '10/03/2023'} for i in range(5)]
+        corpus = self.criar_corpus_por_chave(acordaos)
+        
+        novos = []
+        corpus.observar(lambda snapshot, acordaos_novos: novos.extend(acordaos_novos))
+        
+        anterior = corpus.atual()
+        self.assertEqual(len(anterior.por_id), 5)
+        self.assertEqual(anterior.buscar_acordao_por_id('ACORDAO-3'), acordaos[3])
+        
+        # A ETag muda quando o conteúdo de um acórdão muda
+        etag = calcular_etag(anterior.acordaos, versao=anterior.versao)
+        acordaos[0] = dict(acordaos[0], titulo='Acórdão 0 (retificado)')
+        acordaos.append({'key': 'ACORDAO-5', 'titulo': 'Acórdão 5', 'colegiado': 'Plenário', 'dataSessao': '11/03/2023'})
+        
+        atual = corpus.atualizar()
+        self.assertNotEqual(calcular_etag(atual.acordaos[:5], versao=atual.versao), etag)
+        
+        # Apenas o acórdão que entrou é informado aos observadores
+        self.assertEqual(novos, [acordaos[5]])
+    
+    def test_linha_tempo_acordaos_so_com_chave(self):
+        acordaos = [{'key': f'ACORDAO-{i}', 'colegiado': 'Plenário', 'dataSessao': f'{i + 1:02d}/03/2023'} for i in range(5)]
+        corpus = self.criar_corpus_por_chave(acordaos)
+        corpus.atual()
+        
+        # Um acórdão de 2022 entra sem alterar a contagem de 2023
+        acordaos.append({'key': 'ACORDAO-5', 'colegiado': 'Plenário', 'dataSessao': '15/06/2022'})
+        atual = corpus.atualizar()
+        
+        self.assertEqual(atual.linha_tempo.consultar('ano'), [{'periodo': '2022', 'total': 1}, {'periodo': '2023', 'total': 5}])
+        self.assertEqual(atual.linha_tempo.detalhar('colegiado', 'mes'), CuboLinhaTempo(atual.acordaos).detalhar('colegiado', 'mes'))
+
+
+class TestIndiceAutocompletar(unittest.TestCase):
+    """Testes das sugestões de relator, tema e subtema"""
+    
+    def setUp(self):
+        self.acordaos = [
+            {'relator': 'Benjamin Zymler', 'temas': ['Licitação'], 'subtemas': ['Pregão Eletrônico']},
+            {'relator': 'Benjamin Zymler', 'temas': ['Licitação', 'Licitação'], 'subtemas': []},
+            {'relator': 'Bruno Dantas', 'temas': ['Licença'], 'subtemas': ['Pregão Presencial']},
+            {'relator': 'Walton Alencar', 'temas': ['Licitação', 'Obras'], 'subtemas': ['Pregão Eletrônico']}
+        ]
+        self.indice = IndiceAutocompletar(self.acordaos, limite=3)
+    
+    def test_sugestoes_por_frequencia(self):
+        # Ordenadas pela quantidade de acórdãos, que conta cada acórdão uma vez
+        self.assertEqual(self.indice.sugerir('tema', 'lic'), [{'valor': 'Licitação', 'total': 3}, {'valor': 'Licença', 'total': 1}])
+        self.assertEqual([s['valor'] for s in self.indice.sugerir('relator', 'b')], ['Benjamin Zymler', 'Bruno Dantas'])
+        self.assertEqual(self.indice.sugerir('relator', 'b', limite=1), [{'valor': 'Benjamin Zymler', 'total': 2}])
+        self.assertEqual(len(self.indice.sugerir('relator', '')), 3)
+        
+        # O índice só guarda 3 sugestões por nó
+        with self.assertRaises(ValueError):
+            self.indice.sugerir('relator', '', limite=4)
+    
+    def test_acentos_e_inicio_de_palavra(self):
+        self.assertEqual(self.indice.sugerir('subtema', 'PREGAO ELE'), [{'valor': 'Pregão Eletrônico', 'total': 2}])
+        self.assertEqual([s['valor'] for s in self.indice.sugerir('relator', 'zym')], ['Benjamin Zymler'])
+        self.assertEqual([s['valor'] for s in self.indice.sugerir('subtema', 'presencial')], ['Pregão Presencial'])
+        
+        # Só início de palavra, e nada para prefixos desconhecidos
+        self.assertEqual(self.indice.sugerir('relator', 'ymler'), [])
+        self.assertEqual(self.indice.sugerir('tema', 'xyz'), [])
+        
+        with self.assertRaises(ValueError):
+            self.indice.sugerir('colegiado', 'p')
+
+
 class TestAnalisadorAcordaos(unittest.TestCase):
     """Testes para a classe AnalisadorAcordaos"""
     
@@ -206,6 +450,31 @@ class TestExportadorAcordaos(unittest.TestCase):
         self.assertTrue(resultado)
         self.assertTrue(os.path.exists(caminho_arquivo))
     
+    def test_gerar_csv_em_blocos(self):
+        # Dados de teste (gerador, para simular exportações grandes)
+        acordaos = (
+            {
+                "numeroAcordao": str(1000 + i),
+                "anoAcordao": "2023",
+                "colegiado": "Plenário",
+                "sumario": "Sumário de teste",
+                "campoIgnorado": "não exportado"
+            }
+            for i in range(5)
+        )
+        
+        # Gerar CSV em blocos de 2 linhas
+        exportador = ExportadorAcordaos()
+        blocos = list(exportador.gerar_csv(acordaos, linhas_por_bloco=2))
+        
+        # Verificar resultados
+        self.assertEqual(len(blocos), 3)
+        self.assertTrue(blocos[0].startswith("\ufeffnumeroAcordao,anoAcordao,colegiado,sumario\n"))
+        
+        linhas = "".join(blocos).splitlines()
+        self.assertEqual(len(linhas), 6)
+        self.assertEqual(linhas[-1], "1004,2023,Plenário,Sumário de teste")
+    
     def test_exportar_json(self):
         # Dados de teste
         acordaos = [
@@ -232,6 +501,62 @@ class TestExportadorAcordaos(unittest.TestCase):
             self.assertEqual(len(dados), 1)
             self.assertEqual(dados[0]["numeroAcordao"], "1234")
     
+    def test_gerar_json_e_ndjson_em_blocos(self):
+        # Dados de teste
+        acordaos = [{"numeroAcordao": str(1000 + i), "colegiado": "Plenário"} for i in range(3)]
+        
+        # Gerar JSON e NDJSON em blocos de 2 acórdãos
+        exportador = ExportadorAcordaos()
+        texto_json = "".join(exportador.gerar_json(acordaos, registros_por_bloco=2))
+        texto_ndjson = "".join(exportador.gerar_ndjson(acordaos, registros_por_bloco=2))
+        
+        # Verificar resultados
+        self.assertEqual(json.loads(texto_json), acordaos)
+        self.assertEqual(json.loads("".join(exportador.gerar_json([]))), [])
+        self.assertEqual([json.loads(linha) for linha in texto_ndjson.splitlines()], acordaos)
+        self.assertIn("Plenário", texto_ndjson)
+    
+    def test_comprimir_gzip(self):
+        # Comprimir blocos gerados em NDJSON
+        exportador = ExportadorAcordaos()
+        blocos = exportador.gerar_ndjson([{"colegiado": "Plenário"}] * 10)
+        comprimido = b"".join(comprimir_gzip(blocos))
+        
+        # Verificar resultados
+        self.assertEqual(gzip.decompress(comprimido).decode("utf-8").count("\n"), 10)
+    
+    @unittest.skipIf(pyarrow is None, "pyarrow não instalado")
+    def test_exportar_parquet_e_arrow(self):
+        # Dados de teste
+        acordaos = [
+            {
+                "numeroAcordao": str(1000 + i),
+                "colegiado": "Plenário" if i % 2 else "Primeira Câmara",
+                "relator": "Ministro Teste",
+                "relevancia": 0.75,
+                "temas": ["Licitação"],
+                "subtemas": ["Pregão Eletrônico", "Dispensa de Licitação"]
+            }
+            for i in range(5)
+        ]
+        
+        # Exportar em lotes de 2 acórdãos
+        exportador = ExportadorAcordaos()
+        caminho_parquet = os.path.join(self.temp_dir, "teste.parquet")
+        caminho_arrow = os.path.join(self.temp_dir, "teste.arrows")
+        self.assertTrue(exportador.exportar_parquet(acordaos, caminho_parquet, registros_por_lote=2))
+        self.assertTrue(exportador.exportar_arrow(iter(acordaos), caminho_arrow, registros_por_lote=2))
+        
+        # Verificar resultados
+        tabela_parquet = pyarrow.parquet.read_table(caminho_parquet)
+        tabela_arrow = pyarrow.ipc.open_stream(caminho_arrow).read_all()
+        
+        for tabela in (tabela_parquet, tabela_arrow):
+            self.assertEqual(tabela.num_rows, 5)
+            self.assertTrue(pyarrow.types.is_dictionary(tabela.schema.field("colegiado").type))
+            self.assertTrue(pyarrow.types.is_list(tabela.schema.field("subtemas").type))
+            self.assertEqual(tabela.to_pylist(), acordaos)
+    
     def test_gerar_html_para_pdf(self):
         # Dados de teste
         acordaos = [
@@ -255,6 +580,966 @@ class TestExportadorAcordaos(unittest.TestCase):
         self.assertIn("ACÓRDÃO Nº 1234/2023", html)
         self.assertIn("Ministro Teste", html)
 
+    
+    def test_gerar_html_para_pdf_sem_titulo(self):
+        # Fragmentos seguintes ao primeiro não repetem o título do relatório
+        acordaos = [{"numeroAcordao": str(1000 + i), "anoAcordao": "2023"} for i in range(4)]
+        
+        exportador = ExportadorAcordaos()
+        html = exportador.gerar_html_para_pdf(acordaos, incluir_titulo=False)
+        
+        # Verificar resultados
+        self.assertNotIn("Acórdãos do TCU - Relatório", html)
+        self.assertEqual(html.count('class="acordao"'), 4)
+        self.assertEqual(html.count('class="page-break"'), 1)
+    
+    def test_exportar_pacote(self):
+        # Gerador: o pacote deve ler os acórdãos uma única vez
+        acordaos = ({"id": f"acordao-{i}", "colegiado": "Plenário"} for i in range(1200))
+        servico = ExportacaoService(CacheExportacoes(self.temp_dir))
+        
+        conteudo = b"".join(servico.exportar_pacote(acordaos, ['csv', 'json', 'ndjson']))
+        
+        # Verificar resultados
+        with zipfile.ZipFile(io.BytesIO(conteudo)) as pacote:
+            self.assertEqual(
+                sorted(pacote.namelist()),
+                ['acordaos_exportados.csv', 'acordaos_exportados.json', 'acordaos_exportados.ndjson']
+            )
+            self.assertEqual(len(json.loads(pacote.read('acordaos_exportados.json'))), 1200)
+            self.assertEqual(pacote.read('acordaos_exportados.ndjson').count(b"\n"), 1200)
+            self.assertEqual(pacote.read('acordaos_exportados.csv').decode('utf-8-sig').count("\n"), 1201)
+    
+    @unittest.skipIf(pypdf is None, "pypdf ou reportlab não instalado")
+    def test_exportar_pdf_em_fragmentos(self):
+        from exportacao_service import _renderizar_pdf
+        
+        # 7 acórdãos em fragmentos de 3: três fragmentos em dois processos
+        acordaos = [
+            {"numeroAcordao": str(1000 + i), "anoAcordao": "2023", "colegiado": "Plenário", "sumario": "Sumário de teste. " * 200}
+            for i in range(7)
+        ]
+        caminho = os.path.join(self.temp_dir, "fragmentos.pdf")
+        
+        exportador = ExportadorAcordaos()
+        self.assertTrue(exportador.exportar_pdf(acordaos, caminho, acordaos_por_fragmento=3, max_processos=2))
+        
+        # Páginas de cada fragmento renderizado isoladamente
+        paginas_fragmentos = 0
+        for i in range(0, 7, 3):
+            fragmento = os.path.join(self.temp_dir, f"fragmento_{i}.pdf")
+            _renderizar_pdf(acordaos[i:i + 3], fragmento, i == 0)
+            paginas_fragmentos += len(pypdf.PdfReader(fragmento).pages)
+        
+        # O PDF unido tem todas as páginas, com os acórdãos na ordem original
+        leitor = pypdf.PdfReader(caminho)
+        self.assertEqual(len(leitor.pages), paginas_fragmentos)
+        self.assertGreater(paginas_fragmentos, 3)
+        
+        texto = "".join(pagina.extract_text() for pagina in leitor.pages)
+        posicoes = [texto.find(f"{1000 + i}/2023") for i in range(7)]
+        self.assertNotIn(-1, posicoes)
+        self.assertEqual(posicoes, sorted(posicoes))
+        self.assertEqual(texto.count("Relatório"), 1)
+
+
+
+class TestCacheExportacoes(unittest.TestCase):
+    """Testes para a classe CacheExportacoes"""
+    
+    def setUp(self):
+        # Diretório temporário para o cache
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_exportar_com_cache(self):
+        # Dados de teste
+        acordaos = [{"id": "acordao-1", "numeroAcordao": "1234"}, {"id": "acordao-2", "numeroAcordao": "5678"}]
+        servico = ExportacaoService(CacheExportacoes(self.temp_dir.name))
+        
+        # Exportações idênticas reaproveitam o mesmo arquivo
+        chamadas = []
+        def obter_acordaos():
+            chamadas.append(1)
+            return acordaos
+        
+        caminho = servico.exportar_com_cache(obter_acordaos, 'json')
+        self.assertEqual(servico.exportar_com_cache(obter_acordaos, 'json'), caminho)
+        self.assertEqual(len(chamadas), 3)
+        
+        # Outro formato ou conteúdo alterado geram outro arquivo
+        self.assertNotEqual(servico.exportar_com_cache(obter_acordaos, 'csv'), caminho)
+        acordaos[0] = dict(acordaos[0], numeroAcordao="4321")
+        self.assertNotEqual(servico.exportar_com_cache(obter_acordaos, 'json'), caminho)
+    
+    def test_limpar(self):
+        cache = CacheExportacoes(self.temp_dir.name, ttl=60, tamanho_maximo=15)
+        
+        def gravar(conteudo):
+            def exportar(destino):
+                with open(destino, 'w') as f:
+                    f.write(conteudo)
+                return True
+            return exportar
+        
+        # Arquivo expirado é removido
+        expirado = cache.gerar('expirado', 'csv', gravar('x'))
+        os.utime(expirado, (time.time() - 120, time.time() - 120))
+        
+        # Acima do espaço máximo, o arquivo usado há mais tempo é removido
+        antigo = cache.gerar('antigo', 'csv', gravar('a' * 10))
+        os.utime(antigo, (time.time() - 30, time.time() - 30))
+        recente = cache.gerar('recente', 'csv', gravar('b' * 10))
+        
+        # Verificar resultados
+        self.assertFalse(os.path.exists(expirado))
+        self.assertFalse(os.path.exists(antigo))
+        self.assertIsNone(cache.obter('antigo', 'csv'))
+        self.assertEqual(cache.obter('recente', 'csv'), recente)
+        
+        # O arquivo recém-gerado é mantido mesmo se sozinho exceder o espaço
+        grande = cache.gerar('grande', 'csv', gravar('c' * 20))
+        self.assertEqual(cache.obter('grande', 'csv'), grande)
+        self.assertIsNone(cache.obter('recente', 'csv'))
+
+
+class TestFilaExportacaoService(unittest.TestCase):
+    """Testes para a classe FilaExportacaoService"""
+    
+    def setUp(self):
+        # Diretório temporário para os jobs e para o cache de exportações
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.exportacao_service = ExportacaoService(CacheExportacoes(os.path.join(self.temp_dir.name, 'cache')))
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def aguardar_job(self, fila, job_id, timeout=10):
+        # Aguarda o job sair da fila ou do processamento
+        limite = time.time() + timeout
+        while time.time() < limite:
+            job = fila.consultar_job(job_id)
+            if job['status'] in ('concluido', 'erro'):
+                return job
+            time.sleep(0.05)
+        self.fail("Job não concluído no tempo esperado")
+    
+    def test_criar_job(self):
+        # Criar job de exportação
+        fila = FilaExportacaoService(self.exportacao_service, diretorio_jobs=self.temp_dir.name)
+        acordaos = [{"numeroAcordao": str(1000 + i), "colegiado": "Plenário"} for i in range(10)]
+        job_id = fila.criar_job(acordaos, 'json')
+        
+        # Verificar resultados
+        job = self.aguardar_job(fila, job_id)
+        self.assertEqual(job['status'], 'concluido')
+        self.assertEqual(job['processados'], 10)
+        
+        with open(fila.caminho_artefato(job_id), 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), acordaos)
+        
+        self.assertIsNone(fila.consultar_job('../alertas'))
+    
+    def test_lock_removido_de_job_terminado(self):
+        fila = FilaExportacaoService(self.exportacao_service, diretorio_jobs=self.temp_dir.name)
+        job_id = fila.criar_job([{"numeroAcordao": "1000"}], 'json')
+        self.aguardar_job(fila, job_id)
+        
+        # Processar de novo um job terminado (ex.: retomado por outro processo)
+        # não deixa arquivos de lock para trás, nem se o job terminar depois
+        # de o arquivo ser criado
+        fila._processar_job(job_id)
+        
+        with patch.object(fila, '_em_aberto', side_effect=[True, False]):
+            fila._processar_job(job_id)
+        
+        self.assertEqual([nome for nome in os.listdir(self.temp_dir.name) if nome.endswith('.lock')], [])
+    
+    def test_criar_job_por_consulta(self):
+        # Criar job que seleciona os acórdãos no próprio servidor
+        fila = FilaExportacaoService(self.exportacao_service, TCUJurisprudenciaAPI(), diretorio_jobs=self.temp_dir.name)
+        job_id = fila.criar_job(None, 'ndjson', {'ids': ['acordao-1005', 'acordao-1001'], 'filtros': {}})
+        
+        # Verificar resultados
+        job = self.aguardar_job(fila, job_id)
+        self.assertEqual(job['status'], 'concluido')
+        self.assertEqual(job['processados'], 2)
+        
+        with open(fila.caminho_artefato(job_id), 'r', encoding='utf-8') as f:
+            self.assertEqual([json.loads(linha)['id'] for linha in f], ['acordao-1005', 'acordao-1001'])
+    
+    def test_retomar_job_apos_reinicio(self):
+        # Simular job gravado por um processo que foi encerrado
+        fila = FilaExportacaoService(self.exportacao_service, diretorio_jobs=self.temp_dir.name)
+        job_id = '00000000-0000-0000-0000-000000000001'
+        fila._gravar_json(fila._caminho_entrada(job_id), {'acordaos': [{"numeroAcordao": "1234"}]})
+        fila._gravar_json(fila._caminho_job(job_id), {
+            'id': job_id, 'formato': 'csv', 'status': 'processando', 'processados': 0,
+            'total': 1, 'criado_em': '2023-01-01T00:00:00', 'atualizado_em': '2023-01-01T00:00:00',
+            'arquivo': None, 'erro': None
+        })
+        
+        # Novo serviço retoma o job
+        fila_reiniciada = FilaExportacaoService(self.exportacao_service, diretorio_jobs=self.temp_dir.name)
+        job = self.aguardar_job(fila_reiniciada, job_id)
+        
+        # Verificar resultados
+        self.assertEqual(job['status'], 'concluido')
+        self.assertTrue(os.path.exists(fila_reiniciada.caminho_artefato(job_id)))
+
+
+
+class TestAlertaService(unittest.TestCase):
+    """Testes para a classe AlertaService"""
+    
+    def setUp(self):
+        # Diretório temporário para os alertas
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_gerenciar_alertas(self):
+        servico = AlertaService(self.temp_dir.name)
+        
+        # Adicionar, atualizar e remover alertas
+        alerta_1 = servico.adicionar_alerta('usuario-1', 'a@exemplo.com', temas=['Licitação'])
+        alerta_2 = servico.adicionar_alerta('usuario-1', 'a@exemplo.com', palavras_chave=['pregão'])
+        alerta_3 = servico.adicionar_alerta('usuario-2', 'b@exemplo.com')
+        self.assertTrue(servico.atualizar_alerta(alerta_2, {'frequencia': 'semanal', 'usuario_id': 'ignorado'}))
+        self.assertTrue(servico.remover_alerta(alerta_3))
+        self.assertFalse(servico.remover_alerta(alerta_3))
+        
+        # Verificar resultados, inclusive após recarregar do disco
+        for atual in (servico, AlertaService(self.temp_dir.name)):
+            self.assertEqual([a['id'] for a in atual.buscar_alertas_por_usuario('usuario-1')], [alerta_1, alerta_2])
+            self.assertEqual(atual.buscar_alertas_por_usuario('usuario-2'), [])
+            self.assertEqual(atual.buscar_alerta(alerta_2)['frequencia'], 'semanal')
+            self.assertEqual(atual.buscar_alerta(alerta_2)['usuario_id'], 'usuario-1')
+            self.assertIsNone(atual.buscar_alerta(alerta_3))
+    
+    def test_gravacao_interrompida(self):
+        servico = AlertaService(self.temp_dir.name)
+        alerta_id = servico.adicionar_alerta('usuario-1', 'a@exemplo.com')
+        
+        # Simular processo encerrado no meio de uma gravação
+        with open(servico.arquivo_alertas, 'a', encoding='utf-8') as f:
+            f.write('{"op": "salvar", "alerta": {"id": "incomp')
+        
+        # A linha incompleta é descartada e novas gravações continuam legíveis
+        recarregado = AlertaService(self.temp_dir.name)
+        outro_id = recarregado.adicionar_alerta('usuario-1', 'a@exemplo.com')
+        
+        ids = [a['id'] for a in AlertaService(self.temp_dir.name).alertas]
+        self.assertEqual(ids, [alerta_id, outro_id])
+    
+    def test_compactacao_e_migracao(self):
+        # Arquivo JSON usado antes do journal
+        with open(os.path.join(self.temp_dir.name, 'alertas.json'), 'w', encoding='utf-8') as f:
+            json.dump([{'id': 'legado', 'usuario_id': 'usuario-1', 'email': 'a@exemplo.com', 'ativo': True}], f)
+        
+        servico = AlertaService(self.temp_dir.name)
+        self.assertEqual(servico.buscar_alerta('legado')['email'], 'a@exemplo.com')
+        
+        # Muitas atualizações do mesmo alerta disparam a compactação
+        for i in range(1500):
+            servico.atualizar_alerta('legado', {'email': f'{i}@exemplo.com'})
+        
+        with open(servico.arquivo_alertas, 'r', encoding='utf-8') as f:
+            self.assertLess(len(f.readlines()), 1000)
+        
+        self.assertEqual(AlertaService(self.temp_dir.name).buscar_alerta('legado')['email'], '1499@exemplo.com')
+    
+    def test_instancias_compartilhando_journal(self):
+        # Duas instâncias simulam workers diferentes sobre os mesmos arquivos
+        servico_1 = AlertaService(self.temp_dir.name)
+        servico_2 = AlertaService(self.temp_dir.name)
+        
+        alerta_id = servico_1.adicionar_alerta('usuario-1', 'a@exemplo.com')
+        self.assertEqual(servico_2.buscar_alerta(alerta_id)['email'], 'a@exemplo.com')
+        
+        # Atualizações intercaladas não sobrescrevem umas às outras
+        servico_1.atualizar_alerta(alerta_id, {'email': 'b@exemplo.com'})
+        servico_2.atualizar_alerta(alerta_id, {'frequencia': 'semanal'})
+        alerta = servico_1.buscar_alerta(alerta_id)
+        self.assertEqual((alerta['email'], alerta['frequencia']), ('b@exemplo.com', 'semanal'))
+        
+        # Compactação feita por uma instância é detectada pela outra
+        for i in range(1200):
+            servico_2.atualizar_alerta(alerta_id, {'email': f'{i}@exemplo.com'})
+        self.assertEqual(servico_1.buscar_alerta(alerta_id)['email'], '1199@exemplo.com')
+        
+        servico_1.remover_alerta(alerta_id)
+        self.assertEqual(servico_2.alertas, [])
+    
+    def test_compactacao_com_inode_reaproveitado(self):
+        servico_1 = AlertaService(self.temp_dir.name)
+        servico_2 = AlertaService(self.temp_dir.name)
+        
+        ids = [servico_1.adicionar_alerta(f'usuario-{i}', f'{i}@exemplo.com') for i in range(3)]
+        self.assertEqual(len(servico_2.alertas), 3)
+        
+        # Mantém o inode do journal lido pela segunda instância
+        journal = servico_1.arquivo_alertas
+        antigo = journal + '.antigo'
+        os.link(journal, antigo)
+        inode = os.stat(journal).st_ino
+        
+        servico_1.remover_alerta(ids[0])
+        ids += [servico_1.adicionar_alerta(f'usuario-{i}', f'{i}@exemplo.com') for i in range(3, 6)]
+        
+        with servico_1.repositorio._bloqueio_exclusivo():
+            servico_1.repositorio._compactar()
+        
+        # O journal compactado (maior que o lido) volta ao inode antigo
+        with open(journal, 'rb') as f:
+            conteudo = f.read()
+        with open(antigo, 'wb') as f:
+            f.write(conteudo)
+        os.replace(antigo, journal)
+        self.assertEqual(os.stat(journal).st_ino, inode)
+        
+        # A geração no cabeçalho indica a compactação
+        self.assertEqual([alerta['id'] for alerta in servico_2.alertas], ids[1:])
+    
+    def test_automato_palavras(self):
+        automato = AutomatoPalavras(['Pregão', 'pregão eletrônico', 'BDI', 'contas'])
+        
+        # Acentos e caixa são ignorados, e só palavras inteiras são aceitas
+        self.assertEqual(normalizar_texto('  LICITAÇÃO   Pública '), 'licitacao publica')
+        self.assertEqual(automato.buscar('Pregao Eletronico para abdicação de contas.'), {'pregao', 'pregao eletronico', 'contas'})
+        self.assertEqual(automato.buscar('Prestação de contas sem BDIs'), {'contas'})
+    
+    def test_corresponder_acordaos(self):
+        indice = IndiceAlertas([
+            {'id': 'tema', 'temas': ['licitacao'], 'subtemas': [], 'palavras_chave': [], 'ativo': True},
+            {'id': 'tema-e-palavra', 'temas': ['Licitação', 'Convênio'], 'palavras_chave': ['sobrepreço'], 'ativo': True},
+            {'id': 'subtema', 'subtemas': ['Multa'], 'ativo': True},
+            {'id': 'todos', 'ativo': True},
+            {'id': 'inativo', 'temas': ['Licitação'], 'ativo': False}
+        ])
+        
+        acordaos = [
+            {'id': 'a1', 'temas': ['Licitação'], 'subtemas': ['Multa'], 'titulo': 'Acórdão', 'sumario': 'Indícios de sobrepreço.'},
+            {'id': 'a2', 'temas': ['Licitação'], 'subtemas': [], 'titulo': 'Acórdão', 'sumario': 'Pregão eletrônico.'},
+            {'id': 'a3', 'temas': ['Obra Pública'], 'subtemas': [], 'titulo': 'Sobrepreço', 'sumario': ''}
+        ]
+        
+        self.assertEqual(indice.corresponder(acordaos), {
+            'tema': ['a1', 'a2'],
+            'tema-e-palavra': ['a1'],
+            'subtema': ['a1'],
+            'todos': ['a1', 'a2', 'a3']
+        })
+    
+    def test_processar_alertas_com_novos_acordaos(self):
+        servico = AlertaService(self.temp_dir.name)
+        alerta_id = servico.adicionar_alerta('usuario-1', 'a@exemplo.com', palavras_chave=['dispensa'])
+        servico.adicionar_alerta('usuario-2', 'b@exemplo.com', temas=['Convênio'])
+        
+        novos = [{'id': 'a1', 'temas': ['Licitação'], 'titulo': '', 'sumario': 'Dispensa de licitação.'}]
+        self.assertEqual(servico.corresponder_acordaos(novos), {alerta_id: ['a1']})
+        
+        # O índice acompanha as alterações dos alertas
+        servico.atualizar_alerta(alerta_id, {'ativo': False})
+        self.assertEqual(servico.corresponder_acordaos(novos), {})
+    
+    def test_agendamento_por_frequencia(self):
+        envios = []
+        servico = AlertaService(self.temp_dir.name, notificar=envios.extend)
+        criacao = datetime.now()
+        
+        diario = servico.adicionar_alerta('usuario-1', 'a@exemplo.com', temas=['Licitação'])
+        semanal = servico.adicionar_alerta('usuario-2', 'b@exemplo.com', temas=['Licitação'], frequencia='semanal')
+        imediato = servico.adicionar_alerta('usuario-3', 'c@exemplo.com', temas=['Licitação'], frequencia='imediata')
+        
+        # Alertas imediatos são disparados na ingestão; os demais acumulam
+        servico.registrar_novos_acordaos([{'id': 'a1', 'temas': ['Licitação']}])
+        self.assertEqual([(alerta['id'], ids) for alerta, ids in envios], [(imediato, ['a1'])])
+        self.assertEqual(servico.buscar_alerta(diario)['pendentes'], ['a1'])
+        
+        # Nada é executado antes do vencimento
+        envios.clear()
+        self.assertEqual(servico.processar_alertas(agora=criacao + timedelta(hours=23))['processados'], 0)
+        self.assertGreater(servico.agendador.proximo_vencimento(), criacao + timedelta(hours=23))
+        
+        # Após um dia, apenas o alerta diário vence, e só uma vez
+        agora = criacao + timedelta(days=1, minutes=1)
+        self.assertEqual(servico.processar_alertas(agora=agora)['enviados'], 1)
+        self.assertEqual(servico.processar_alertas(agora=agora)['processados'], 0)
+        self.assertEqual([(alerta['id'], ids) for alerta, ids in envios], [(diario, ['a1'])])
+        self.assertEqual(servico.buscar_alerta(diario)['pendentes'], [])
+        
+        # Outra instância (outro processo) não repete a execução
+        self.assertEqual(AlertaService(self.temp_dir.name).processar_alertas(agora=agora)['processados'], 0)
+        
+        # O alerta semanal vence depois de uma semana, mesmo sem acórdãos novos
+        estatisticas = servico.processar_alertas(agora=criacao + timedelta(weeks=1, minutes=1))
+        self.assertEqual((estatisticas['processados'], estatisticas['enviados']), (2, 1))
+        self.assertEqual(envios[-1][0]['id'], semanal)
+    
+    def test_nova_tentativa_de_entrega_imediata(self):
+        falhar = [True]
+        envios = []
+        
+        def notificar(lote):
+            envios.extend(lote)
+            return [alerta['email'] for alerta, _ in lote] if falhar[0] else []
+        
+        servico = AlertaService(self.temp_dir.name, notificar=notificar)
+        alerta_id = servico.adicionar_alerta('usuario-1', 'a@exemplo.com', temas=['Licitação'], frequencia='imediata')
+        agora = datetime.now()
+        
+        # A entrega que falha fica pendente, com uma nova tentativa agendada
+        estatisticas = servico.registrar_novos_acordaos([{'id': 'a1', 'temas': ['Licitação']}], agora)
+        self.assertEqual((estatisticas['erros'], estatisticas['reagendados']), (1, 1))
+        self.assertEqual(servico.buscar_alerta(alerta_id)['pendentes'], ['a1'])
+        self.assertAlmostEqual(servico.agendador.proximo_vencimento().timestamp(), (agora + timedelta(minutes=1)).timestamp(), places=3)
+        
+        # Cada nova falha dobra a espera
+        self.assertEqual(servico.processar_alertas(agora=agora + timedelta(minutes=1))['reagendados'], 1)
+        self.assertAlmostEqual(servico.agendador.proximo_vencimento().timestamp(), (agora + timedelta(minutes=3)).timestamp(), places=3)
+        
+        # A tentativa seguinte entrega os acórdãos acumulados e encerra o agendamento
+        falhar[0] = False
+        envios.clear()
+        self.assertEqual(servico.processar_alertas(agora=agora + timedelta(minutes=3))['enviados'], 1)
+        self.assertEqual([(alerta['id'], ids) for alerta, ids in envios], [(alerta_id, ['a1'])])
+        
+        alerta = servico.buscar_alerta(alerta_id)
+        self.assertEqual(alerta['pendentes'], [])
+        self.assertNotIn('tentativas', alerta)
+        self.assertIsNone(servico.agendador.proximo_vencimento())
+    
+    def test_servico_compartilhado_inicia_monitoramento(self):
+        import alerta_service
+        
+        with patch.object(alerta_service, '_alerta_service', None), patch.dict(os.environ, {'DIRETORIO_ALERTAS': self.temp_dir.name}):
+            os.environ.pop('SMTP_HOST', None)
+            
+            servico = alerta_service.obter_alerta_service()
+            self.addCleanup(servico.parar_monitoramento)
+            
+            # Os alertas agendados passam a ser executados sem outra chamada
+            self.assertIs(alerta_service.obter_alerta_service(), servico)
+            self.assertTrue(servico.agendador._thread.is_alive())
+    
+    def test_monitoramento_em_segundo_plano(self):
+        envios = []
+        servico = AlertaService(self.temp_dir.name, notificar=envios.extend)
+        alerta_id = servico.adicionar_alerta('usuario-1', 'a@exemplo.com', temas=['Licitação'])
+        servico.registrar_novos_acordaos([{'id': 'a1', 'temas': ['Licitação']}])
+        
+        servico.iniciar_monitoramento()
+        try:
+            # Vencer o alerta acorda a thread, que o executa
+            servico.repositorio.modificar([alerta_id], lambda alerta: alerta.update(criado_em='2020-01-01T00:00:00'))
+            
+            limite = time.time() + 5
+            while not envios and time.time() < limite:
+                time.sleep(0.01)
+        finally:
+            servico.parar_monitoramento()
+        
+        self.assertEqual([(alerta['id'], ids) for alerta, ids in envios], [(alerta_id, ['a1'])])
+
+class ServidorSMTPTeste(socketserver.ThreadingTCPServer):
+    """Servidor SMTP mínimo, local, para testar o envio de emails"""
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self, falhas_temporarias=0):
+        super().__init__(('127.0.0.1', 0), TratadorSMTPTeste)
+        self.mensagens = []
+        self.conexoes = 0
+        self.abertas = []
+        self.falhas_temporarias = falhas_temporarias
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+    
+    def derrubar_conexoes(self):
+        # Encerra as conexões abertas, como um servidor que derruba as ociosas
+        with self.lock:
+            for conexao in self.abertas:
+                try:
+                    conexao.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            self.abertas.clear()
+    
+    def encerrar(self):
+        self.shutdown()
+        self.server_close()
+
+class TratadorSMTPTeste(socketserver.StreamRequestHandler):
+    def responder(self, linha):
+        self.wfile.write(linha.encode() + b'\r\n')
+    
+    def handle(self):
+        with self.server.lock:
+            self.server.conexoes += 1
+            self.server.abertas.append(self.connection)
+        
+        self.responder('220 teste')
+        destinatarios = []
+        
+        for linha in self.rfile:
+            comando = linha.decode().strip().upper()
+            
+            if comando.startswith(('EHLO', 'HELO')):
+                self.responder('250 teste')
+            elif comando.startswith('MAIL'):
+                destinatarios = []
+                self.responder('250 OK')
+            elif comando.startswith('RCPT'):
+                destinatarios.append(linha.decode().split(':', 1)[1].strip(' <>\r\n'))
+                self.responder('250 OK')
+            elif comando == 'DATA':
+                self.responder('354 Fim com <CRLF>.<CRLF>')
+                dados = b''.join(iter(self.rfile.readline, b'.\r\n'))
+                
+                with self.server.lock:
+                    falhar = self.server.falhas_temporarias > 0
+                    if falhar:
+                        self.server.falhas_temporarias -= 1
+                    else:
+                        self.server.mensagens.append((destinatarios, dados.decode()))
+                
+                self.responder('451 Tente novamente' if falhar else '250 OK')
+            elif comando == 'QUIT':
+                self.responder('221 Tchau')
+                return
+            else:
+                self.responder('250 OK')
+
+class TestEnvioEmailService(unittest.TestCase):
+    """Testes para a classe EnvioEmailService"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_resumo_por_email(self):
+        servidor = ServidorSMTPTeste()
+        envio = EnvioEmailService('127.0.0.1', servidor.server_address[1], max_conexoes=2, espera_inicial=0)
+        
+        try:
+            alerta_1 = {'email': 'a@exemplo.com', 'temas': ['Licitação'], 'subtemas': [], 'palavras_chave': []}
+            alerta_2 = {'email': 'a@exemplo.com', 'temas': [], 'subtemas': [], 'palavras_chave': ['pregão']}
+            outros = [({'email': f'{i}@exemplo.com', 'temas': ['Débito']}, ['a3']) for i in range(10)]
+            
+            falhas = envio.enviar_resumos([(alerta_1, ['a1', 'a2']), (alerta_2, ['a2'])] + outros)
+            self.assertEqual(falhas, [])
+            
+            # Um resumo por email, por no máximo duas conexões reaproveitadas
+            self.assertEqual(len(servidor.mensagens), 11)
+            self.assertLessEqual(servidor.conexoes, 2)
+            
+            resumo = next(dados for destinatarios, dados in servidor.mensagens if destinatarios == ['a@exemplo.com'])
+            self.assertIn('2 novos', resumo)
+            
+            envio.enviar_resumos(outros)
+            self.assertLessEqual(servidor.conexoes, 2)
+        finally:
+            envio.fechar()
+            servidor.encerrar()
+    
+    def test_conexoes_encerradas_pelo_servidor(self):
+        servidor = ServidorSMTPTeste()
+        envio = EnvioEmailService('127.0.0.1', servidor.server_address[1], max_conexoes=1, tentativas=1, espera_inicial=0, ociosidade_verificacao=0)
+        
+        try:
+            self.assertEqual(envio.enviar_resumos([({'email': 'a@exemplo.com'}, ['a1'])]), [])
+            
+            # A conexão do pool foi encerrada entre as execuções: é descartada
+            # sem consumir a única tentativa
+            servidor.derrubar_conexoes()
+            self.assertEqual(envio.enviar_resumos([({'email': 'b@exemplo.com'}, ['a2'])]), [])
+            self.assertEqual(len(servidor.mensagens), 2)
+            self.assertEqual(servidor.conexoes, 2)
+        finally:
+            envio.fechar()
+            servidor.encerrar()
+    
+    def test_novas_tentativas_e_pendentes(self):
+        # Duas falhas temporárias são superadas; a terceira esgota as tentativas
+        servidor = ServidorSMTPTeste(falhas_temporarias=2)
+        envio = EnvioEmailService('127.0.0.1', servidor.server_address[1], max_conexoes=1, tentativas=3, espera_inicial=0)
+        
+        try:
+            self.assertEqual(envio.enviar_resumos([({'email': 'a@exemplo.com'}, ['a1'])]), [])
+            self.assertEqual(len(servidor.mensagens), 1)
+            
+            servidor.falhas_temporarias = 3
+            servico = AlertaService(self.temp_dir.name, notificar=envio)
+            alerta_id = servico.adicionar_alerta('usuario-1', 'b@exemplo.com', temas=['Licitação'])
+            servico.registrar_novos_acordaos([{'id': 'a2', 'temas': ['Licitação']}])
+            
+            # O acórdão não entregue continua pendente para a próxima execução
+            estatisticas = servico.processar_alertas(agora=datetime.now() + timedelta(days=1, minutes=1))
+            self.assertEqual((estatisticas['enviados'], estatisticas['erros']), (0, 1))
+            self.assertEqual(servico.buscar_alerta(alerta_id)['pendentes'], ['a2'])
+        finally:
+            envio.fechar()
+            servidor.encerrar()
+
+class TestSerializacao(unittest.TestCase):
+    """Testes do serializador JSON das respostas"""
+    
+    def test_serializar_json(self):
+        dados = {'titulo': 'Acórdão sobre Licitação', 'data': datetime(2023, 5, 1, 10, 30), 'temas': ('Débito',), 'n': 1.5}
+        
+        # Os dois serializadores produzem o mesmo documento, sem escapes \u
+        for nome in ['orjson', 'json']:
+            with unittest.mock.patch.object(serializacao, 'SERIALIZADOR_JSON', nome):
+                conteudo = serializacao.serializar_json(dados)
+                self.assertIn('Acórdão sobre Licitação'.encode('utf-8'), conteudo)
+                self.assertEqual(serializacao.desserializar_json(conteudo), {
+                    'titulo': 'Acórdão sobre Licitação', 'data': '2023-05-01T10:30:00', 'temas': ['Débito'], 'n': 1.5
+                })
+        
+        with self.assertRaises(TypeError):
+            serializacao.serializar_json({'objeto': object()})
+    
+    def test_respostas_da_api(self):
+        import app
+        resposta = app.app.test_client().get('/api/acordaos/acordao-1001')
+        self.assertIn('Acórdão'.encode('utf-8'), resposta.data)
+        self.assertNotIn(b'\\u', resposta.data)
+        self.assertEqual(resposta.get_json()['id'], 'acordao-1001')
+
+class TestMetricas(unittest.TestCase):
+    """Testes das métricas no formato do Prometheus"""
+    
+    def test_registro_metricas(self):
+        registro = RegistroMetricas()
+        histograma = registro.histograma('duracao', 'Duração', ['rota'], intervalos=(0.1, 1.0))
+        contador = registro.contador('consultas_total', 'Consultas', ['resultado'])
+        registro.medidor('acervo', 'Tamanho do acervo', lambda: 42)
+        
+        for valor in (0.05, 0.1, 0.5, 3):
+            histograma.observar(valor, '/api/acordaos')
+        contador.incrementar('acerto')
+        contador.incrementar('acerto')
+        
+        texto = registro.exportar()
+        self.assertIn('# TYPE duracao histogram', texto)
+        self.assertIn('duracao_bucket{rota="/api/acordaos",le="0.1"} 2', texto)
+        self.assertIn('duracao_bucket{rota="/api/acordaos",le="1.0"} 3', texto)
+        self.assertIn('duracao_bucket{rota="/api/acordaos",le="+Inf"} 4', texto)
+        self.assertIn('duracao_count{rota="/api/acordaos"} 4', texto)
+        self.assertIn('consultas_total{resultado="acerto"} 2', texto)
+        self.assertIn('acervo 42.0', texto)
+    
+    def test_endpoint_metrics(self):
+        import app
+        cliente = app.app.test_client()
+        
+        etag = cliente.get('/api/acordaos?classificar=true&colegiado=Plenário').headers['ETag']
+        cliente.get('/api/acordaos?classificar=true&colegiado=Plenário', headers={'If-None-Match': etag})
+        
+        resposta = cliente.get('/metrics')
+        self.assertTrue(resposta.content_type.startswith('text/plain'))
+        
+        texto = resposta.get_data(as_text=True)
+        self.assertIn('tcu_requisicao_duracao_segundos_count{rota="/api/acordaos",metodo="GET",status="304"}', texto)
+        for etapa in ['busca', 'filtro', 'classificacao', 'serializacao']:
+            self.assertIn(f'tcu_etapa_duracao_segundos_count{{etapa="{etapa}"}}', texto)
+        self.assertIn('tcu_cache_consultas_total{cache="http",resultado="acerto"}', texto)
+        self.assertIn('tcu_corpus_acordaos 2000.0', texto)
+
+class TestCacheHTTP(unittest.TestCase):
+    """Testes de validação (ETag) e compressão das rotas de leitura"""
+    
+    @classmethod
+    def setUpClass(cls):
+        import app
+        cls.cliente = app.app.test_client()
+    
+    def test_etag_e_304(self):
+        for url in ['/api/acordaos?limite=50', '/api/acordaos/acordao-1001', '/api/acordaos/acordao-1001?classificar=true']:
+            resposta = self.cliente.get(url)
+            etag = resposta.headers['ETag']
+            self.assertIn('max-age', resposta.headers['Cache-Control'])
+            
+            # Mesma versão: 304 sem corpo
+            repetida = self.cliente.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(repetida.status_code, 304)
+            self.assertEqual(repetida.data, b'')
+            
+            # ETag de outra versão: resposta completa
+            alterada = self.cliente.get(url, headers={'If-None-Match': '"outra"'})
+            self.assertEqual(alterada.status_code, 200)
+        
+        # Páginas e representações diferentes têm ETags diferentes
+        etags = {self.cliente.get(url).headers['ETag'] for url in ['/api/acordaos?pagina=0', '/api/acordaos?pagina=1', '/api/acordaos/acordao-1001', '/api/acordaos/acordao-1001?classificar=true']}
+        self.assertEqual(len(etags), 4)
+    
+    def test_busca_em_lote(self):
+        ids = ['acordao-1005', 'inexistente', 'acordao-1001', 'acordao-1005']
+        resposta = self.cliente.post('/api/acordaos/batch', json={'ids': ids, 'classificar': True})
+        dados = resposta.get_json()
+        
+        # Ordem pedida, sem repetições, com os IDs não encontrados à parte
+        self.assertEqual([a['id'] for a in dados['acordaos']], ['acordao-1005', 'acordao-1001'])
+        self.assertEqual(dados['nao_encontrados'], ['inexistente'])
+        self.assertIn('relevancia', dados['acordaos'][0])
+        
+        # GET com os mesmos acórdãos de /api/acordaos/<id>, e validável por ETag
+        resposta = self.cliente.get('/api/acordaos/batch?ids=acordao-1002,acordao-1001')
+        self.assertEqual(resposta.get_json()['acordaos'][1], self.cliente.get('/api/acordaos/acordao-1001').get_json())
+        repetida = self.cliente.get('/api/acordaos/batch?ids=acordao-1002,acordao-1001', headers={'If-None-Match': resposta.headers['ETag']})
+        self.assertEqual(repetida.status_code, 304)
+        
+        # Lotes vazios, inválidos ou grandes demais
+        self.assertEqual(self.cliente.post('/api/acordaos/batch', json={'ids': 'acordao-1001'}).status_code, 400)
+        self.assertEqual(self.cliente.get('/api/acordaos/batch').status_code, 400)
+        self.assertEqual(self.cliente.post('/api/acordaos/batch', json={'ids': ['x'] * 101}).status_code, 400)
+    
+    def test_facetas(self):
+        import app
+        from collections import Counter
+        
+        filtros = {'colegiado': 'plenário', 'texto': 'licitação', 'excluir_relacao': True}
+        resposta = self.cliente.get('/api/acordaos/facetas?colegiado=plenário&texto=licitação&excluir_relacao=true&limite=1000')
+        dados = resposta.get_json()
+        
+        # Mesmas contagens de uma varredura do acervo filtrado
+        acordaos = app.rotas.api_client.filtrar_acordaos(list(app.rotas.corpus.atual().acordaos), filtros)
+        self.assertEqual(dados['total'], len(acordaos))
+        self.assertEqual({f['valor']: f['total'] for f in dados['facetas']['relator']}, Counter(a['relator'] for a in acordaos))
+        self.assertEqual({f['valor']: f['total'] for f in dados['facetas']['tema']}, Counter(t for a in acordaos for t in set(a['temas'])))
+        self.assertEqual([f['valor'] for f in dados['facetas']['colegiado']], ['Plenário'])
+        
+        # Do valor mais frequente ao menos, com limite por faceta
+        totais = [f['total'] for f in dados['facetas']['ano']]
+        self.assertEqual(totais, sorted(totais, reverse=True))
+        self.assertEqual(len(self.cliente.get('/api/acordaos/facetas?limite=1').get_json()['facetas']['relator']), 1)
+        
+        repetida = self.cliente.get(resposta.request.url, headers={'If-None-Match': resposta.headers['ETag']})
+        self.assertEqual(repetida.status_code, 304)
+    
+    def test_linha_tempo(self):
+        import app
+        from collections import Counter
+        
+        resposta = self.cliente.get('/api/acordaos/linha-tempo?granularidade=mes&colegiado=plenário&inicio=2019-03&fim=2020&detalhar=tema')
+        dados = resposta.get_json()
+        
+        # Mesmas contagens de uma varredura do acervo
+        acordaos = [a for a in app.rotas.corpus.atual().acordaos if a['colegiado'] == 'Plenário']
+        meses = Counter(f"{a['dataSessao'][6:]}-{a['dataSessao'][3:5]}" for a in acordaos)
+        self.assertEqual({p['periodo']: p['total'] for p in dados['serie']}, {m: t for m, t in meses.items() if '2019-03' <= m <= '2020-12'})
+        self.assertEqual([p['periodo'] for p in dados['serie']], sorted(p['periodo'] for p in dados['serie']))
+        
+        tema = acordaos[0]['temas'][0]
+        anos = Counter(a['dataSessao'][6:] for a in acordaos if tema in a['temas'])
+        serie = self.cliente.get(f'/api/acordaos/linha-tempo?granularidade=ano&colegiado=Plenário&tema={tema}').get_json()['serie']
+        self.assertEqual({p['periodo']: p['total'] for p in serie}, anos)
+        self.assertEqual(sum(p['total'] for p in dados['detalhes'][tema]), sum(t for m, t in Counter(
+            f"{a['dataSessao'][6:]}-{a['dataSessao'][3:5]}" for a in acordaos if tema in a['temas']).items() if '2019-03' <= m <= '2020-12'))
+        
+        self.assertEqual(self.cliente.get('/api/acordaos/linha-tempo?granularidade=semana').status_code, 400)
+        self.assertEqual(self.cliente.get('/api/acordaos/linha-tempo?detalhar=relator').status_code, 400)
+    
+    def test_compressao_negociada(self):
+        url = '/api/acordaos?limite=100'
+        original = self.cliente.get(url)
+        self.assertNotIn('Content-Encoding', original.headers)
+        
+        comprimida = self.cliente.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(comprimida.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(comprimida.headers['Vary'], 'Accept-Encoding')
+        self.assertLess(len(comprimida.data), len(original.data) / 3)
+        self.assertEqual(json.loads(gzip.decompress(comprimida.data)), original.get_json())
+        
+        # Variante comprimida também é validada pelo If-None-Match
+        repetida = self.cliente.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': comprimida.headers['ETag']})
+        self.assertEqual(repetida.status_code, 304)
+        
+        # gzip recusado explicitamente e respostas pequenas não são comprimidas
+        self.assertNotIn('Content-Encoding', self.cliente.get(url, headers={'Accept-Encoding': 'gzip;q=0'}).headers)
+        self.assertNotIn('Content-Encoding', self.cliente.get('/api/acordaos/inexistente', headers={'Accept-Encoding': 'gzip'}).headers)
+
+@unittest.skipIf(fastapi is None, "fastapi não instalado")
+class TestAppAsync(unittest.TestCase):
+    """Testes da aplicação ASGI (app_async.py)"""
+    
+    @classmethod
+    def setUpClass(cls):
+        import asyncio
+        import app
+        import app_async
+        cls.asyncio = asyncio
+        cls.app_flask = app.app.test_client()
+        cls.app_async = app_async
+    
+    def requisicao(self, metodo, url, **kwargs):
+        async def executar():
+            transporte = httpx.ASGITransport(app=self.app_async.app)
+            async with httpx.AsyncClient(transport=transporte, base_url='http://teste') as cliente:
+                return await cliente.request(metodo, url, **kwargs)
+        return self.asyncio.run(executar())
+    
+    def test_compatibilidade_com_flask(self):
+        for url in ['/api/acordaos?limite=5&colegiado=Plenário', '/api/acordaos/acordao-1001', '/api/acordaos/inexistente', '/api/acordaos/batch?ids=acordao-1003,acordao-1001', '/api/acordaos/batch', '/api/acordaos/facetas?relator=silva', '/api/acordaos/linha-tempo?granularidade=ano&detalhar=colegiado', '/api/autocompletar?campo=tema&prefixo=lic']:
+            resposta = self.requisicao('GET', url)
+            esperada = self.app_flask.get(url)
+            self.assertEqual(resposta.status_code, esperada.status_code)
+            self.assertEqual(resposta.json(), esperada.get_json())
+        
+        corpo = {'formato': 'csv', 'ids': ['acordao-1001', 'acordao-1002']}
+        resposta = self.requisicao('POST', '/api/exportar', json=corpo)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.content, self.app_flask.post('/api/exportar', json=corpo).data)
+        
+        resposta = self.requisicao('POST', '/api/exportar', json={'formato': 'csv', 'ids': 'x'})
+        self.assertEqual(resposta.status_code, 400)
+        
+        # Lote com corpo que não é um objeto JSON
+        for corpo in ([1, 2], 'acordao-1001', None):
+            resposta = self.requisicao('POST', '/api/acordaos/batch', json=corpo)
+            esperada = self.app_flask.post('/api/acordaos/batch', json=corpo)
+            self.assertEqual(resposta.status_code, 400)
+            self.assertEqual(esperada.status_code, 400)
+            self.assertEqual(resposta.json(), esperada.get_json())
+        
+        # Mais sugestões do que as guardadas no índice
+        self.assertEqual(self.requisicao('GET', '/api/autocompletar?prefixo=b&limite=50').status_code, 400)
+        self.assertEqual(self.app_flask.get('/api/autocompletar?prefixo=b&limite=50').status_code, 400)
+        
+        # Mesmos validadores e compressão da versão Flask
+        resposta = self.requisicao('GET', '/api/acordaos?limite=100', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(resposta.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(resposta.headers['ETag'], self.app_flask.get('/api/acordaos?limite=100', headers={'Accept-Encoding': 'gzip'}).headers['ETag'])
+        repetida = self.requisicao('GET', '/api/acordaos?limite=100', headers={'If-None-Match': resposta.headers['ETag']})
+        self.assertEqual(repetida.status_code, 304)
+        
+        metricas = self.requisicao('GET', '/metrics').text
+        self.assertIn('rota="/api/acordaos/{acordao_id}",metodo="GET",status="404"', metricas)
+    
+    def test_requisicoes_lentas_concorrentes(self):
+        import alerta_service as modulo_alertas
+        
+        # Serviço de alertas próprio do teste, com o journal em um diretório temporário
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        
+        for substituicao in (patch.object(modulo_alertas, '_alerta_service', None), patch.dict(os.environ, {'DIRETORIO_ALERTAS': temp_dir.name})):
+            substituicao.start()
+            self.addCleanup(substituicao.stop)
+        os.environ.pop('SMTP_HOST', None)
+        
+        alerta_service = modulo_alertas.obter_alerta_service()
+        self.addCleanup(alerta_service.parar_monitoramento)
+        original = alerta_service.adicionar_alerta
+        
+        # Simula uma gravação lenta (I/O bloqueante)
+        def adicionar_lento(**kwargs):
+            time.sleep(0.2)
+            return original(**kwargs)
+        
+        async def executar():
+            transporte = httpx.ASGITransport(app=self.app_async.app)
+            async with httpx.AsyncClient(transport=transporte, base_url='http://teste') as cliente:
+                return await self.asyncio.gather(*[
+                    cliente.post('/api/alertas', json={'usuario_id': f'lento-{i}', 'email': 'lento@exemplo.com', 'temas': ['Licitação']})
+                    for i in range(20)
+                ])
+        
+        with unittest.mock.patch.object(alerta_service, 'adicionar_alerta', adicionar_lento):
+            inicio = time.perf_counter()
+            respostas = self.asyncio.run(executar())
+            duracao = time.perf_counter() - inicio
+        
+        # As 20 esperas acontecem em paralelo no mesmo processo
+        self.assertTrue(all(r.status_code == 200 for r in respostas))
+        self.assertLess(duracao, 2)
+    
+    def test_primeira_carga_no_executor_io(self):
+        # Acervo ainda não carregado, com a carga registrando a thread usada
+        threads = []
+        api = TCUJurisprudenciaAPI()
+        original = api.iterar_acordaos
+        
+        def iterar_registrando(**kwargs):
+            threads.append(threading.current_thread().name)
+            return original(**kwargs)
+        
+        api.iterar_acordaos = iterar_registrando
+        corpus = CorpusCompartilhado(api, intervalo=3600)
+        self.addCleanup(corpus.parar)
+        
+        rotas = self.app_async.rotas
+        buscar_acordao = rotas.buscar_acordao
+        
+        def buscar_registrando(*args):
+            threads.append(threading.current_thread().name)
+            return buscar_acordao(*args)
+        
+        with patch.object(rotas, 'corpus', corpus), patch.object(rotas, 'buscar_acordao', buscar_registrando):
+            self.assertEqual(self.requisicao('GET', '/api/acordaos/acordao-1001').status_code, 200)
+            self.assertEqual(self.requisicao('GET', '/api/acordaos/acordao-1002').status_code, 200)
+        
+        # A primeira rota e a carga bloqueante rodam no executor de I/O; as
+        # seguintes, com o acervo já carregado, no executor de CPU
+        self.assertEqual([t.split('_')[0] for t in threads], ['io', 'io', 'cpu'])
+    
+    def test_acervo_compartilhado(self):
+        corpus = self.app_async.rotas.corpus
+        snapshot = corpus.atual()
+        
+        # As leituras usam a geração em uso; a atualização troca a geração
+        # inteira, e quem guardou a anterior continua vendo a mesma
+        resposta = self.requisicao('GET', '/api/acordaos/acordao-1001')
+        self.assertEqual(resposta.json(), snapshot.buscar_acordao_por_id('acordao-1001'))
+        
+        nova = corpus.atualizar()
+        self.assertIs(corpus.atual(), nova)
+        self.assertEqual(nova.geracao, snapshot.geracao + 1)
+        self.assertEqual(len(snapshot), len(nova))
+        self.assertIn('tcu_corpus_geracao', self.requisicao('GET', '/metrics').text)
+
+class TestInicializacao(unittest.TestCase):
+    """Testes de custo de inicialização da aplicação"""
+    
+    def importar_app(self, codigo):
+        # Importa a aplicação em um processo novo, sem módulos já carregados
+        return subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import app\n' + codigo],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    
+    def test_dependencias_pesadas_sob_demanda(self):
+        # Módulos carregados de fato (módulos sob demanda ainda não executados são ignorados)
+        codigo = (
+            "import sys\n"
+            f"print(','.join(m for m in {DEPENDENCIAS_SOB_DEMANDA!r} if type(sys.modules.get(m)) is type(sys)))"
+        )
+        carregadas = self.importar_app(codigo).stdout.strip()
+        
+        self.assertEqual(carregadas, '')
+    
+    def test_tempo_importacao_app(self):
+        # Menor tempo de importação entre algumas execuções, para reduzir ruído
+        tempos = []
+        for _ in range(3):
+            saida = self.importar_app('').stderr
+            linha_app = [linha for linha in saida.splitlines() if linha.endswith('| app')][-1]
+            tempos.append(int(linha_app.split('|')[1]) / 1000)
+        
+        self.assertLessEqual(
+            min(tempos),
+            ORCAMENTO_IMPORTACAO_APP_MS,
+            f"Importação de app.py levou {min(tempos):.0f} ms (orçamento: {ORCAMENTO_IMPORTACAO_APP_MS:.0f} ms)"
+        )
 
 if __name__ == '__main__':
     unittest.main()